@@ -0,0 +1,82 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.comum import imprimir_tabela, medir
+from src.agregacao import somar_por_chaves
+
+# =============================================================================
+# BENCHMARK: KERNEL DE AGREGAÇÃO x PIVOT_TABLE
+# =============================================================================
+# Compara somar_por_chaves com pivot_table(aggfunc="sum") em tabelas sintéticas
+# com o formato das tabelas do dashboard (chave x ano, valores float):
+#   - "emprego": poucas chaves (subclasses), muitas linhas por chave;
+#   - "pais": ~200 países;
+#   - "sh6": milhares de códigos SH6, o caso do detalhamento por componente.
+#
+# Uso: python -m benchmarks.agregacao [--linhas 10000 100000 1000000]
+
+CENARIOS = {"emprego": 40, "pais": 200, "sh6": 5000}
+ANOS = list(range(2020, 2026))
+
+
+def gerar_tabela(n_linhas, n_chaves, semente=0):
+    """Tabela sintética com as colunas chave, ano e valor."""
+    gerador = np.random.default_rng(semente)
+    return pd.DataFrame(
+        {
+            "chave": gerador.integers(0, n_chaves, n_linhas).astype(str),
+            "ano": gerador.choice(ANOS, n_linhas),
+            "valor": gerador.gamma(2.0, 1000.0, n_linhas),
+        }
+    )
+
+
+def com_kernel(df):
+    return somar_por_chaves(df, index="chave", columns="ano", values="valor")
+
+
+def com_pivot_table(df):
+    return df.pivot_table(
+        index="chave", columns="ano", values="valor", aggfunc="sum", fill_value=0
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Kernel de agregação x pivot_table em tabelas sintéticas."
+    )
+    parser.add_argument(
+        "--linhas", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeticoes", type=int, default=7)
+    args = parser.parse_args()
+
+    linhas = []
+    for cenario, n_chaves in CENARIOS.items():
+        for n_linhas in args.linhas:
+            df = gerar_tabela(n_linhas, n_chaves)
+            np.testing.assert_allclose(
+                com_kernel(df).to_numpy(), com_pivot_table(df).to_numpy()
+            )
+
+            mediana_pivot, _ = medir(lambda df=df: com_pivot_table(df), args.repeticoes)
+            mediana_kernel, _ = medir(lambda df=df: com_kernel(df), args.repeticoes)
+            linhas.append(
+                (
+                    cenario,
+                    f"{n_linhas:,}",
+                    f"{mediana_pivot:.1f}",
+                    f"{mediana_kernel:.1f}",
+                    f"{mediana_pivot / mediana_kernel:.1f}x",
+                )
+            )
+
+    imprimir_tabela(
+        ("cenário", "linhas", "pivot_table (ms)", "kernel (ms)", "ganho"), linhas
+    )
+
+
+if __name__ == "__main__":
+    main()
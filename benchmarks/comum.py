@@ -0,0 +1,36 @@
+import statistics
+import time
+
+# =============================================================================
+# UTILITÁRIOS DOS BENCHMARKS
+# =============================================================================
+# Os benchmarks são scripts executados a partir da raiz do repositório, por
+# exemplo: python -m benchmarks.agregacao
+
+
+def medir(funcao, repeticoes=7, aquecimento=1):
+    """
+    Executa `funcao` repetidas vezes e retorna (mediana, mínimo) do tempo em ms.
+
+    Args:
+        funcao: Função sem argumentos a ser medida
+        repeticoes: Quantidade de execuções medidas
+        aquecimento: Execuções descartadas antes da medição
+    """
+    for _ in range(aquecimento):
+        funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), min(tempos)
+
+
+def imprimir_tabela(cabecalho, linhas):
+    """Imprime uma tabela de texto alinhada (cabeçalho + linhas)."""
+    larguras = [
+        max(len(str(valor)) for valor in coluna) for coluna in zip(cabecalho, *linhas)
+    ]
+    for linha in [cabecalho, *linhas]:
+        print("  ".join(str(v).rjust(l) for v, l in zip(linha, larguras)))
@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.comum import imprimir_tabela
+
+# =============================================================================
+# BENCHMARK: LEITURA EM CSV (PYARROW) x JSON (LISTA DE DICIONÁRIOS)
+# =============================================================================
+# Gera uma tabela sintética no formato das tabelas de detalhe de comércio exterior
+# (200 mil linhas por padrão), serializada como o PostgREST a devolveria em CSV
+# e em JSON, e mede a decodificação até o DataFrame:
+#   - "json": json.loads + pd.DataFrame(lista de dicionários), o caminho anterior;
+#   - "csv": data_loader._decodificar_csv (pyarrow) + to_pandas.
+#
+# Cada formato é medido em um processo separado, para que o pico de memória
+# (aumento do RSS máximo durante a decodificação) de um não contamine o outro.
+#
+# Uso: python -m benchmarks.formato_leitura [--linhas 200000]
+
+PAISES = [f"País {i:03d}" for i in range(200)]
+VERTICAIS = ["Calçados", "Couro", "Componentes", "Máquinas"]
+
+
+def gerar_tabela(n_linhas, semente=0):
+    """Tabela sintética com as colunas de uma tabela *_pais."""
+    gerador = np.random.default_rng(semente)
+    return pd.DataFrame(
+        {
+            "ano": gerador.integers(2020, 2026, n_linhas),
+            "mes": gerador.integers(1, 13, n_linhas),
+            "vertical": gerador.choice(VERTICAIS, n_linhas),
+            "pais": gerador.choice(PAISES, n_linhas),
+            "valor": gerador.gamma(2.0, 5000.0, n_linhas).round(2),
+            "pares": gerador.integers(0, 100_000, n_linhas),
+        }
+    )
+
+
+def _decodificar_json(conteudo):
+    return pd.DataFrame(json.loads(conteudo))
+
+
+def _decodificar_csv(conteudo):
+    from src.data_loader import _decodificar_csv
+
+    return _decodificar_csv(conteudo).to_pandas()
+
+
+DECODIFICADORES = {"json": _decodificar_json, "csv": _decodificar_csv}
+
+
+def _pico_rss_bytes():
+    """RSS máximo do processo até agora, em bytes."""
+    # No Linux, ru_maxrss é herdado do processo pai no fork; VmHWM não
+    try:
+        with open("/proc/self/status") as f:
+            for linha in f:
+                if linha.startswith("VmHWM:"):
+                    return int(linha.split()[1]) * 1024
+    except OSError:
+        pass
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+def medir_formato(formato, arquivo, repeticoes):
+    """
+    Executado no processo filho: decodifica o arquivo e imprime (em JSON) o tempo
+    mediano e o aumento do RSS máximo na primeira decodificação.
+    """
+    decodificar = DECODIFICADORES[formato]
+    if formato == "csv":
+        import src.data_loader  # noqa: F401  (importação fora da medição)
+    with open(arquivo, "rb") as f:
+        conteudo = f.read()
+
+    rss_antes = _pico_rss_bytes()
+    df = decodificar(conteudo)
+    pico = _pico_rss_bytes() - rss_antes
+    linhas = len(df)
+    del df
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        decodificar(conteudo)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    print(
+        json.dumps(
+            {
+                "linhas": linhas,
+                "bytes": len(conteudo),
+                "mediana_ms": float(np.median(tempos)),
+                "pico_mb": pico / 2**20,
+            }
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Decodificação de CSV (pyarrow) x JSON em uma tabela sintética."
+    )
+    parser.add_argument("--linhas", type=int, default=200_000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument(
+        "--medir", choices=list(DECODIFICADORES), help=argparse.SUPPRESS
+    )
+    parser.add_argument("--arquivo", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        medir_formato(args.medir, args.arquivo, args.repeticoes)
+        return
+
+    df = gerar_tabela(args.linhas)
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivos = {
+            "json": os.path.join(diretorio, "tabela.json"),
+            "csv": os.path.join(diretorio, "tabela.csv"),
+        }
+        df.to_json(arquivos["json"], orient="records", force_ascii=False)
+        df.to_csv(arquivos["csv"], index=False)
+
+        resultados = {}
+        for formato, arquivo in arquivos.items():
+            saida = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.formato_leitura",
+                    "--medir",
+                    formato,
+                    "--arquivo",
+                    arquivo,
+                    "--repeticoes",
+                    str(args.repeticoes),
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            resultados[formato] = json.loads(saida.stdout.strip().splitlines()[-1])
+
+    linhas = [
+        (
+            formato,
+            f"{r['linhas']:,}",
+            f"{r['bytes'] / 2**20:.1f}",
+            f"{r['mediana_ms']:.1f}",
+            f"{r['pico_mb']:.1f}",
+        )
+        for formato, r in resultados.items()
+    ]
+    imprimir_tabela(
+        ("formato", "linhas", "payload (MB)", "decodificação (ms)", "pico (MB)"),
+        linhas,
+    )
+
+
+if __name__ == "__main__":
+    main()
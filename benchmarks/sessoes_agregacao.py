@@ -0,0 +1,143 @@
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from benchmarks.agregacao import gerar_tabela
+from benchmarks.comum import imprimir_tabela
+from src.agregacao import somar_por_chaves
+
+# =============================================================================
+# BENCHMARK: LATÊNCIA COM VÁRIAS SESSÕES AGREGANDO AO MESMO TEMPO
+# =============================================================================
+# Simula o servidor do Streamlit, que atende todas as sessões com threads de um
+# único processo: algumas sessões "pesadas" montam pivots grandes (SH6 x ano)
+# enquanto uma sessão "leve" monta pivots pequenos. Mede a latência de cada
+# chamada, vista pela sessão, em três modos:
+#   - "no_processo": tudo na thread da sessão (comportamento atual);
+#   - "pool_limiar": agregações com pelo menos --limiar linhas vão inteiras
+#     (codificação + soma) para um pool de processos; as menores ficam na thread;
+#   - "pool_tudo": todas as agregações vão para o pool.
+# No pool, o DataFrame de entrada precisa ser serializado e enviado ao processo
+# filho a cada chamada; é esse custo que decide se o despacho compensa.
+#
+# Uso: python -m benchmarks.sessoes_agregacao [--sessoes 4] [--linhas 1000000]
+
+MODOS = ("no_processo", "pool_limiar", "pool_tudo")
+
+
+def agregar(df):
+    """Pivot SH6 x ano, como no detalhamento por componente."""
+    return somar_por_chaves(df, index="chave", columns="ano", values="valor")
+
+
+def _percentis(latencias):
+    p50, p95 = np.percentile(latencias, [50, 95])
+    return round(p50, 1), round(p95, 1)
+
+
+def executar_modo(modo, df_pesado, df_leve, sessoes, rodadas, limiar, executor):
+    """
+    Roda as sessões pesadas e a sessão leve em paralelo (threads) e retorna as
+    latências (ms) de cada tipo de chamada.
+    """
+
+    def chamar(df):
+        no_pool = modo == "pool_tudo" or (modo == "pool_limiar" and len(df) >= limiar)
+        inicio = time.perf_counter()
+        if no_pool:
+            executor.submit(agregar, df).result()
+        else:
+            agregar(df)
+        return (time.perf_counter() - inicio) * 1000
+
+    latencias_pesadas = []
+    latencias_leves = []
+    terminou = threading.Event()
+
+    def sessao_pesada():
+        for _ in range(rodadas):
+            latencias_pesadas.append(chamar(df_pesado))
+
+    def sessao_leve():
+        while not terminou.is_set():
+            latencias_leves.append(chamar(df_leve))
+            time.sleep(0.005)
+
+    pesadas = [threading.Thread(target=sessao_pesada) for _ in range(sessoes)]
+    leve = threading.Thread(target=sessao_leve)
+    inicio = time.perf_counter()
+    leve.start()
+    for thread in pesadas:
+        thread.start()
+    for thread in pesadas:
+        thread.join()
+    terminou.set()
+    leve.join()
+    total = (time.perf_counter() - inicio) * 1000
+    return latencias_pesadas, latencias_leves, total
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Latência de agregações com várias sessões simultâneas."
+    )
+    parser.add_argument("--sessoes", type=int, default=4)
+    parser.add_argument("--rodadas", type=int, default=5)
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--linhas-leve", type=int, default=10_000)
+    parser.add_argument("--chaves", type=int, default=5000)
+    parser.add_argument("--limiar", type=int, default=200_000)
+    parser.add_argument("--processos", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    df_pesado = gerar_tabela(args.linhas, args.chaves)
+    df_leve = gerar_tabela(args.linhas_leve, args.chaves, semente=1)
+    print(
+        f"CPUs: {os.cpu_count()}  processos no pool: {args.processos}  "
+        f"sessões pesadas: {args.sessoes} x {args.rodadas} rodadas"
+    )
+
+    executor = ProcessPoolExecutor(
+        max_workers=args.processos, mp_context=multiprocessing.get_context("spawn")
+    )
+    # Aquecimento: sobe os processos e importa o pandas neles
+    list(executor.map(agregar, [df_leve] * args.processos))
+
+    linhas = []
+    try:
+        for modo in MODOS:
+            pesadas, leves, total = executar_modo(
+                modo,
+                df_pesado,
+                df_leve,
+                args.sessoes,
+                args.rodadas,
+                args.limiar,
+                executor,
+            )
+            linhas.append(
+                (modo, *_percentis(pesadas), *_percentis(leves), round(total))
+            )
+    finally:
+        executor.shutdown()
+
+    imprimir_tabela(
+        (
+            "modo",
+            "pesada p50 ms",
+            "pesada p95 ms",
+            "leve p50 ms",
+            "leve p95 ms",
+            "total ms",
+        ),
+        linhas,
+    )
+
+
+if __name__ == "__main__":
+    main()
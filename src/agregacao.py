@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+# =============================================================================
+# KERNEL DE AGREGAÇÃO (SOMA POR CHAVES)
+# =============================================================================
+
+
+def _codificar(coluna):
+    """
+    Codifica uma coluna em inteiros (0..n-1) com os rótulos ordenados.
+    Valores nulos recebem o código -1. Colunas categóricas geram um índice comum
+    (não categórico), como nas demais colunas.
+    """
+    codigos, rotulos = pd.factorize(coluna, sort=True)
+    return codigos, pd.Index(np.asarray(rotulos), name=coluna.name)
+
+
+def somar_por_chaves(df, index, values, columns=None):
+    """
+    Soma `values` agrupando por `index` (e opcionalmente `columns`), retornando a
+    mesma forma de `pivot_table(aggfunc="sum", fill_value=0)`.
+
+    As chaves são codificadas como inteiros e a soma é feita com np.bincount numa
+    matriz pré-alocada, evitando o custo genérico do pivot_table.
+
+    Args:
+        df: DataFrame de entrada
+        index: Nome da coluna que vira o índice
+        values: Nome da coluna a ser somada
+        columns: Nome da coluna que vira as colunas (opcional)
+
+    Returns:
+        DataFrame com `index` como índice e, se `columns` for informado, uma
+        coluna por valor de `columns`; caso contrário, uma única coluna `values`.
+    """
+    codigos_idx, rotulos_idx = _codificar(df[index])
+    serie_valores = df[values]
+    pesos = np.nan_to_num(serie_valores.to_numpy(dtype="float64"), nan=0.0)
+
+    if columns is None:
+        validos = codigos_idx >= 0
+        matriz = np.bincount(
+            codigos_idx[validos], weights=pesos[validos], minlength=len(rotulos_idx)
+        )
+        resultado = pd.DataFrame({values: matriz}, index=rotulos_idx)
+    else:
+        codigos_col, rotulos_col = _codificar(df[columns])
+        validos = (codigos_idx >= 0) & (codigos_col >= 0)
+        n_colunas = len(rotulos_col)
+        posicoes = codigos_idx[validos] * n_colunas + codigos_col[validos]
+        matriz = np.bincount(
+            posicoes, weights=pesos[validos], minlength=len(rotulos_idx) * n_colunas
+        ).reshape(len(rotulos_idx), n_colunas)
+        resultado = pd.DataFrame(matriz, index=rotulos_idx, columns=rotulos_col)
+
+    # Somas de inteiros voltam a ser inteiras, como no pivot_table
+    if pd.api.types.is_integer_dtype(serie_valores.dtype):
+        resultado = resultado.astype("int64")
+
+    return resultado
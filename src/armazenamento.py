@@ -0,0 +1,377 @@
+import contextlib
+import hashlib
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:  # Windows: o backend em disco funciona sem trava de arquivo
+    fcntl = None
+
+# =============================================================================
+# BACKENDS DE ARMAZENAMENTO DO CACHE DE PARTIÇÕES
+# =============================================================================
+# As partições anuais (src/particoes.py) ficam em um backend escolhido pela
+# variável de ambiente ASSINTECAL_CACHE_BACKEND:
+#   - "memoria" (padrão): dicionário no próprio processo, com as tabelas expirando
+#     pelo TTL e limitado a MAX_TABELAS_MEMORIA (LRU);
+#   - "disco": arquivos em ASSINTECAL_CACHE_DIR, com trava (fcntl), compartilhados
+#     pelos workers de uma mesma máquina;
+#   - "redis": servidor que fala o protocolo Redis (RESP) em ASSINTECAL_REDIS_URL,
+#     compartilhado por todas as réplicas do dashboard.
+# Nos backends compartilhados as tabelas são serializadas em Arrow IPC, formato
+# que é lido de volta sem conversão de tipos.
+
+BACKEND_PADRAO = "memoria"
+DIRETORIO_CACHE = os.getenv("ASSINTECAL_CACHE_DIR", ".cache/particoes")
+DIRETORIO_DATASETS = os.getenv("ASSINTECAL_DATASETS_DIR", ".cache/datasets")
+REDIS_URL_PADRAO = "redis://localhost:6379/0"
+PREFIXO_CHAVES = "assintecal:particao:"
+TIMEOUT_REDIS = 5  # segundos
+MAX_TABELAS_MEMORIA = int(os.getenv("ASSINTECAL_CACHE_MEMORIA_MAX_TABELAS", "512"))
+
+
+def serializar_tabela(tabela):
+    """Serializa uma pyarrow.Table no formato Arrow IPC (stream)."""
+    import pyarrow as pa
+
+    destino = pa.BufferOutputStream()
+    with pa.ipc.new_stream(destino, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+    return destino.getvalue().to_pybytes()
+
+
+def desserializar_tabela(dados):
+    """Lê uma pyarrow.Table serializada em Arrow IPC (stream)."""
+    import pyarrow as pa
+
+    return pa.ipc.open_stream(pa.py_buffer(dados)).read_all()
+
+
+@contextlib.contextmanager
+def _travar_diretorio(diretorio, exclusiva):
+    """
+    Context manager que abre (e trava, se fcntl estiver disponível) o arquivo de
+    trava do diretório; fechar o arquivo libera a trava.
+    """
+    with open(os.path.join(diretorio, ".trava"), "a") as arquivo:
+        if fcntl is not None:
+            fcntl.flock(arquivo, fcntl.LOCK_EX if exclusiva else fcntl.LOCK_SH)
+        yield arquivo
+
+
+def _nome_chave(chave):
+    """Nome textual e estável da chave (tupla) para os backends compartilhados."""
+    return PREFIXO_CHAVES + hashlib.sha1(repr(chave).encode("utf-8")).hexdigest()
+
+
+class ArmazenamentoMemoria:
+    """
+    Tabelas guardadas no próprio processo, sem serialização. Cada tabela vale pelo
+    TTL com que foi gravada; acima de `max_tabelas`, as usadas há mais tempo (LRU)
+    saem primeiro, como no cache dos carregadores (src/cache.py).
+
+    Args:
+        max_tabelas: Quantidade máxima de tabelas guardadas
+    """
+
+    def __init__(self, max_tabelas=MAX_TABELAS_MEMORIA):
+        self.max_tabelas = max_tabelas
+        self._tabelas = OrderedDict()  # chave -> (tabela, expira_em)
+        self._trava = threading.Lock()
+
+    def ler(self, chave):
+        with self._trava:
+            item = self._tabelas.get(chave)
+            if item is None:
+                return None
+            tabela, expira_em = item
+            if time.monotonic() > expira_em:
+                del self._tabelas[chave]
+                return None
+            self._tabelas.move_to_end(chave)
+            return tabela
+
+    def gravar(self, chave, tabela, ttl):
+        agora = time.monotonic()
+        with self._trava:
+            self._tabelas[chave] = (tabela, agora + ttl)
+            self._tabelas.move_to_end(chave)
+            expiradas = [c for c, (_, e) in self._tabelas.items() if e < agora]
+            for c in expiradas:
+                del self._tabelas[c]
+            while len(self._tabelas) > self.max_tabelas:
+                self._tabelas.popitem(last=False)
+
+
+class ArmazenamentoDisco:
+    """
+    Tabelas em arquivos Arrow IPC em um diretório local. A escrita é atômica
+    (arquivo temporário + os.replace) e protegida por trava exclusiva; a leitura
+    usa trava compartilhada, para que vários workers usem o mesmo diretório.
+
+    Args:
+        diretorio: Diretório dos arquivos de cache
+    """
+
+    def __init__(self, diretorio=DIRETORIO_CACHE):
+        self.diretorio = diretorio
+        os.makedirs(diretorio, exist_ok=True)
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, f"{_nome_chave(chave)}.arrow")
+
+    def _travar(self, exclusiva):
+        return _travar_diretorio(self.diretorio, exclusiva)
+
+    def ler(self, chave):
+        caminho = self._caminho(chave)
+        with self._travar(exclusiva=False):
+            if not os.path.exists(caminho):
+                return None
+            with open(caminho, "rb") as f:
+                dados = f.read()
+        try:
+            return desserializar_tabela(dados)
+        except Exception as e:
+            print(f"Arquivo de cache inválido ({caminho}): {e}")
+            return None
+
+    def gravar(self, chave, tabela, ttl):
+        caminho = self._caminho(chave)
+        temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        dados = serializar_tabela(tabela)
+        with self._travar(exclusiva=True):
+            with open(temporario, "wb") as f:
+                f.write(dados)
+            os.replace(temporario, caminho)
+
+
+class ErroRESP(Exception):
+    """Erro devolvido pelo servidor Redis."""
+
+
+class ClienteRESP:
+    """
+    Cliente mínimo do protocolo Redis (RESP2): apenas o necessário para GET e SET
+    (e AUTH/SELECT ao conectar), sobre uma conexão TCP reaproveitada entre as
+    chamadas.
+
+    Args:
+        url: redis://[:senha@]host:porta/db
+        timeout: Timeout de conexão e leitura (segundos)
+    """
+
+    def __init__(self, url=REDIS_URL_PADRAO, timeout=TIMEOUT_REDIS):
+        partes = urlparse(url)
+        self.host = partes.hostname or "localhost"
+        self.porta = partes.port or 6379
+        self.senha = partes.password
+        self.db = int(partes.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._conexao = None
+        self._leitor = None
+        self._trava = threading.Lock()
+
+    def _conectar(self):
+        self._conexao = socket.create_connection(
+            (self.host, self.porta), timeout=self.timeout
+        )
+        self._leitor = self._conexao.makefile("rb")
+        if self.senha:
+            self._enviar("AUTH", self.senha)
+        if self.db:
+            self._enviar("SELECT", self.db)
+
+    def _fechar(self):
+        if self._conexao is not None:
+            self._conexao.close()
+        self._conexao = None
+        self._leitor = None
+
+    def _enviar(self, *argumentos):
+        partes = [f"*{len(argumentos)}\r\n".encode()]
+        for argumento in argumentos:
+            if not isinstance(argumento, bytes):
+                argumento = str(argumento).encode("utf-8")
+            partes.append(b"$%d\r\n%s\r\n" % (len(argumento), argumento))
+        self._conexao.sendall(b"".join(partes))
+        return self._ler_resposta()
+
+    def _ler_resposta(self):
+        linha = self._leitor.readline()
+        if not linha:
+            raise ConnectionError("Conexão com o Redis encerrada.")
+        tipo, conteudo = linha[:1], linha[1:-2]
+        if tipo == b"+":
+            return conteudo.decode()
+        if tipo == b"-":
+            raise ErroRESP(conteudo.decode())
+        if tipo == b":":
+            return int(conteudo)
+        if tipo == b"$":
+            tamanho = int(conteudo)
+            if tamanho < 0:
+                return None
+            dados = self._leitor.read(tamanho + 2)
+            return dados[:-2]
+        if tipo == b"*":
+            tamanho = int(conteudo)
+            if tamanho < 0:
+                return None
+            return [self._ler_resposta() for _ in range(tamanho)]
+        raise ErroRESP(f"Resposta RESP inesperada: {linha!r}")
+
+    def comando(self, *argumentos):
+        """Envia um comando e retorna a resposta; reconecta uma vez se preciso."""
+        with self._trava:
+            for tentativa in range(2):
+                try:
+                    if self._conexao is None:
+                        self._conectar()
+                    return self._enviar(*argumentos)
+                except (OSError, ConnectionError):
+                    self._fechar()
+                    if tentativa:
+                        raise
+
+
+class ArmazenamentoRedis:
+    """
+    Tabelas em Arrow IPC em um servidor Redis (ou compatível), compartilhadas
+    entre réplicas. As chaves expiram no servidor após o TTL da partição. Falhas
+    do servidor e valores corrompidos são tratados como ausência de cache (a
+    leitura vai ao Supabase).
+
+    Args:
+        url: URL do servidor (redis://host:porta/db)
+    """
+
+    def __init__(self, url=None):
+        url = url or os.getenv("ASSINTECAL_REDIS_URL", REDIS_URL_PADRAO)
+        self.cliente = ClienteRESP(url)
+
+    def ler(self, chave):
+        try:
+            dados = self.cliente.comando("GET", _nome_chave(chave))
+            return None if dados is None else desserializar_tabela(dados)
+        except Exception as e:
+            print(f"Erro ao ler o cache no Redis: {e}")
+            return None
+
+    def gravar(self, chave, tabela, ttl):
+        try:
+            self.cliente.comando(
+                "SET", _nome_chave(chave), serializar_tabela(tabela), "EX", int(ttl)
+            )
+        except Exception as e:
+            print(f"Erro ao gravar o cache no Redis: {e}")
+
+
+BACKENDS = {
+    "memoria": ArmazenamentoMemoria,
+    "disco": ArmazenamentoDisco,
+    "redis": ArmazenamentoRedis,
+}
+
+
+def criar_armazenamento(nome=None):
+    """
+    Cria o backend de armazenamento configurado em ASSINTECAL_CACHE_BACKEND.
+    Nomes desconhecidos (ou falha ao criar o backend) recaem na memória.
+    """
+    nome = (nome or os.getenv("ASSINTECAL_CACHE_BACKEND", BACKEND_PADRAO)).lower()
+    classe = BACKENDS.get(nome)
+    if classe is None:
+        print(f"Backend de cache '{nome}' desconhecido; usando memória.")
+        return ArmazenamentoMemoria()
+    try:
+        return classe()
+    except Exception as e:
+        print(f"Não foi possível criar o backend de cache '{nome}': {e}")
+        return ArmazenamentoMemoria()
+
+
+# --- DATASETS MAPEADOS EM MEMÓRIA (ARROW IPC) ---
+# Com vários processos do Streamlit na mesma máquina, cada dataset carregado é
+# gravado uma vez em um arquivo Arrow IPC e aberto com mmap. Os processos passam
+# a compartilhar as mesmas páginas pelo cache de páginas do sistema operacional,
+# e as colunas numéricas sem nulos viram arrays do pandas sem cópia (somente
+# leitura). Colunas de texto continuam sendo convertidas para o heap do processo.
+
+
+def _caminho_dataset(chave):
+    return os.path.join(DIRETORIO_DATASETS, f"{_nome_chave(chave)}.arrow")
+
+
+def _abrir_mapeado(caminho):
+    """Lê o arquivo Arrow IPC via mmap e monta o DataFrame sem copiar os buffers."""
+    import pyarrow as pa
+
+    tabela = pa.ipc.open_file(pa.memory_map(caminho, "r")).read_all()
+    return tabela.to_pandas(split_blocks=True)
+
+
+def abrir_dataset_mapeado(chave, ttl):
+    """
+    Abre o dataset de `chave` já gravado (por este ou outro processo) se ele
+    tiver menos de `ttl` segundos; caso contrário, retorna None.
+    """
+    caminho = _caminho_dataset(chave)
+    try:
+        if time.time() - os.path.getmtime(caminho) > ttl:
+            return None
+        return _abrir_mapeado(caminho)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Não foi possível abrir o dataset mapeado {caminho}: {e}")
+        return None
+
+
+def mapear_dataset(chave, df, ttl):
+    """
+    Grava o DataFrame em Arrow IPC (escrita atômica, sob trava) e o reabre via
+    mmap. Arquivos com mais de `ttl` segundos são removidos na mesma passada
+    (processos que ainda os mapeiam continuam com acesso até liberá-los).
+
+    Returns:
+        DataFrame apoiado no arquivo mapeado, ou o próprio `df` em caso de erro
+    """
+    import pyarrow as pa
+
+    if df.empty:
+        return df
+    caminho = _caminho_dataset(chave)
+    temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(DIRETORIO_DATASETS, exist_ok=True)
+        tabela = pa.Table.from_pandas(df, preserve_index=False)
+        with _travar_diretorio(DIRETORIO_DATASETS, exclusiva=True):
+            with (
+                pa.OSFile(temporario, "wb") as destino,
+                pa.ipc.new_file(destino, tabela.schema) as escritor,
+            ):
+                escritor.write_table(tabela)
+            os.replace(temporario, caminho)
+            _remover_expirados(DIRETORIO_DATASETS, ttl)
+        mapeado = _abrir_mapeado(caminho)
+    except Exception as e:
+        print(f"Não foi possível mapear o dataset {chave}: {e}")
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        return df
+    mapeado.attrs.update(df.attrs)
+    return mapeado
+
+
+def _remover_expirados(diretorio, ttl):
+    agora = time.time()
+    for nome in os.listdir(diretorio):
+        caminho = os.path.join(diretorio, nome)
+        if nome.endswith(".arrow") and agora - os.path.getmtime(caminho) > ttl:
+            os.remove(caminho)
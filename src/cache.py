@@ -0,0 +1,207 @@
+import functools
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from src.rastreamento import marcar_cache
+from src.resiliencia import CHAVE_PROVISORIO
+
+# =============================================================================
+# CACHE STALE-WHILE-REVALIDATE DOS CARREGADORES
+# =============================================================================
+# Depois que o TTL expira, o valor antigo continua sendo servido imediatamente e
+# uma thread em segundo plano busca a nova versão. Quando a busca termina, a nova
+# versão substitui a antiga de uma vez (troca atômica da entrada no dicionário).
+# Assim, nenhum usuário espera pelo recarregamento após a expiração.
+#
+# Carregamentos a frio são coalescidos (single-flight): se várias sessões pedem
+# a mesma chave ainda não cacheada, apenas a primeira executa a busca e as demais
+# aguardam o mesmo Future, resultando em uma única leitura de rede por chave.
+#
+# Valores provisórios (DataFrames com attrs["provisorio"], ex: snapshots servidos
+# com o backend fora do ar) são revalidados em segundo plano a cada acesso e
+# nunca substituem uma versão definitiva já em cache.
+#
+# O cache é limitado, como o st.cache_data que substituiu: entradas que ficam um
+# TTL inteiro sem acesso são descartadas, e acima de MAX_ENTRADAS as menos usadas
+# recentemente (LRU) saem primeiro.
+#
+# Ao contrário do st.cache_data, o valor é entregue sem cópia (como no
+# st.cache_resource): um acerto custa o mesmo qualquer que seja o tamanho da
+# tabela, e DataFrames mapeados em memória (src/armazenamento.py) continuam
+# apoiados no arquivo compartilhado entre os workers. O DataFrame recebido é o
+# mesmo para todas as sessões: quem precisa alterá-lo deve trabalhar numa cópia.
+
+MAX_ENTRADAS = int(os.getenv("ASSINTECAL_CACHE_MAX_ENTRADAS", "256"))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entrada:
+    """
+    Valor cacheado, o instante (time.monotonic) em que foi obtido, o TTL da função
+    e o instante do último acesso.
+    """
+
+    valor: object
+    obtido_em: float
+    ttl: float
+    acessado_em: float = field(default_factory=time.monotonic)
+
+
+_CACHE = OrderedDict()
+_ATUALIZANDO = set()
+_EM_VOO = {}
+_TRAVA = threading.Lock()
+
+
+def _chave(funcao, args, kwargs):
+    """Chave do cache: função + argumentos (que precisam ser hasheáveis)."""
+    return (funcao.__module__, funcao.__qualname__, args, tuple(sorted(kwargs.items())))
+
+
+def _provisorio(valor):
+    """Indica se o valor é provisório (ex: snapshot servido durante uma falha)."""
+    return isinstance(valor, pd.DataFrame) and bool(valor.attrs.get(CHAVE_PROVISORIO))
+
+
+def _guardar(chave, valor, ttl):
+    """
+    Guarda `valor` em `chave` e aplica a política de descarte (TTL sem acesso e
+    LRU). Deve ser chamada com _TRAVA adquirida.
+    """
+    agora = time.monotonic()
+    _CACHE[chave] = _Entrada(valor, agora, ttl, agora)
+    _CACHE.move_to_end(chave)
+
+    ociosas = [c for c, e in _CACHE.items() if agora - e.acessado_em > e.ttl]
+    for c in ociosas:
+        del _CACHE[c]
+    while len(_CACHE) > MAX_ENTRADAS:
+        _CACHE.popitem(last=False)
+
+
+def _carregar_uma_vez(chave, funcao, args, kwargs, ttl):
+    """
+    Executa o carregamento a frio de `chave` uma única vez, mesmo com chamadas
+    concorrentes: quem chega enquanto a busca está em andamento espera o resultado
+    (ou a exceção) da busca já iniciada.
+    """
+    with _TRAVA:
+        entrada = _CACHE.get(chave)
+        if entrada is not None:
+            return entrada.valor
+        futuro = _EM_VOO.get(chave)
+        lider = futuro is None
+        if lider:
+            futuro = Future()
+            _EM_VOO[chave] = futuro
+
+    if not lider:
+        return futuro.result()
+
+    try:
+        valor = funcao(*args, **kwargs)
+    except BaseException as e:
+        with _TRAVA:
+            _EM_VOO.pop(chave, None)
+        futuro.set_exception(e)
+        raise
+
+    with _TRAVA:
+        _guardar(chave, valor, ttl)
+        _EM_VOO.pop(chave, None)
+    futuro.set_result(valor)
+    return valor
+
+
+def _revalidar(chave, funcao, args, kwargs, ttl):
+    """Busca a nova versão em segundo plano; em caso de erro ou vazio mantém a antiga."""
+    try:
+        valor = funcao(*args, **kwargs)
+        if isinstance(valor, pd.DataFrame) and valor.empty:
+            # Falha de conexão devolve DataFrame vazio: mantém a última versão boa
+            logger.warning(
+                "Atualização de %s sem dados; mantendo o cache.", funcao.__qualname__
+            )
+            return
+        with _TRAVA:
+            atual = _CACHE.get(chave)
+            if _provisorio(valor) and atual and not _provisorio(atual.valor):
+                return
+            if atual is None:
+                # Descartada enquanto era atualizada (manifesto ou LRU)
+                return
+            _guardar(chave, valor, ttl)
+    except Exception:
+        logger.exception("Erro ao atualizar o cache de %s.", funcao.__qualname__)
+    finally:
+        with _TRAVA:
+            _ATUALIZANDO.discard(chave)
+
+
+def cache_swr(ttl):
+    """
+    Decorador de cache stale-while-revalidate. O acerto/falha de cache é marcado
+    no trecho rastreado em andamento: para registrá-lo, aplique `@rastrear` por
+    fora (acima de `@cache_swr`).
+
+    Args:
+        ttl: Tempo (em segundos) após o qual o valor é considerado desatualizado
+            e uma atualização em segundo plano é disparada.
+
+    Returns:
+        Decorador que cacheia o resultado da função por argumentos.
+    """
+
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def wrapper(*args, **kwargs):
+            chave = _chave(funcao, args, kwargs)
+            with _TRAVA:
+                entrada = _CACHE.get(chave)
+                if entrada is not None:
+                    entrada.acessado_em = time.monotonic()
+                    _CACHE.move_to_end(chave)
+
+            marcar_cache(entrada is not None)
+            if entrada is None:
+                return _carregar_uma_vez(chave, funcao, args, kwargs, ttl)
+
+            expirado = time.monotonic() - entrada.obtido_em > ttl
+            if expirado or _provisorio(entrada.valor):
+                with _TRAVA:
+                    disparar = chave not in _ATUALIZANDO
+                    _ATUALIZANDO.add(chave)
+                if disparar:
+                    threading.Thread(
+                        target=_revalidar,
+                        args=(chave, funcao, args, kwargs, ttl),
+                        name=f"revalidar-{funcao.__name__}",
+                        daemon=True,
+                    ).start()
+
+            return entrada.valor
+
+        return wrapper
+
+    return decorador
+
+
+def invalidar(predicado):
+    """
+    Descarta as entradas cujo valor satisfaz `predicado(valor)`; o próximo acesso
+    a elas recarrega os dados. Retorna a quantidade de entradas descartadas.
+    """
+    with _TRAVA:
+        chaves = [chave for chave, e in _CACHE.items() if predicado(e.valor)]
+        for chave in chaves:
+            del _CACHE[chave]
+    return len(chaves)
@@ -1,436 +1,710 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import io
+import logging
 import os
-from supabase import create_client, Client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.cache import cache_swr, invalidar
+from src.rastreamento import rastrear
+from src.metadados import registrar_metadados, versao_dataset
+from src.armazenamento import abrir_dataset_mapeado, mapear_dataset
+from src.particoes import CacheParticoes, concatenar_particoes
+from src.tipos import compactar_tipos
+from src.resiliencia import (
+    CHAVE_PROVISORIO,
+    CircuitoAberto,
+    Disjuntor,
+    e_falha_backend,
+    ler_snapshot,
+    salvar_snapshot,
+)
+from src.transporte import TIMEOUT_LEITURA, requisitar
+
+logger = logging.getLogger(__name__)
 
 # CONFIGURAÇÃO DA CONEXÃO SUPABASE ---
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-supabase_client: Client = None
 
-# Validação das variáveis de ambiente
-if not SUPABASE_URL or not SUPABASE_KEY:
-    print("Erro fatal: SUPABASE_URL or SUPABASE_KEY não estão definidas no ambiente.")
-    st.error(
-        "Erro de Configuração: As variáveis de ambiente SUPABASE_URL ou SUPABASE_KEY não foram encontradas."
+
+@st.cache_resource(show_spinner=False)
+def _criar_cliente_supabase(url, chave):
+    """
+    Cria o cliente Supabase uma única vez e o compartilha entre todas as sessões.
+
+    O pacote `supabase` é importado aqui, e não no topo do módulo, para que a
+    inicialização da aplicação não pague a sua importação nem a conexão.
+    Exceções não são cacheadas: uma falha é tentada de novo na próxima chamada.
+    """
+    from supabase import ClientOptions, create_client
+
+    cliente = create_client(
+        url, chave, options=ClientOptions(postgrest_client_timeout=TIMEOUT_LEITURA)
     )
-else:
+    print("Conexão com Supabase estabelecida para o data_loader.")
+    return cliente
+
+
+def obter_cliente_supabase():
+    """Retorna o cliente Supabase compartilhado, ou None se não for possível conectar."""
+    # Validação das variáveis de ambiente
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        print("Erro fatal: SUPABASE_URL or SUPABASE_KEY não estão definidas no ambiente.")
+        st.error(
+            "Erro de Configuração: As variáveis de ambiente SUPABASE_URL ou SUPABASE_KEY não foram encontradas."
+        )
+        return None
+
     try:
-        supabase_client = create_client(SUPABASE_URL, SUPABASE_KEY)
-        print("Conexão com Supabase estabelecida para o data_loader.")
+        return _criar_cliente_supabase(SUPABASE_URL, SUPABASE_KEY)
     except Exception as e:
         print(f"Erro ao conectar ao Supabase no data_loader: {e}")
         st.error(
             f"Falha ao conectar ao Supabase: {e}. Verifique as variáveis de ambiente SUPABASE_URL e SUPABASE_KEY."
         )
+        return None
 
 
 # FUNÇÕES AUXILIARES E CACHE
 
+# Após o TTL, os carregadores continuam servindo a versão em cache enquanto a
+# nova é buscada em segundo plano (ver src/cache.py).
 CACHE_TTL = 172800  # 48 horas
 
-# --- FUNÇÕES DE CARREGAMENTO DE DADOS (SUPABASE) ---
+# Com vários processos na mesma máquina, ASSINTECAL_DATASETS_MAPEADOS=1 grava cada
+# dataset em Arrow IPC e o abre via mmap, compartilhando a memória entre eles
+# (ver src/armazenamento.py).
+DATASETS_MAPEADOS = os.getenv("ASSINTECAL_DATASETS_MAPEADOS") == "1"
+
+# Manifesto publicado pelo ETL (update_data.py): uma linha por tabela com a versão,
+# o número de linhas e o último período. É consultado a cada MANIFESTO_TTL
+# segundos para invalidar apenas os datasets cuja versão mudou.
+TABELA_MANIFESTO = "assintecal_manifest"
+MANIFESTO_TTL = 60
+
+
+@st.cache_data(ttl=MANIFESTO_TTL, show_spinner=False)
+def carregar_manifesto():
+    """
+    Retorna o manifesto do ETL como dicionário {tabela: linha}. Em caso de erro
+    (sem conexão ou tabela ainda não criada) retorna um dicionário vazio, e o
+    cache passa a depender apenas do CACHE_TTL.
+    """
+    supabase_client = obter_cliente_supabase()
+    if not supabase_client:
+        return {}
+    try:
+        response = DISJUNTOR.executar(
+            supabase_client.table(TABELA_MANIFESTO).select("*").execute
+        )
+    except Exception as e:
+        print(f"Erro ao carregar o manifesto '{TABELA_MANIFESTO}': {e}")
+        return {}
+    return {linha["tabela"]: linha for linha in response.data}
 
 
-@st.cache_data(ttl=CACHE_TTL)
-def carregar_dados_producao(anos):
+def versao_tabela(nome_tabela):
+    """Versão atual da tabela no manifesto, ou None se não publicada."""
+    linha = carregar_manifesto().get(nome_tabela)
+    return linha["versao"] if linha else None
+
+
+# Versões do manifesto na última sincronização (None antes da primeira)
+_VERSOES_SINCRONIZADAS = None
+
+
+def sincronizar_com_manifesto():
+    """
+    Compara a versão de cada dataset em cache com a do manifesto e descarta os que
+    mudaram, para que sejam recarregados no próximo acesso. Datasets sem versão
+    registrada ou tabelas fora do manifesto são mantidos (valem o CACHE_TTL).
+
+    Quando o manifesto muda (nova carga do ETL), os resumos das tabelas da Home
+    (`_consultar_resumo_tabela`) também são descartados.
+    """
+    global _VERSOES_SINCRONIZADAS
+
+    manifesto = carregar_manifesto()
+    if not manifesto:
+        return 0
+
+    versoes = {tabela: linha["versao"] for tabela, linha in manifesto.items()}
+    if _VERSOES_SINCRONIZADAS is not None and versoes != _VERSOES_SINCRONIZADAS:
+        _consultar_resumo_tabela.clear()
+    _VERSOES_SINCRONIZADAS = versoes
+
+    def desatualizado(valor):
+        if not isinstance(valor, pd.DataFrame):
+            return False
+        registro = versao_dataset(valor)
+        if registro is None:
+            return False
+        tabela, versao = registro
+        linha = manifesto.get(tabela)
+        return versao is not None and linha is not None and linha["versao"] != versao
+
+    return invalidar(desatualizado)
+
+
+def adicionar_coluna_data(df):
+    """
+    Adiciona a coluna `data` (primeiro dia do mês) a partir de `ano` e `mes`.
+
+    Calculada uma única vez no carregamento, de forma vetorizada
+    (meses desde 1970 -> datetime64[M]), para que as funções de preparação e as
+    páginas não precisem reconstruir datas concatenando strings.
+    """
+    if df.empty or "ano" not in df.columns or "mes" not in df.columns:
+        return df
+
+    ano = pd.to_numeric(df["ano"], errors="coerce").to_numpy(dtype="float64")
+    mes = pd.to_numeric(df["mes"], errors="coerce").to_numpy(dtype="float64")
+    periodo = (ano - 1970) * 12 + mes - 1
+
+    validos = np.isfinite(periodo)
+    datas = np.full(len(df), np.datetime64("NaT"), dtype="datetime64[M]")
+    datas[validos] = periodo[validos].astype("int64").astype("datetime64[M]")
+
+    df["data"] = datas.astype("datetime64[ns]")
+    return df
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _consultar_resumo_tabela(nome_tabela, anos):
+    """
+    Último período e número de linhas de uma tabela fora do manifesto, com uma
+    consulta de uma única linha (ordenada por ano/mes) e contagem no servidor.
+    """
+    supabase_client = obter_cliente_supabase()
     if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_producao")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
+        return None
+    try:
+        response = (
+            supabase_client.table(nome_tabela)
+            .select("ano,mes", count="exact")
+            .in_("ano", list(anos))
+            .order("ano", desc=True)
+            .order("mes", desc=True)
+            .limit(1)
+            .execute()
+        )
+    except Exception as e:
+        print(f"Erro ao consultar o resumo da tabela '{nome_tabela}': {e}")
+        return None
+
+    ult_ano, ult_mes = None, None
+    if response.data:
+        ult_ano, ult_mes = int(response.data[0]["ano"]), int(response.data[0]["mes"])
+    return {
+        "tabela": nome_tabela,
+        "ult_ano": ult_ano,
+        "ult_mes": ult_mes,
+        "n_linhas": response.count,
+        "atualizado_em": None,
+    }
+
+
+def carregar_resumo_tabelas(nomes_tabelas, anos):
+    """
+    Resumo de cada tabela (último período, linhas e data de atualização) sem
+    carregar os dados: vem do manifesto do ETL e, para tabelas fora dele, de uma
+    consulta leve por tabela (feitas em paralelo).
+
+    Args:
+        nomes_tabelas: Nomes das tabelas no Supabase
+        anos: Anos considerados na consulta leve
+
+    Returns:
+        Dicionário {tabela: resumo}; o resumo é None se não foi possível obtê-lo.
+    """
+    manifesto = carregar_manifesto()
+    resumos = {nome: manifesto.get(nome) for nome in nomes_tabelas}
+
+    faltantes = [nome for nome, resumo in resumos.items() if resumo is None]
+    if faltantes:
+        with ThreadPoolExecutor(max_workers=min(8, len(faltantes))) as executor:
+            consultas = executor.map(
+                lambda nome: _consultar_resumo_tabela(nome, tuple(anos)), faltantes
+            )
+            resumos.update(zip(faltantes, consultas))
+
+    return resumos
+
+
+# Função Postgres criada pelo update_data.py (SQL_FUNCAO_AGREGAR_COMEX) que devolve
+# as tabelas de detalhe já agregadas por chave (país/SH6) e ano.
+FUNCAO_AGREGAR_COMEX = "assintecal_agregar_comex"
+MODOS_AGREGACAO = {"Mês": "mes", "Acumulado no Ano": "acumulado"}
+
+# A função só existe quando o ETL roda com SUPABASE_DB_URL (opcional). Após uma
+# resposta 4xx da RPC (ex: 404, função não criada), ela é dada como indisponível
+# por AGREGACAO_INDISPONIVEL_TTL segundos, sem novas tentativas nesse intervalo.
+AGREGACAO_INDISPONIVEL_TTL = 600
+_AGREGACAO_INDISPONIVEL_ATE = 0.0
+
+
+class AgregacaoIndisponivel(Exception):
+    """A RPC de agregação não existe (ou recusou a chamada) no Supabase."""
+
+
+def _cabecalhos_supabase(accept="application/json"):
+    """Cabeçalhos de autenticação do PostgREST para as requisições diretas."""
+    return {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Accept": accept,
+    }
+
+
+def _sondar_backend():
+    """Consulta barata (uma linha) usada para detectar a volta do backend."""
+    requisitar(
+        "GET",
+        f"{SUPABASE_URL}/rest/v1/assintecal_producao",
+        params={"select": "ano", "limit": 1},
+        headers=_cabecalhos_supabase(),
     )
-    return pd.DataFrame(response.data)
 
 
-@st.cache_data(ttl=CACHE_TTL)
-def carregar_dados_vendas(anos):
-    if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_vendas")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
+# Compartilhado por todas as leituras: com o backend fora do ar, as chamadas
+# falham na hora e os carregadores servem os snapshots salvos em disco.
+DISJUNTOR = Disjuntor(sonda=_sondar_backend)
+
+
+def _agregar_no_servidor(nome_tabela, anos, filtros, agregacao):
+    """
+    Chama a RPC de agregação e retorna o resultado em formato longo (chave, ano,
+    mes de referência, total). Erros (ex: função ainda não criada) são propagados
+    para que o chamador use o caminho em pandas; uma recusa 4xx marca a RPC como
+    indisponível por AGREGACAO_INDISPONIVEL_TTL segundos.
+    """
+    import httpx
+
+    global _AGREGACAO_INDISPONIVEL_ATE
+
+    chave, coluna_valor, view_mode = agregacao
+    coluna_tipo, categoria = next(iter(filtros.items()), (None, None))
+    try:
+        resposta = requisitar(
+            "POST",
+            f"{SUPABASE_URL}/rest/v1/rpc/{FUNCAO_AGREGAR_COMEX}",
+            headers=_cabecalhos_supabase(),
+            json={
+                "p_tabela": nome_tabela,
+                "p_chave": chave,
+                "p_coluna_valor": coluna_valor,
+                "p_modo": MODOS_AGREGACAO[view_mode],
+                "p_anos": list(anos),
+                "p_coluna_tipo": coluna_tipo,
+                "p_categoria": categoria,
+            },
+        )
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code >= 500:
+            raise
+        _AGREGACAO_INDISPONIVEL_ATE = time.monotonic() + AGREGACAO_INDISPONIVEL_TTL
+        logger.warning(
+            "RPC '%s' indisponível (%s); agregando em pandas pelos próximos %s s.",
+            FUNCAO_AGREGAR_COMEX,
+            e.response.status_code,
+            AGREGACAO_INDISPONIVEL_TTL,
+        )
+        raise AgregacaoIndisponivel(str(e)) from e
+    return pd.DataFrame(resposta.json(), columns=["chave", "ano", "mes", "total"])
+
+
+# Colunas lidas sempre como texto no CSV (evita, por ex., perder zeros à esquerda
+# de códigos SH6 na inferência de tipos)
+COLUNAS_TEXTO_CSV = (
+    "tipo",
+    "vertical",
+    "componente",
+    "pais",
+    "subclasse",
+    "grupo",
+    "descricao",
+    "id_sh6",
+    "descricao_sh6",
+    "trimestre_movel",
+)
+
+
+def _ler_tabela_csv(nome_tabela, anos, filtros):
+    """
+    Busca as linhas no PostgREST em formato CSV (`Accept: text/csv`) e as
+    decodifica com o leitor CSV multithread do pyarrow, que já produz colunas
+    tipadas, sem passar por uma lista de dicionários Python como no JSON.
+
+    Returns:
+        pyarrow.Table com as linhas (vazia se não houver nenhuma)
+    """
+    params = {"select": "*", "ano": f"in.({','.join(str(a) for a in anos)})"}
+    params.update({coluna: f"eq.{valor}" for coluna, valor in filtros.items()})
+    resposta = requisitar(
+        "GET",
+        f"{SUPABASE_URL}/rest/v1/{nome_tabela}",
+        params=params,
+        headers=_cabecalhos_supabase(accept="text/csv"),
     )
-    return pd.DataFrame(response.data)
+    return _decodificar_csv(resposta.content)
 
 
-@st.cache_data(ttl=CACHE_TTL)
-def carregar_dados_exp_calcados(anos):
-    if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_exp_calcados")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
+def _decodificar_csv(conteudo):
+    """Decodifica o CSV do PostgREST em uma pyarrow.Table (vazia se não há linhas)."""
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    if not conteudo.strip():
+        return pa.table({})
+
+    return pa_csv.read_csv(
+        io.BytesIO(conteudo),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={coluna: pa.string() for coluna in COLUNAS_TEXTO_CSV},
+            strings_can_be_null=True,
+        ),
     )
-    return pd.DataFrame(response.data)
 
 
-@st.cache_data(ttl=CACHE_TTL)
-def carregar_dados_imp_calcados(anos):
+def _ler_linhas(supabase_client, nome_tabela, anos, filtros):
+    """Lê as linhas em CSV; se o formato falhar (e não o backend), refaz em JSON."""
+    try:
+        return _ler_tabela_csv(nome_tabela, anos, filtros)
+    except Exception as e:
+        if e_falha_backend(e):
+            raise
+        print(f"Leitura em CSV de '{nome_tabela}' falhou ({e}); usando JSON.")
+        return _ler_tabela_json(supabase_client, nome_tabela, anos, filtros)
+
+
+def _ler_tabela_json(supabase_client, nome_tabela, anos, filtros):
+    """Busca as linhas pelo cliente Supabase (JSON); usado como alternativa ao CSV."""
+    import pyarrow as pa
+
+    consulta = supabase_client.table(nome_tabela).select("*").in_("ano", list(anos))
+    for coluna, valor in filtros.items():
+        consulta = consulta.eq(coluna, valor)
+    df = pd.DataFrame(consulta.execute().data)
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+# Partições anuais das linhas lidas (ver src/particoes.py)
+PARTICOES = CacheParticoes(ttl=CACHE_TTL)
+
+
+def _montar_de_particoes(supabase_client, nome_tabela, anos, filtros, versao):
+    """
+    Monta o DataFrame dos `anos` a partir das partições anuais em cache, buscando
+    no backend (em uma única requisição) apenas os anos que ainda faltam, e
+    compacta os tipos das colunas (ver src/tipos.py).
+    """
+    anos = list(dict.fromkeys(anos))
+    particoes = PARTICOES.buscar(nome_tabela, filtros, anos, versao)
+    faltantes = [ano for ano in anos if ano not in particoes]
+    if faltantes:
+        tabela = DISJUNTOR.executar(
+            _ler_linhas, supabase_client, nome_tabela, faltantes, filtros
+        )
+        particoes.update(
+            PARTICOES.guardar(nome_tabela, filtros, faltantes, versao, tabela)
+        )
+    df = concatenar_particoes([particoes[ano] for ano in anos])
+    rotulo = " | ".join([nome_tabela, *map(str, filtros.values())])
+    return adicionar_coluna_data(compactar_tipos(df, rotulo=rotulo))
+
+
+def _carregar_tabela(nome_tabela, anos, exibir_erro=True, filtros=None, agregacao=None):
+    """
+    Busca no Supabase as linhas de `nome_tabela` para os anos informados e
+    retorna um DataFrame com a coluna `data` já calculada e os metadados
+    (último período, anos, categorias e versão no manifesto) registrados.
+
+    `filtros` ({coluna: valor}) é aplicado no servidor com `.eq`, para trazer
+    apenas o recorte necessário (ex: uma vertical) das tabelas de detalhe.
+
+    Com `agregacao` = (chave, coluna_valor, view_mode), as linhas são agregadas no
+    servidor (RPC) e o retorno é a matriz em formato longo (chave, ano, mes, total).
+    Se a RPC foi recusada recentemente, levanta AgregacaoIndisponivel sem nova
+    chamada ao servidor.
+
+    As linhas são guardadas em partições anuais: apenas os anos ainda não
+    carregados são buscados. Elas são transferidas em CSV e decodificadas pelo
+    pyarrow; se essa leitura falhar, a busca é refeita em JSON.
+
+    Com DATASETS_MAPEADOS, o dataset é compartilhado com os demais processos por
+    um arquivo Arrow IPC mapeado em memória.
+
+    Cada leitura bem-sucedida é salva em disco como snapshot. Se o backend
+    estiver indisponível (ou o disjuntor aberto), o último snapshot é servido,
+    marcado com a data em que foi salvo; sem snapshot, retorna um DataFrame
+    vazio marcado como provisório.
+    """
+    filtros = filtros or {}
+    if agregacao is not None and time.monotonic() < _AGREGACAO_INDISPONIVEL_ATE:
+        raise AgregacaoIndisponivel(f"RPC '{FUNCAO_AGREGAR_COMEX}' indisponível.")
+    origem = (nome_tabela, tuple(anos), tuple(sorted(filtros.items())), agregacao)
+    supabase_client = obter_cliente_supabase()
     if not supabase_client:
+        return _servir_snapshot(nome_tabela, origem, agregacao, exibir_erro)
+
+    # Versão lida antes da busca: se o ETL publicar durante a busca, o dataset
+    # fica marcado com a versão antiga e é recarregado na próxima sincronização.
+    versao = versao_tabela(nome_tabela)
+    mapear = DATASETS_MAPEADOS and agregacao is None
+    if mapear:
+        df = abrir_dataset_mapeado((origem, versao), CACHE_TTL)
+        if df is not None:
+            return registrar_metadados(df, nome_tabela, origem=origem, versao=versao)
+    try:
+        if agregacao is not None:
+            df = DISJUNTOR.executar(
+                _agregar_no_servidor, nome_tabela, anos, filtros, agregacao
+            )
+        else:
+            df = _montar_de_particoes(
+                supabase_client, nome_tabela, anos, filtros, versao
+            )
+    except Exception as e:
+        if not (isinstance(e, CircuitoAberto) or e_falha_backend(e)):
+            raise
+        print(f"Backend indisponível ao carregar '{nome_tabela}': {e}")
+        return _servir_snapshot(nome_tabela, origem, agregacao, exibir_erro)
+
+    if mapear:
+        df = mapear_dataset((origem, versao), df, CACHE_TTL)
+    threading.Thread(
+        target=salvar_snapshot, args=(origem, df), name="snapshot", daemon=True
+    ).start()
+    return registrar_metadados(df, nome_tabela, origem=origem, versao=versao)
+
+
+def _servir_snapshot(nome_tabela, origem, agregacao, exibir_erro):
+    """
+    Retorna o último snapshot salvo de `origem`. Sem snapshot, a agregação no
+    servidor levanta CircuitoAberto (quem chamou recorre à tabela completa) e as
+    leituras de tabela retornam um DataFrame vazio marcado como provisório.
+    """
+    df = ler_snapshot(origem)
+    if df is not None:
+        return registrar_metadados(df, nome_tabela, origem=origem)
+    if agregacao is not None:
+        raise CircuitoAberto(f"Sem snapshot da agregação de '{nome_tabela}'.")
+    if exibir_erro:
         st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_imp_calcados")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
-    )
-    return pd.DataFrame(response.data)
+    df = pd.DataFrame()
+    df.attrs[CHAVE_PROVISORIO] = True
+    return df
+
+
+# --- FUNÇÕES DE CARREGAMENTO DE DADOS (SUPABASE) ---
+# As tabelas de detalhe (*_pais, *_sh6) aceitam `categoria` para carregar apenas
+# a vertical/componente selecionada e `agregacao` para receber a matriz já
+# agregada no servidor; cada recorte é cacheado separadamente.
+
+
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
+def carregar_dados_producao(anos):
+    return _carregar_tabela("assintecal_producao", anos)
+
+
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
+def carregar_dados_vendas(anos):
+    return _carregar_tabela("assintecal_vendas", anos)
+
 
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
+def carregar_dados_exp_calcados(anos):
+    return _carregar_tabela("assintecal_exp_calcados", anos)
 
-@st.cache_data(ttl=CACHE_TTL)
+
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
+def carregar_dados_imp_calcados(anos):
+    return _carregar_tabela("assintecal_imp_calcados", anos)
+
+
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
 def carregar_dados_emprego_calcados(anos):
-    if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_emprego_calcados")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
-    )
-    return pd.DataFrame(response.data)
+    return _carregar_tabela("assintecal_emprego_calcados", anos)
 
 
-@st.cache_data(ttl=CACHE_TTL)
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
 def carregar_dados_ipca_calcados(anos):
-    if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_ipca_calcados")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
-    )
-    return pd.DataFrame(response.data)
+    return _carregar_tabela("assintecal_ipca_calcados", anos)
 
 
-@st.cache_data(ttl=CACHE_TTL)
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
 def carregar_dados_exp_couro(anos):
-    if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_exp_couro")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
-    )
-    return pd.DataFrame(response.data)
+    return _carregar_tabela("assintecal_exp_couro", anos)
 
 
-@st.cache_data(ttl=CACHE_TTL)
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
 def carregar_dados_imp_couro(anos):
-    if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_imp_couro")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
-    )
-    return pd.DataFrame(response.data)
+    return _carregar_tabela("assintecal_imp_couro", anos)
 
 
-@st.cache_data(ttl=CACHE_TTL)
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
 def carregar_dados_emprego_couro(anos):
-    if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_emprego_couro")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
-    )
-    return pd.DataFrame(response.data)
+    return _carregar_tabela("assintecal_emprego_couro", anos)
 
 
 # --- FUNÇÕES DE CARREGAMENTO DE DADOS VERTICAIS ---
 
 
-@st.cache_data(ttl=CACHE_TTL)
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
 def carregar_dados_exp_vertical(anos):
-    if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_exp_vertical")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
-    )
-    return pd.DataFrame(response.data)
+    return _carregar_tabela("assintecal_exp_vertical", anos)
 
 
-@st.cache_data(ttl=CACHE_TTL)
-def carregar_dados_exp_vertical_pais(anos):
-    if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_exp_vertical_pais")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
+def carregar_dados_exp_vertical_pais(anos, categoria=None, agregacao=None):
+    filtros = {"vertical": categoria} if categoria else None
+    return _carregar_tabela(
+        "assintecal_exp_vertical_pais", anos, filtros=filtros, agregacao=agregacao
     )
-    return pd.DataFrame(response.data)
 
 
-@st.cache_data(ttl=CACHE_TTL)
-def carregar_dados_exp_vertical_sh6(anos):
-    if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_exp_vertical_sh6")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
+def carregar_dados_exp_vertical_sh6(anos, categoria=None, agregacao=None):
+    filtros = {"vertical": categoria} if categoria else None
+    return _carregar_tabela(
+        "assintecal_exp_vertical_sh6", anos, filtros=filtros, agregacao=agregacao
     )
-    return pd.DataFrame(response.data)
 
 
-@st.cache_data(ttl=CACHE_TTL)
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
 def carregar_dados_imp_vertical(anos):
-    if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_imp_vertical")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
-    )
-    return pd.DataFrame(response.data)
+    return _carregar_tabela("assintecal_imp_vertical", anos)
 
 
-@st.cache_data(ttl=CACHE_TTL)
-def carregar_dados_imp_vertical_pais(anos):
-    if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_imp_vertical_pais")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
+def carregar_dados_imp_vertical_pais(anos, categoria=None, agregacao=None):
+    filtros = {"vertical": categoria} if categoria else None
+    return _carregar_tabela(
+        "assintecal_imp_vertical_pais", anos, filtros=filtros, agregacao=agregacao
     )
-    return pd.DataFrame(response.data)
 
 
-@st.cache_data(ttl=CACHE_TTL)
-def carregar_dados_imp_vertical_sh6(anos):
-    if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_imp_vertical_sh6")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
+def carregar_dados_imp_vertical_sh6(anos, categoria=None, agregacao=None):
+    filtros = {"vertical": categoria} if categoria else None
+    return _carregar_tabela(
+        "assintecal_imp_vertical_sh6", anos, filtros=filtros, agregacao=agregacao
     )
-    return pd.DataFrame(response.data)
 
 
 # --- FUNÇÕES DE CARREGAMENTO DE DADOS COMPONENTES ---
 
 
-@st.cache_data(ttl=CACHE_TTL)
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
 def carregar_dados_exp_componente(anos):
-    if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_exp_componente")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
-    )
-    return pd.DataFrame(response.data)
+    return _carregar_tabela("assintecal_exp_componente", anos)
 
 
-@st.cache_data(ttl=CACHE_TTL)
-def carregar_dados_exp_componente_pais(anos):
-    if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_exp_componente_pais")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
+def carregar_dados_exp_componente_pais(anos, categoria=None, agregacao=None):
+    filtros = {"componente": categoria} if categoria else None
+    return _carregar_tabela(
+        "assintecal_exp_componente_pais", anos, filtros=filtros, agregacao=agregacao
     )
-    return pd.DataFrame(response.data)
 
 
-@st.cache_data(ttl=CACHE_TTL)
-def carregar_dados_exp_componente_sh6(anos):
-    if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_exp_componente_sh6")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
+def carregar_dados_exp_componente_sh6(anos, categoria=None, agregacao=None):
+    filtros = {"componente": categoria} if categoria else None
+    return _carregar_tabela(
+        "assintecal_exp_componente_sh6", anos, filtros=filtros, agregacao=agregacao
     )
-    return pd.DataFrame(response.data)
 
 
-@st.cache_data(ttl=CACHE_TTL)
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
 def carregar_dados_imp_componente(anos):
-    if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_imp_componente")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
-    )
-    return pd.DataFrame(response.data)
+    return _carregar_tabela("assintecal_imp_componente", anos)
 
 
-@st.cache_data(ttl=CACHE_TTL)
-def carregar_dados_imp_componente_pais(anos):
-    if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_imp_componente_pais")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
+def carregar_dados_imp_componente_pais(anos, categoria=None, agregacao=None):
+    filtros = {"componente": categoria} if categoria else None
+    return _carregar_tabela(
+        "assintecal_imp_componente_pais", anos, filtros=filtros, agregacao=agregacao
     )
-    return pd.DataFrame(response.data)
 
 
-@st.cache_data(ttl=CACHE_TTL)
-def carregar_dados_imp_componente_sh6(anos):
-    if not supabase_client:
-        st.error("Conexão com Supabase não estabelecida.")
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_imp_componente_sh6")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
+def carregar_dados_imp_componente_sh6(anos, categoria=None, agregacao=None):
+    filtros = {"componente": categoria} if categoria else None
+    return _carregar_tabela(
+        "assintecal_imp_componente_sh6", anos, filtros=filtros, agregacao=agregacao
     )
-    return pd.DataFrame(response.data)
 
 
-@st.cache_data(ttl=CACHE_TTL)
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
 def carregar_dados_ipca_geral(anos):
-    if not supabase_client:
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_ipca_geral")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
-    )
-    return pd.DataFrame(response.data)
+    return _carregar_tabela("assintecal_ipca_geral", anos, exibir_erro=False)
 
 
-@st.cache_data(ttl=CACHE_TTL)
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
 def carregar_dados_ind_transformacao(anos):
-    if not supabase_client:
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_ind_transformacao")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
-    )
-    return pd.DataFrame(response.data)
+    return _carregar_tabela("assintecal_ind_transformacao", anos, exibir_erro=False)
 
 
-@st.cache_data(ttl=CACHE_TTL)
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
 def carregar_dados_taxa_desemprego(anos):
-    if not supabase_client:
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_taxa_desemprego")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
-    )
-    return pd.DataFrame(response.data)
+    return _carregar_tabela("assintecal_taxa_desemprego", anos, exibir_erro=False)
 
 
-@st.cache_data(ttl=CACHE_TTL)
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
 def carregar_dados_ibc_br(anos):
-    if not supabase_client:
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_ibc_br")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
-    )
-    return pd.DataFrame(response.data)
+    return _carregar_tabela("assintecal_ibc_br", anos, exibir_erro=False)
 
 
-@st.cache_data(ttl=CACHE_TTL)
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
 def carregar_dados_taxa_cambio(anos):
-    if not supabase_client:
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_taxa_cambio")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
-    )
-    return pd.DataFrame(response.data)
+    return _carregar_tabela("assintecal_taxa_cambio", anos, exibir_erro=False)
 
 
-@st.cache_data(ttl=CACHE_TTL)
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
 def carregar_dados_expectativas(anos):
-    if not supabase_client:
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_expectativas")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
-    )
-    return pd.DataFrame(response.data)
+    return _carregar_tabela("assintecal_expectativas", anos, exibir_erro=False)
 
 
-@st.cache_data(ttl=CACHE_TTL)
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
 def carregar_dados_previsao_exportacao(anos):
-    if not supabase_client:
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_previsao_exportacao")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
-    )
-    return pd.DataFrame(response.data)
+    return _carregar_tabela("assintecal_previsao_exportacao", anos, exibir_erro=False)
 
 
-@st.cache_data(ttl=CACHE_TTL)
+@rastrear
+@cache_swr(ttl=CACHE_TTL)
 def carregar_dados_previsao_producao(anos):
-    if not supabase_client:
-        return pd.DataFrame()
-    response = (
-        supabase_client.table("assintecal_previsao_producao")
-        .select("*")
-        .in_("ano", list(anos))
-        .execute()
-    )
-    return pd.DataFrame(response.data)
+    return _carregar_tabela("assintecal_previsao_producao", anos, exibir_erro=False)
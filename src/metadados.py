@@ -0,0 +1,248 @@
+import datetime
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# =============================================================================
+# METADADOS DOS DATASETS
+# =============================================================================
+
+# Colunas de texto cujos valores distintos são expostos como listas de categorias
+COLUNAS_CATEGORIA = (
+    "tipo",
+    "vertical",
+    "componente",
+    "pais",
+    "subclasse",
+    "grupo",
+    "descricao",
+)
+
+# Chave em DataFrame.attrs que liga o DataFrame carregado aos seus metadados.
+# Guardamos apenas um identificador curto: o pandas copia os attrs a cada operação.
+CHAVE_ATTRS = "dataset_id"
+
+_REGISTRO = {}
+_ULTIMO_ID_POR_ORIGEM = {}
+
+# Objetos que podem usar os metadados registrados: o DataFrame devolvido pelo
+# data_loader (o mesmo que o cache entrega às páginas). Como o pandas propaga os
+# attrs, um DataFrame derivado (filtrado, reordenado, com colunas trocadas...)
+# herda o dataset_id mesmo com outras linhas; por ser outro objeto, ele não está
+# aqui e tem os metadados calculados na hora. Chave: id() do DataFrame
+# (DataFrames não são hasheáveis).
+_VINCULADOS = weakref.WeakValueDictionary()
+
+# Resultados derivados de cada dataset (ex: índices de categorias, séries dos
+# gráficos), por (dataset_id, chave). Calculados no primeiro uso e descartados
+# junto com o registro do dataset; acima de MAX_DERIVADOS, os usados há mais
+# tempo (LRU) saem primeiro.
+MAX_DERIVADOS = 128
+_DERIVADOS = OrderedDict()
+
+# Protege _REGISTRO, _ULTIMO_ID_POR_ORIGEM e _DERIVADOS (sessões em threads)
+_TRAVA = threading.Lock()
+
+
+@dataclass(frozen=True)
+class MetadadosDataset:
+    """Informações calculadas uma única vez no carregamento de um dataset."""
+
+    tabela: str
+    ult_ano: int | None
+    ult_mes: int | None
+    anos: tuple
+    categorias: dict
+    n_linhas: int
+    atualizado_em: datetime.datetime
+    versao: str | None = None
+
+
+def _calcular_ultimo_periodo(df):
+    """Último (ano, mes) do DataFrame em uma única passada, sem máscaras booleanas."""
+    if df.empty:
+        return None, None
+
+    if "data" in df.columns:
+        ultima_data = df["data"].max()
+        if pd.isna(ultima_data):
+            return None, None
+        return int(ultima_data.year), int(ultima_data.month)
+
+    ano = pd.to_numeric(df["ano"], errors="coerce").to_numpy(dtype="float64")
+    mes = pd.to_numeric(df["mes"], errors="coerce").to_numpy(dtype="float64")
+    periodo = ano * 12 + mes - 1
+    if not np.isfinite(periodo).any():
+        return None, None
+    ult_ano, ult_mes = divmod(int(np.nanmax(periodo)), 12)
+    return ult_ano, ult_mes + 1
+
+
+def calcular_metadados(df, tabela="", versao=None):
+    """Calcula os metadados (último período, anos, categorias e linhas) de um DataFrame."""
+    ult_ano, ult_mes = _calcular_ultimo_periodo(df)
+
+    anos = ()
+    if "ano" in df.columns:
+        anos = tuple(sorted(int(a) for a in df["ano"].dropna().unique()))
+
+    categorias = {
+        coluna: tuple(sorted(df[coluna].dropna().unique().tolist()))
+        for coluna in COLUNAS_CATEGORIA
+        if coluna in df.columns
+    }
+
+    return MetadadosDataset(
+        tabela=tabela,
+        ult_ano=ult_ano,
+        ult_mes=ult_mes,
+        anos=anos,
+        categorias=categorias,
+        n_linhas=len(df),
+        atualizado_em=datetime.datetime.now(),
+        versao=versao,
+    )
+
+
+def registrar_metadados(df, tabela, origem=None, versao=None):
+    """
+    Calcula os metadados de um DataFrame recém-carregado, registra-os e liga o
+    DataFrame a eles via `df.attrs`. Um novo carregamento da mesma origem
+    (tabela + filtros) substitui o registro anterior. `versao` é a versão da
+    tabela no manifesto do ETL no momento do carregamento.
+    """
+    metadados = calcular_metadados(df, tabela, versao)
+    origem = origem if origem is not None else tabela
+    dataset_id = f"{origem}@{metadados.atualizado_em.isoformat()}"
+
+    with _TRAVA:
+        id_anterior = _ULTIMO_ID_POR_ORIGEM.get(origem)
+        if id_anterior is not None:
+            _REGISTRO.pop(id_anterior, None)
+            for chave in [chave for chave in _DERIVADOS if chave[0] == id_anterior]:
+                del _DERIVADOS[chave]
+        _ULTIMO_ID_POR_ORIGEM[origem] = dataset_id
+        _REGISTRO[dataset_id] = metadados
+
+    df.attrs[CHAVE_ATTRS] = dataset_id
+    _VINCULADOS[id(df)] = df
+    return df
+
+
+def _vinculado(df):
+    """Indica se `df` é o próprio DataFrame registrado."""
+    return _VINCULADOS.get(id(df)) is df
+
+
+def _metadados_registrados(df):
+    """
+    Retorna os metadados registrados do DataFrame, ou None se ele não é o
+    DataFrame carregado pelo data_loader, mesmo que tenha herdado o dataset_id
+    nos attrs.
+    """
+    if not _vinculado(df):
+        return None
+    metadados = _REGISTRO.get(df.attrs.get(CHAVE_ATTRS))
+    if metadados is None or metadados.n_linhas != len(df):
+        return None
+    return metadados
+
+
+def versao_dataset(df):
+    """
+    Retorna (tabela, versao) do DataFrame conforme registrado no carregamento, ou
+    None se ele não tem metadados registrados.
+    """
+    metadados = _metadados_registrados(df)
+    if metadados is None:
+        return None
+    return metadados.tabela, metadados.versao
+
+
+def ultimo_periodo(df):
+    """Retorna (ult_ano, ult_mes) do DataFrame."""
+    metadados = _metadados_registrados(df)
+    if metadados is not None:
+        return metadados.ult_ano, metadados.ult_mes
+    return _calcular_ultimo_periodo(df)
+
+
+def listar_anos(df):
+    """Retorna a lista ordenada de anos presentes no DataFrame."""
+    metadados = _metadados_registrados(df)
+    if metadados is not None:
+        return list(metadados.anos)
+    return sorted(df["ano"].unique().tolist())
+
+
+def listar_categorias(df, coluna):
+    """Retorna a lista ordenada de valores distintos de uma coluna de categoria."""
+    metadados = _metadados_registrados(df)
+    if metadados is not None and coluna in metadados.categorias:
+        return list(metadados.categorias[coluna])
+    return sorted(df[coluna].unique().tolist())
+
+
+def derivado_do_dataset(df, chave, calcular):
+    """
+    Retorna `calcular(df)` memorizado para o dataset carregado: a cada nova versão
+    do dataset o cálculo é refeito uma única vez. DataFrames sem metadados
+    registrados (ex: recortes, ordenações) são calculados a cada chamada.
+
+    Args:
+        df: DataFrame carregado pelo data_loader
+        chave: Identificador (hasheável) do resultado
+        calcular: Função que recebe o DataFrame e retorna o resultado
+    """
+    if _metadados_registrados(df) is None:
+        return calcular(df)
+    dataset_id = df.attrs[CHAVE_ATTRS]
+    chave = (dataset_id, chave)
+    with _TRAVA:
+        resultado = _DERIVADOS.get(chave)
+        if resultado is not None:
+            _DERIVADOS.move_to_end(chave)
+            return resultado
+
+    # Calculado fora da trava; em chamadas simultâneas, fica o primeiro resultado
+    resultado = calcular(df)
+    with _TRAVA:
+        if dataset_id not in _REGISTRO:
+            # Dataset substituído durante o cálculo: não guarda o resultado
+            return resultado
+        resultado = _DERIVADOS.setdefault(chave, resultado)
+        _DERIVADOS.move_to_end(chave)
+        while len(_DERIVADOS) > MAX_DERIVADOS:
+            _DERIVADOS.popitem(last=False)
+    return resultado
+
+
+def indice_categoria(df, coluna):
+    """
+    Retorna {valor: posições das linhas} da coluna de categoria, construído uma
+    única vez por dataset carregado (groupby().indices). Retorna None se o
+    DataFrame não tem metadados registrados (ex: já é um recorte ou foi
+    reordenado), pois as posições não valeriam para as linhas dele.
+    """
+    if _metadados_registrados(df) is None:
+        return None
+    return derivado_do_dataset(
+        df,
+        ("indice", coluna),
+        lambda df: df.groupby(coluna, observed=True, sort=False).indices,
+    )
+
+
+def filtrar_categoria(df, coluna, valor):
+    """
+    Linhas do DataFrame em que `coluna` == `valor`. Para datasets registrados, usa
+    as posições pré-calculadas em vez de comparar a coluna inteira.
+    """
+    indice = indice_categoria(df, coluna)
+    if indice is None:
+        return df[df[coluna] == valor]
+    return df.take(indice.get(valor, np.empty(0, dtype="int64")))
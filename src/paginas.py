@@ -0,0 +1,317 @@
+import hmac
+import os
+from functools import partial
+
+import streamlit as st
+
+from src.config import anos_de_interesse
+from src.utils import exibir_aviso_dados_salvos
+
+# =============================================================================
+# PÁGINAS DA APLICAÇÃO (st.navigation)
+# =============================================================================
+# Cada página importa o seu módulo de views e carrega apenas os próprios dados no
+# momento em que é aberta. Assim, o início da aplicação não paga a importação de
+# todas as views, e trocar de página não toca nos dados das outras. As tabelas de
+# detalhe (país/SH6) são passadas como funções de carregamento e só são buscadas
+# quando o usuário abre a visualização correspondente.
+
+MENSAGEM_CARREGANDO = "Carregando os dados da página... Por favor, aguarde."
+
+# A página de diagnóstico só entra no menu de sessões abertas com ?admin=<token>
+TOKEN_ADMIN = os.getenv("ASSINTECAL_TOKEN_ADMIN")
+
+
+def pagina_home():
+    """Página inicial: datas de atualização de cada conjunto de dados (só metadados)."""
+    from src import data_loader as dl
+    from views.home import TABELAS_HOME, show_page_home
+
+    resumos = dl.carregar_resumo_tabelas(TABELAS_HOME, anos_de_interesse)
+    show_page_home(resumos)
+
+
+def pagina_calcados():
+    """Página do setor de Calçados."""
+    from src import data_loader as dl
+    from views.calcados import show_page_calcados
+
+    with st.spinner(MENSAGEM_CARREGANDO):
+        dados = dict(
+            df_producao=dl.carregar_dados_producao(anos=anos_de_interesse),
+            df_vendas=dl.carregar_dados_vendas(anos=anos_de_interesse),
+            df_exp_calcados=dl.carregar_dados_exp_calcados(anos=anos_de_interesse),
+            df_imp_calcados=dl.carregar_dados_imp_calcados(anos=anos_de_interesse),
+            df_emprego_calcados=dl.carregar_dados_emprego_calcados(
+                anos=anos_de_interesse
+            ),
+            df_ipca_calcados=dl.carregar_dados_ipca_calcados(anos=anos_de_interesse),
+            df_previsao_exportacao=dl.carregar_dados_previsao_exportacao(
+                anos=anos_de_interesse
+            ),
+            df_previsao_producao=dl.carregar_dados_previsao_producao(
+                anos=anos_de_interesse
+            ),
+        )
+
+    exibir_aviso_dados_salvos(dados.values())
+    show_page_calcados(**dados)
+
+
+def pagina_couro():
+    """Página do setor de Couro."""
+    from src import data_loader as dl
+    from views.couro import show_page_couro
+
+    with st.spinner(MENSAGEM_CARREGANDO):
+        dados = dict(
+            df_producao=dl.carregar_dados_producao(anos=anos_de_interesse),
+            df_exp_couro=dl.carregar_dados_exp_couro(anos=anos_de_interesse),
+            df_imp_couro=dl.carregar_dados_imp_couro(anos=anos_de_interesse),
+            df_emprego_couro=dl.carregar_dados_emprego_couro(anos=anos_de_interesse),
+        )
+
+    exibir_aviso_dados_salvos(dados.values())
+    show_page_couro(**dados)
+
+
+def pagina_vertical():
+    """Página de Comércio Exterior por Vertical."""
+    from src import data_loader as dl
+    from views.vertical import show_page_vertical
+
+    with st.spinner(MENSAGEM_CARREGANDO):
+        dados = dict(
+            df_exp_vertical=dl.carregar_dados_exp_vertical(anos=anos_de_interesse),
+            carregar_exp_vertical_pais=partial(
+                dl.carregar_dados_exp_vertical_pais, anos=anos_de_interesse
+            ),
+            carregar_exp_vertical_sh6=partial(
+                dl.carregar_dados_exp_vertical_sh6, anos=anos_de_interesse
+            ),
+            df_imp_vertical=dl.carregar_dados_imp_vertical(anos=anos_de_interesse),
+            carregar_imp_vertical_pais=partial(
+                dl.carregar_dados_imp_vertical_pais, anos=anos_de_interesse
+            ),
+            carregar_imp_vertical_sh6=partial(
+                dl.carregar_dados_imp_vertical_sh6, anos=anos_de_interesse
+            ),
+        )
+
+    exibir_aviso_dados_salvos(dados.values())
+    show_page_vertical(**dados)
+
+
+def pagina_componente():
+    """Página de Comércio Exterior por Componente."""
+    from src import data_loader as dl
+    from views.componente import show_page_componente
+
+    with st.spinner(MENSAGEM_CARREGANDO):
+        dados = dict(
+            df_exp_componente=dl.carregar_dados_exp_componente(
+                anos=anos_de_interesse
+            ),
+            carregar_exp_componente_pais=partial(
+                dl.carregar_dados_exp_componente_pais, anos=anos_de_interesse
+            ),
+            carregar_exp_componente_sh6=partial(
+                dl.carregar_dados_exp_componente_sh6, anos=anos_de_interesse
+            ),
+            df_imp_componente=dl.carregar_dados_imp_componente(
+                anos=anos_de_interesse
+            ),
+            carregar_imp_componente_pais=partial(
+                dl.carregar_dados_imp_componente_pais, anos=anos_de_interesse
+            ),
+            carregar_imp_componente_sh6=partial(
+                dl.carregar_dados_imp_componente_sh6, anos=anos_de_interesse
+            ),
+        )
+
+    exibir_aviso_dados_salvos(dados.values())
+    show_page_componente(**dados)
+
+
+def pagina_macroeconomia():
+    """Página de indicadores macroeconômicos."""
+    from src import data_loader as dl
+    from views.macroeconomia import show_page_macroeconomia
+
+    with st.spinner(MENSAGEM_CARREGANDO):
+        dados = dict(
+            df_ibc_br=dl.carregar_dados_ibc_br(anos=anos_de_interesse),
+            df_expectativas=dl.carregar_dados_expectativas(anos=anos_de_interesse),
+            df_ipca_geral=dl.carregar_dados_ipca_geral(anos=anos_de_interesse),
+            df_taxa_cambio=dl.carregar_dados_taxa_cambio(anos=anos_de_interesse),
+            df_ind_transformacao=dl.carregar_dados_ind_transformacao(
+                anos=anos_de_interesse
+            ),
+            df_taxa_desemprego=dl.carregar_dados_taxa_desemprego(
+                anos=anos_de_interesse
+            ),
+        )
+
+    exibir_aviso_dados_salvos(dados.values())
+    show_page_macroeconomia(**dados)
+
+
+def pagina_dados():
+    """Página de download de todos os conjuntos de dados."""
+    from src import data_loader as dl
+    from views.dados import show_page_dados
+
+    with st.spinner(MENSAGEM_CARREGANDO):
+        dados = dict(
+            df_producao=dl.carregar_dados_producao(anos=anos_de_interesse),
+            df_vendas=dl.carregar_dados_vendas(anos=anos_de_interesse),
+            df_exp_calcados=dl.carregar_dados_exp_calcados(anos=anos_de_interesse),
+            df_imp_calcados=dl.carregar_dados_imp_calcados(anos=anos_de_interesse),
+            df_emprego_calcados=dl.carregar_dados_emprego_calcados(
+                anos=anos_de_interesse
+            ),
+            df_ipca_calcados=dl.carregar_dados_ipca_calcados(anos=anos_de_interesse),
+            df_previsao_exportacao=dl.carregar_dados_previsao_exportacao(
+                anos=anos_de_interesse
+            ),
+            df_previsao_producao=dl.carregar_dados_previsao_producao(
+                anos=anos_de_interesse
+            ),
+            df_exp_couro=dl.carregar_dados_exp_couro(anos=anos_de_interesse),
+            df_imp_couro=dl.carregar_dados_imp_couro(anos=anos_de_interesse),
+            df_emprego_couro=dl.carregar_dados_emprego_couro(anos=anos_de_interesse),
+            df_exp_vertical=dl.carregar_dados_exp_vertical(anos=anos_de_interesse),
+            df_exp_vertical_pais=dl.carregar_dados_exp_vertical_pais(
+                anos=anos_de_interesse
+            ),
+            df_exp_vertical_sh6=dl.carregar_dados_exp_vertical_sh6(
+                anos=anos_de_interesse
+            ),
+            df_imp_vertical=dl.carregar_dados_imp_vertical(anos=anos_de_interesse),
+            df_imp_vertical_pais=dl.carregar_dados_imp_vertical_pais(
+                anos=anos_de_interesse
+            ),
+            df_imp_vertical_sh6=dl.carregar_dados_imp_vertical_sh6(
+                anos=anos_de_interesse
+            ),
+            df_exp_componente=dl.carregar_dados_exp_componente(
+                anos=anos_de_interesse
+            ),
+            df_exp_componente_pais=dl.carregar_dados_exp_componente_pais(
+                anos=anos_de_interesse
+            ),
+            df_exp_componente_sh6=dl.carregar_dados_exp_componente_sh6(
+                anos=anos_de_interesse
+            ),
+            df_imp_componente=dl.carregar_dados_imp_componente(
+                anos=anos_de_interesse
+            ),
+            df_imp_componente_pais=dl.carregar_dados_imp_componente_pais(
+                anos=anos_de_interesse
+            ),
+            df_imp_componente_sh6=dl.carregar_dados_imp_componente_sh6(
+                anos=anos_de_interesse
+            ),
+            df_ibc_br=dl.carregar_dados_ibc_br(anos=anos_de_interesse),
+            df_expectativas=dl.carregar_dados_expectativas(anos=anos_de_interesse),
+            df_ipca_geral=dl.carregar_dados_ipca_geral(anos=anos_de_interesse),
+            df_taxa_cambio=dl.carregar_dados_taxa_cambio(anos=anos_de_interesse),
+            df_ind_transformacao=dl.carregar_dados_ind_transformacao(
+                anos=anos_de_interesse
+            ),
+            df_taxa_desemprego=dl.carregar_dados_taxa_desemprego(
+                anos=anos_de_interesse
+            ),
+        )
+
+    exibir_aviso_dados_salvos(dados.values())
+    show_page_dados(**dados)
+
+
+def pagina_diagnostico():
+    """Página de diagnóstico: tempos de renderização, conexões, disjuntor e memória."""
+    from src import data_loader as dl
+    from src.tipos import relatorio_memoria
+    from src.transporte import estatisticas_transporte
+    from views.diagnostico import show_page_diagnostico
+
+    show_page_diagnostico(
+        estatisticas_transporte=estatisticas_transporte(),
+        estado_disjuntor=dl.DISJUNTOR.estado(),
+        relatorio_memoria=relatorio_memoria(),
+    )
+
+
+# Páginas registradas no menu, na ordem de exibição. A chave é o título da página.
+PAGINAS = {
+    "Home": st.Page(
+        pagina_home,
+        title="Home",
+        icon=":material/home:",
+        url_path="home",
+        default=True,
+    ),
+    "Calçados": st.Page(
+        pagina_calcados,
+        title="Calçados",
+        icon=":material/inventory_2:",
+        url_path="calcados",
+    ),
+    "Couro": st.Page(
+        pagina_couro,
+        title="Couro",
+        icon=":material/layers:",
+        url_path="couro",
+    ),
+    "Vertical": st.Page(
+        pagina_vertical,
+        title="Vertical",
+        icon=":material/bar_chart:",
+        url_path="vertical",
+    ),
+    "Componente": st.Page(
+        pagina_componente,
+        title="Componente",
+        icon=":material/extension:",
+        url_path="componente",
+    ),
+    "Macroeconomia": st.Page(
+        pagina_macroeconomia,
+        title="Macroeconomia",
+        icon=":material/trending_up:",
+        url_path="macroeconomia",
+    ),
+    "Dados": st.Page(
+        pagina_dados,
+        title="Dados",
+        icon=":material/download:",
+        url_path="dados",
+    ),
+}
+
+PAGINA_DIAGNOSTICO = st.Page(
+    pagina_diagnostico,
+    title="Diagnóstico",
+    icon=":material/monitoring:",
+    url_path="diagnostico",
+)
+
+
+def sessao_admin():
+    """
+    Indica se a sessão é de administrador: aberta com ?admin=<ASSINTECAL_TOKEN_ADMIN>
+    (a marca fica na sessão ao navegar entre as páginas). Sem token configurado,
+    nenhuma sessão é de administrador.
+    """
+    token = st.query_params.get("admin")
+    if TOKEN_ADMIN and token and hmac.compare_digest(token, TOKEN_ADMIN):
+        st.session_state["admin"] = True
+    return st.session_state.get("admin", False)
+
+
+def paginas_da_sessao():
+    """Páginas do menu para a sessão atual (com Diagnóstico para administradores)."""
+    paginas = list(PAGINAS.values())
+    if sessao_admin():
+        paginas.append(PAGINA_DIAGNOSTICO)
+    return paginas
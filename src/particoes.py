@@ -0,0 +1,127 @@
+import time
+
+import pandas as pd
+
+from src.armazenamento import criar_armazenamento
+
+# =============================================================================
+# CACHE DE PARTIÇÕES POR ANO
+# =============================================================================
+# As linhas de cada tabela ficam guardadas por (tabela, filtros, ano) como tabelas
+# Arrow. Um pedido para qualquer intervalo de anos é montado a partir das
+# partições já obtidas, e apenas os anos que faltam são buscados no backend (em
+# uma única requisição). Assim, deslocar `anos_de_interesse` (ex: 2021..2025 para
+# 2022..2026) busca só o ano novo.
+#
+# A montagem concatena as partições sem copiá-las (pa.concat_tables apenas
+# encadeia os blocos) e converte para pandas uma única vez.
+#
+# As partições ficam no backend de src/armazenamento.py (memória, disco ou Redis),
+# o que permite que várias réplicas do dashboard compartilhem o cache aquecido. A
+# versão do manifesto e o instante da busca (relógio de parede, comum a todos os
+# processos) vão nos metadados do schema Arrow de cada partição.
+#
+# Um ano sem linhas só fica guardado pelo TTL completo se for anterior ao último
+# ano presente na tabela (ano realmente vazio). Anos vazios a partir dele (dado
+# ainda não publicado ou resposta degradada do backend) valem TTL_PARTICAO_VAZIA,
+# para que uma falha transitória não esconda o ano por dois dias.
+
+METADADO_VERSAO = b"assintecal_versao"
+METADADO_OBTIDO_EM = b"assintecal_obtido_em"
+METADADO_TTL = b"assintecal_ttl"
+
+TTL_PARTICAO_VAZIA = 300  # segundos
+
+
+class CacheParticoes:
+    """
+    Partições anuais das tabelas, válidas por `ttl` segundos ou até o manifesto
+    publicar uma nova versão da tabela.
+
+    Args:
+        ttl: Tempo (em segundos) após o qual a partição é buscada novamente
+        armazenamento: Backend das partições (padrão: o configurado no ambiente)
+    """
+
+    def __init__(self, ttl, armazenamento=None):
+        self.ttl = ttl
+        self.armazenamento = armazenamento or criar_armazenamento()
+
+    @staticmethod
+    def _chave(nome_tabela, filtros, ano):
+        return (nome_tabela, tuple(sorted(filtros.items())), ano)
+
+    def buscar(self, nome_tabela, filtros, anos, versao=None):
+        """
+        Retorna {ano: pyarrow.Table} com as partições válidas entre `anos`.
+        Partições expiradas ou de outra versão da tabela são ignoradas.
+        """
+        agora = time.time()
+        encontradas = {}
+        for ano in anos:
+            tabela = self.armazenamento.ler(self._chave(nome_tabela, filtros, ano))
+            if tabela is None:
+                continue
+            metadados = tabela.schema.metadata or {}
+            obtido_em = float(metadados.get(METADADO_OBTIDO_EM, 0))
+            ttl = float(metadados.get(METADADO_TTL, self.ttl))
+            if agora - obtido_em > ttl:
+                continue
+            versao_particao = metadados.get(METADADO_VERSAO, b"").decode()
+            if versao is not None and versao_particao != versao:
+                continue
+            encontradas[ano] = tabela
+        return encontradas
+
+    def guardar(self, nome_tabela, filtros, anos, versao, tabela):
+        """
+        Divide `tabela` (linhas dos `anos` informados) em partições anuais e as
+        guarda. Anos sem linhas também são guardados, como partições vazias; as
+        de anos a partir do último ano com dados valem apenas TTL_PARTICAO_VAZIA.
+
+        Returns:
+            Dicionário {ano: pyarrow.Table} com as partições guardadas
+        """
+        import pyarrow.compute as pc
+
+        metadados = dict(tabela.schema.metadata or {})
+        metadados[METADADO_OBTIDO_EM] = str(time.time()).encode()
+        if versao is not None:
+            metadados[METADADO_VERSAO] = versao.encode()
+        tabela = tabela.replace_schema_metadata(metadados)
+        tem_ano = "ano" in tabela.column_names
+        ultimo_ano = pc.max(tabela["ano"]).as_py() if tem_ano else None
+
+        particoes = {}
+        for ano in anos:
+            if tem_ano:
+                parte = tabela.filter(pc.equal(tabela["ano"], ano))
+            else:
+                parte = tabela.slice(0, 0)
+            ttl = self.ttl
+            if parte.num_rows == 0 and (ultimo_ano is None or ano >= ultimo_ano):
+                ttl = min(self.ttl, TTL_PARTICAO_VAZIA)
+            parte = parte.replace_schema_metadata(
+                {**metadados, METADADO_TTL: str(ttl).encode()}
+            )
+            chave = self._chave(nome_tabela, filtros, ano)
+            try:
+                self.armazenamento.gravar(chave, parte, ttl)
+            except Exception as e:
+                print(f"Erro ao gravar a partição {chave}: {e}")
+            particoes[ano] = parte
+        return particoes
+
+
+def concatenar_particoes(partes):
+    """
+    Junta as partições (na ordem recebida) em um único DataFrame, com uma única
+    cópia na conversão para pandas. Colunas ausentes ou de tipos diferentes entre
+    anos (ex: coluna toda nula em um ano) são unificadas pelo pyarrow.
+    """
+    import pyarrow as pa
+
+    partes = [parte for parte in partes if parte.num_rows]
+    if not partes:
+        return pd.DataFrame()
+    return pa.concat_tables(partes, promote_options="permissive").to_pandas()
@@ -0,0 +1,189 @@
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+import pandas as pd
+
+# =============================================================================
+# RASTREAMENTO DO TEMPO DE RENDERIZAÇÃO
+# =============================================================================
+# Mede cada chamada dos carregadores, das funções de preparação, dos gráficos e
+# das páginas: tempo, acerto/falha de cache, linhas de entrada/saída e (no modo
+# "memoria") bytes alocados. Os registros ficam num buffer circular exibido na
+# página de diagnóstico e exportável em JSON.
+#
+# Ligado por ASSINTECAL_RASTREAMENTO=1 (ou "memoria", que também liga o
+# tracemalloc). Desligado, `rastrear` devolve a própria função (apenas com o
+# cache pedido em `cache=`, se houver): custo zero.
+
+MODO = os.getenv("ASSINTECAL_RASTREAMENTO", "").lower()
+RASTREAMENTO_ATIVO = MODO in ("1", "memoria")
+MEDIR_MEMORIA = MODO == "memoria"
+TAMANHO_BUFFER = int(os.getenv("ASSINTECAL_RASTREAMENTO_BUFFER", "2000"))
+
+_REGISTROS = deque(maxlen=TAMANHO_BUFFER)
+_TRAVA = threading.Lock()
+_LOCAL = threading.local()
+
+if MEDIR_MEMORIA:
+    tracemalloc.start()
+
+
+def _contar_linhas(valor):
+    """Total de linhas dos DataFrames em `valor` (também dentro de tuplas/dicts)."""
+    if isinstance(valor, pd.DataFrame):
+        return len(valor)
+    if isinstance(valor, dict):
+        valor = tuple(valor.values())
+    if isinstance(valor, (tuple, list)):
+        contagens = [_contar_linhas(item) for item in valor]
+        contagens = [c for c in contagens if c is not None]
+        return sum(contagens) if contagens else None
+    return None
+
+
+class Trecho:
+    """
+    Context manager que mede um trecho de código e grava o registro no buffer.
+    Os atributos `cache`, `linhas_entrada` e `linhas_saida` podem ser preenchidos
+    dentro do bloco.
+    """
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.cache = None
+        self.linhas_entrada = None
+        self.linhas_saida = None
+
+    def __enter__(self):
+        pilha = getattr(_LOCAL, "pilha", None)
+        if pilha is None:
+            pilha = _LOCAL.pilha = []
+        pilha.append(self)
+        self._inicio_em = datetime.datetime.now()
+        if MEDIR_MEMORIA:
+            self._memoria_inicial = tracemalloc.get_traced_memory()[0]
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo_erro, erro, _rastro):
+        duracao = time.perf_counter() - self._inicio
+        _LOCAL.pilha.pop()
+        registro = {
+            "nome": self.nome,
+            "inicio": self._inicio_em.isoformat(timespec="milliseconds"),
+            "duracao_ms": round(duracao * 1000, 2),
+            "cache": self.cache,
+            "linhas_entrada": self.linhas_entrada,
+            "linhas_saida": self.linhas_saida,
+            # Aproximado: inclui alocações de outras threads no mesmo intervalo
+            "bytes_alocados": (
+                tracemalloc.get_traced_memory()[0] - self._memoria_inicial
+                if MEDIR_MEMORIA
+                else None
+            ),
+            "erro": tipo_erro.__name__ if tipo_erro is not None else None,
+            "thread": threading.current_thread().name,
+        }
+        with _TRAVA:
+            _REGISTROS.append(registro)
+        return False
+
+
+def marcar_cache(acerto):
+    """Marca o trecho em andamento nesta thread como acerto (True) ou falha de cache."""
+    if not RASTREAMENTO_ATIVO:
+        return
+    pilha = getattr(_LOCAL, "pilha", None)
+    if pilha:
+        pilha[-1].cache = "acerto" if acerto else "falha"
+
+
+def rastrear(funcao=None, *, nome=None, cache=None):
+    """
+    Decorador que registra cada chamada da função no buffer de rastreamento.
+    Com o rastreamento desligado, retorna a própria função (ou `cache(funcao)`).
+
+    Com `cache` (ex: `st.cache_data`), a função é cacheada por ele e o registro
+    indica acerto ou falha de cache: o corpo da função só executa numa falha e a
+    marca no trecho; se a chamada termina sem essa marca, foi um acerto.
+
+    Args:
+        funcao: Função decorada (permite usar `@rastrear` sem parênteses)
+        nome: Nome do registro (padrão: nome qualificado da função)
+        cache: Decorador de cache aplicado à função (ex: st.cache_data)
+    """
+
+    def decorador(funcao):
+        if not RASTREAMENTO_ATIVO:
+            return cache(funcao) if cache is not None else funcao
+        rotulo = nome or funcao.__qualname__
+        chamar = funcao
+        if cache is not None:
+
+            @functools.wraps(funcao)
+            def corpo(*args, **kwargs):
+                marcar_cache(False)
+                return funcao(*args, **kwargs)
+
+            chamar = cache(corpo)
+
+        @functools.wraps(funcao)
+        def wrapper(*args, **kwargs):
+            with Trecho(rotulo) as trecho:
+                trecho.linhas_entrada = _contar_linhas((*args, *kwargs.values()))
+                resultado = chamar(*args, **kwargs)
+                if cache is not None and trecho.cache is None:
+                    trecho.cache = "acerto"
+                trecho.linhas_saida = _contar_linhas(resultado)
+                return resultado
+
+        if hasattr(chamar, "clear"):
+            wrapper.clear = chamar.clear
+        return wrapper
+
+    return decorador(funcao) if funcao is not None else decorador
+
+
+def registros_rastreamento():
+    """Cópia dos registros do buffer, do mais antigo para o mais recente."""
+    with _TRAVA:
+        return list(_REGISTROS)
+
+
+def resumo_rastreamento():
+    """
+    Resumo por função: chamadas, tempos (médio, p95, máximo, total), taxa de
+    acerto de cache e linhas médias de saída, ordenado pelo tempo total.
+    """
+    registros = pd.DataFrame(registros_rastreamento())
+    if registros.empty:
+        return registros
+
+    registros["acerto"] = registros["cache"].map({"acerto": 1.0, "falha": 0.0})
+    resumo = registros.groupby("nome").agg(
+        chamadas=("duracao_ms", "size"),
+        media_ms=("duracao_ms", "mean"),
+        p95_ms=("duracao_ms", lambda d: d.quantile(0.95)),
+        max_ms=("duracao_ms", "max"),
+        total_ms=("duracao_ms", "sum"),
+        taxa_acerto_cache=("acerto", "mean"),
+        linhas_saida_media=("linhas_saida", "mean"),
+    )
+    return resumo.sort_values("total_ms", ascending=False).round(2).reset_index()
+
+
+def exportar_rastreamento_json():
+    """Registros do buffer em JSON (para download na página de diagnóstico)."""
+    return json.dumps(registros_rastreamento(), ensure_ascii=False, indent=2)
+
+
+def limpar_rastreamento():
+    """Esvazia o buffer de registros."""
+    with _TRAVA:
+        _REGISTROS.clear()
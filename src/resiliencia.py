@@ -0,0 +1,174 @@
+import datetime
+import hashlib
+import os
+import threading
+import time
+
+import pandas as pd
+
+# =============================================================================
+# RESILIÊNCIA: DISJUNTOR (CIRCUIT BREAKER) E SNAPSHOTS EM DISCO
+# =============================================================================
+# Quando o Supabase está lento ou fora do ar, o disjuntor abre após algumas
+# falhas seguidas: as próximas chamadas falham na hora (sem esperar timeouts) e
+# os carregadores servem o último snapshot salvo em disco, marcado com a data em
+# que foi obtido. Uma thread em segundo plano sonda o backend e fecha o disjuntor
+# assim que ele volta a responder.
+
+LIMIAR_FALHAS = 3
+INTERVALO_SONDA = 15  # segundos entre tentativas de recuperação
+
+DIRETORIO_SNAPSHOTS = os.getenv("ASSINTECAL_SNAPSHOT_DIR", ".cache/snapshots")
+
+# Chaves em DataFrame.attrs: data do snapshot servido e marca de dado provisório
+# (revalidado a cada acesso pelo cache, ver src/cache.py)
+CHAVE_SNAPSHOT = "snapshot_em"
+CHAVE_PROVISORIO = "provisorio"
+
+
+class CircuitoAberto(Exception):
+    """Chamada recusada porque o backend está marcado como indisponível."""
+
+
+def e_falha_backend(erro):
+    """
+    Indica se o erro representa indisponibilidade do backend (rede, timeout ou
+    erro 5xx). Erros de requisição (4xx) não abrem o disjuntor.
+    """
+    import httpx
+
+    if isinstance(erro, httpx.HTTPStatusError):
+        return erro.response.status_code >= 500
+    return isinstance(erro, (httpx.TransportError, ConnectionError, TimeoutError))
+
+
+class Disjuntor:
+    """
+    Circuit breaker com sonda de recuperação em segundo plano.
+
+    Args:
+        sonda: Função sem argumentos que faz uma chamada barata ao backend e
+            levanta exceção se ele ainda estiver indisponível
+        limiar_falhas: Falhas seguidas que abrem o disjuntor
+        intervalo_sonda: Segundos entre as tentativas da sonda
+    """
+
+    def __init__(
+        self, sonda=None, limiar_falhas=LIMIAR_FALHAS, intervalo_sonda=INTERVALO_SONDA
+    ):
+        self.sonda = sonda
+        self.limiar_falhas = limiar_falhas
+        self.intervalo_sonda = intervalo_sonda
+        self._trava = threading.Lock()
+        self._falhas = 0
+        self._aberto_desde = None
+
+    @property
+    def aberto(self):
+        return self._aberto_desde is not None
+
+    def executar(self, funcao, *args, **kwargs):
+        """Executa `funcao` se o disjuntor estiver fechado; caso contrário, falha na hora."""
+        if self.aberto:
+            raise CircuitoAberto("Backend indisponível; usando dados salvos.")
+        try:
+            resultado = funcao(*args, **kwargs)
+        except Exception as e:
+            if e_falha_backend(e):
+                self._registrar_falha()
+            raise
+        with self._trava:
+            self._falhas = 0
+        return resultado
+
+    def _registrar_falha(self):
+        with self._trava:
+            self._falhas += 1
+            abrir = self._falhas >= self.limiar_falhas and not self.aberto
+            if abrir:
+                self._aberto_desde = time.monotonic()
+        if abrir:
+            print(f"Disjuntor aberto após {self._falhas} falhas seguidas do backend.")
+            threading.Thread(
+                target=self._sondar, name="sonda-backend", daemon=True
+            ).start()
+
+    def _sondar(self):
+        """Tenta a sonda periodicamente e fecha o disjuntor quando ela responde."""
+        while self.aberto:
+            time.sleep(self.intervalo_sonda)
+            try:
+                if self.sonda is not None:
+                    self.sonda()
+            except Exception as e:
+                print(f"Sonda do backend ainda falhando: {e}")
+                continue
+            self.fechar()
+
+    def fechar(self):
+        with self._trava:
+            self._falhas = 0
+            self._aberto_desde = None
+        print("Disjuntor fechado: backend voltou a responder.")
+
+    def estado(self):
+        """Resumo do estado atual (para diagnóstico)."""
+        with self._trava:
+            return {
+                "aberto": self._aberto_desde is not None,
+                "falhas_seguidas": self._falhas,
+                "aberto_ha_segundos": (
+                    round(time.monotonic() - self._aberto_desde, 1)
+                    if self._aberto_desde is not None
+                    else None
+                ),
+            }
+
+
+# --- SNAPSHOTS EM DISCO ---
+
+
+def _caminho_snapshot(chave):
+    nome = hashlib.sha1(repr(chave).encode("utf-8")).hexdigest()
+    return os.path.join(DIRETORIO_SNAPSHOTS, f"{nome}.parquet")
+
+
+def salvar_snapshot(chave, df):
+    """Persiste o DataFrame como último snapshot bom de `chave` (escrita atômica)."""
+    if df.empty:
+        return
+    caminho = _caminho_snapshot(chave)
+    temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(DIRETORIO_SNAPSHOTS, exist_ok=True)
+        df.to_parquet(temporario, index=False)
+        os.replace(temporario, caminho)
+    except Exception as e:
+        print(f"Não foi possível salvar o snapshot de {chave}: {e}")
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+def ler_snapshot(chave):
+    """
+    Lê o último snapshot de `chave`, marcado em `attrs` com a data em que foi
+    salvo e como provisório. Retorna None se não houver snapshot.
+    """
+    caminho = _caminho_snapshot(chave)
+    if not os.path.exists(caminho):
+        return None
+    try:
+        df = pd.read_parquet(caminho)
+    except Exception as e:
+        print(f"Não foi possível ler o snapshot de {chave}: {e}")
+        return None
+    df.attrs = {
+        CHAVE_SNAPSHOT: datetime.datetime.fromtimestamp(os.path.getmtime(caminho)),
+        CHAVE_PROVISORIO: True,
+    }
+    return df
+
+
+def data_snapshot(df):
+    """Data do snapshot se o DataFrame veio do disco (backend indisponível), ou None."""
+    return df.attrs.get(CHAVE_SNAPSHOT)
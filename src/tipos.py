@@ -0,0 +1,109 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# =============================================================================
+# COMPACTAÇÃO DE TIPOS E RELATÓRIO DE MEMÓRIA
+# =============================================================================
+# Os datasets chegam com textos como objetos Python (país, vertical, descrição
+# SH6, ...) repetidos milhares de vezes e com ano/mes em int64. A compactação
+# troca textos repetidos por categóricos, ano/mes por inteiros pequenos e usa
+# float32 apenas quando isso não altera nenhum valor nem nenhuma soma.
+
+# Tipos das colunas de calendário (aplicados só se todos os valores couberem)
+TIPOS_CALENDARIO = {"ano": "int16", "mes": "int8"}
+
+# Texto vira categórico quando há no máximo esta fração de valores distintos
+FRACAO_MAX_CATEGORICO = 0.5
+
+# Maior inteiro abaixo do qual todas as somas em float32 continuam exatas
+LIMITE_EXATO_FLOAT32 = 2**24
+
+_USO_MEMORIA = {}
+_TRAVA = threading.Lock()
+
+
+def uso_memoria(df):
+    """Memória ocupada pelo DataFrame em bytes (incluindo o conteúdo dos textos)."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def _tipo_compacto(serie):
+    """Tipo compacto para a coluna, ou None se ela deve ficar como está."""
+    if serie.name in TIPOS_CALENDARIO and pd.api.types.is_integer_dtype(serie.dtype):
+        tipo = np.dtype(TIPOS_CALENDARIO[serie.name])
+        limites = np.iinfo(tipo)
+        if serie.empty or (serie.min() >= limites.min and serie.max() <= limites.max):
+            return tipo
+        return None
+
+    if serie.dtype == object:
+        if pd.api.types.infer_dtype(serie, skipna=True) != "string":
+            return None
+        if serie.nunique(dropna=True) <= FRACAO_MAX_CATEGORICO * len(serie):
+            return "category"
+        return None
+
+    if serie.dtype == "float64":
+        valores = serie.to_numpy()
+        # float32 só para valores inteiros cuja soma absoluta é representável
+        # exatamente: nenhum valor e nenhum agregado mudam com a conversão
+        finitos = valores[np.isfinite(valores)]
+        if (
+            np.array_equal(finitos, np.round(finitos))
+            and np.abs(finitos).sum() < LIMITE_EXATO_FLOAT32
+        ):
+            return "float32"
+    return None
+
+
+def compactar_tipos(df, rotulo=None):
+    """
+    Converte as colunas do DataFrame para tipos compactos (categóricos, inteiros
+    pequenos e float32 quando exato), alterando o próprio DataFrame.
+
+    Args:
+        df: DataFrame recém-carregado
+        rotulo: Nome do dataset no relatório de memória (None para não registrar)
+
+    Returns:
+        O mesmo DataFrame, com os tipos compactados
+    """
+    antes = uso_memoria(df) if rotulo is not None else None
+    for coluna in df.columns:
+        tipo = _tipo_compacto(df[coluna])
+        if tipo is not None:
+            df[coluna] = df[coluna].astype(tipo)
+    if rotulo is not None:
+        with _TRAVA:
+            _USO_MEMORIA[rotulo] = (len(df), antes, uso_memoria(df))
+    return df
+
+
+def relatorio_memoria():
+    """
+    Relatório da memória dos datasets carregados, antes e depois da compactação.
+
+    Returns:
+        DataFrame com dataset, linhas, antes_mb, depois_mb e reducao_pct, com uma
+        linha final de total
+    """
+    with _TRAVA:
+        registros = [
+            (rotulo, linhas, antes, depois)
+            for rotulo, (linhas, antes, depois) in sorted(_USO_MEMORIA.items())
+        ]
+    relatorio = pd.DataFrame(
+        registros, columns=["dataset", "linhas", "antes_mb", "depois_mb"]
+    )
+    if relatorio.empty:
+        return relatorio
+
+    total = relatorio[["linhas", "antes_mb", "depois_mb"]].sum()
+    relatorio.loc[len(relatorio)] = ["Total", *total.tolist()]
+    relatorio[["antes_mb", "depois_mb"]] = relatorio[["antes_mb", "depois_mb"]] / 2**20
+    relatorio["reducao_pct"] = (
+        1 - relatorio["depois_mb"] / relatorio["antes_mb"].replace(0, np.nan)
+    ) * 100
+    return relatorio.round(2)
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import streamlit as st
+
+# =============================================================================
+# TRANSPORTE HTTP (POOL DE CONEXÕES) PARA O SUPABASE
+# =============================================================================
+# Um único cliente httpx, compartilhado por todas as sessões e carregadores, com
+# pool de conexões keep-alive (HTTP/2 quando o servidor aceita), respostas
+# comprimidas e timeouts explícitos: uma chamada travada falha em segundos em vez
+# de bloquear a página indefinidamente.
+
+# Pool dimensionado para os carregadores concorrentes de uma página
+MAX_CONEXOES = 20
+MAX_CONEXOES_OCIOSAS = 10
+KEEPALIVE_SEGUNDOS = 60
+
+# Timeouts por requisição (segundos). O de leitura vale para cada bloco recebido
+# (não para a resposta inteira): tabelas grandes continuam chegando, mas um
+# servidor que para de responder libera a página em segundos, e o disjuntor
+# passa a servir os snapshots (ver src/resiliencia.py).
+TIMEOUT_CONEXAO = 5
+TIMEOUT_LEITURA = 15
+TIMEOUT_ESCRITA = 10
+TIMEOUT_POOL = 10
+
+# Quantidade de latências recentes mantidas para as estatísticas
+JANELA_LATENCIAS = 500
+
+
+class EstatisticasTransporte:
+    """Contadores de uso do pool e latências recentes (thread-safe)."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.requisicoes = 0
+        self.conexoes_novas = 0
+        self.erros = 0
+        self.latencias = deque(maxlen=JANELA_LATENCIAS)
+
+    def registrar(self, latencia, conexao_nova, erro=False):
+        with self._trava:
+            self.requisicoes += 1
+            self.conexoes_novas += int(conexao_nova)
+            self.erros += int(erro)
+            self.latencias.append(latencia)
+
+    def resumo(self):
+        """Retorna os contadores, a taxa de reuso de conexões e percentis de latência."""
+        with self._trava:
+            latencias = np.array(self.latencias, dtype="float64")
+            requisicoes = self.requisicoes
+            conexoes_novas = self.conexoes_novas
+            erros = self.erros
+
+        resumo = {
+            "requisicoes": requisicoes,
+            "conexoes_novas": conexoes_novas,
+            "taxa_reuso": 1 - conexoes_novas / requisicoes if requisicoes else None,
+            "erros": erros,
+        }
+        if latencias.size:
+            p50, p95 = np.percentile(latencias, [50, 95])
+            resumo.update(
+                latencia_p50_ms=round(p50 * 1000, 1),
+                latencia_p95_ms=round(p95 * 1000, 1),
+                latencia_max_ms=round(latencias.max() * 1000, 1),
+            )
+        return resumo
+
+
+ESTATISTICAS = EstatisticasTransporte()
+
+
+@st.cache_resource(show_spinner=False)
+def obter_cliente_http():
+    """
+    Cria (uma única vez por processo) o cliente httpx com pool de conexões,
+    keep-alive, HTTP/2 (pacote `h2`, negociado com o servidor), compressão gzip
+    e timeouts de conexão/leitura.
+    """
+    import httpx
+
+    return httpx.Client(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=MAX_CONEXOES,
+            max_keepalive_connections=MAX_CONEXOES_OCIOSAS,
+            keepalive_expiry=KEEPALIVE_SEGUNDOS,
+        ),
+        timeout=httpx.Timeout(
+            connect=TIMEOUT_CONEXAO,
+            read=TIMEOUT_LEITURA,
+            write=TIMEOUT_ESCRITA,
+            pool=TIMEOUT_POOL,
+        ),
+        headers={"Accept-Encoding": "gzip"},
+    )
+
+
+def requisitar(metodo, url, **kwargs):
+    """
+    Executa uma requisição pelo cliente compartilhado, registrando a latência e
+    se foi preciso abrir uma nova conexão (via extensão `trace` do httpcore).
+
+    Returns:
+        httpx.Response (já verificada com raise_for_status)
+    """
+    conexao_nova = False
+
+    def rastrear(evento, _info):
+        nonlocal conexao_nova
+        if evento == "connection.connect_tcp.complete":
+            conexao_nova = True
+
+    inicio = time.perf_counter()
+    try:
+        resposta = obter_cliente_http().request(
+            metodo, url, extensions={"trace": rastrear}, **kwargs
+        )
+        resposta.raise_for_status()
+    except Exception:
+        ESTATISTICAS.registrar(time.perf_counter() - inicio, conexao_nova, erro=True)
+        raise
+
+    ESTATISTICAS.registrar(time.perf_counter() - inicio, conexao_nova)
+    return resposta
+
+
+def estatisticas_transporte():
+    """Resumo das estatísticas de uso do pool e de latência das requisições."""
+    return ESTATISTICAS.resumo()
@@ -1,9 +1,22 @@
-import plotly_express as px
-import plotly.graph_objects as go
 import streamlit as st
 import pandas as pd
-from plotly.subplots import make_subplots
+import numpy as np
 import io
+import logging
+from functools import partial
+
+from src.agregacao import somar_por_chaves
+from src.metadados import (
+    derivado_do_dataset,
+    filtrar_categoria,
+    listar_anos,
+    listar_categorias,
+    ultimo_periodo,
+)
+from src.rastreamento import rastrear
+from src.resiliencia import CircuitoAberto, data_snapshot
+
+logger = logging.getLogger(__name__)
 
 # =============================================================================
 # CONSTANTES E DICIONÁRIOS
@@ -72,6 +85,24 @@ def carregar_css(caminho_arquivo):
         st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
 
 
+def exibir_aviso_dados_salvos(valores):
+    """
+    Exibe um aviso com a data dos dados quando algum DataFrame da página veio de
+    um snapshot em disco (backend indisponível). Valores que não são DataFrames
+    (ex: funções de carregamento) são ignorados.
+    """
+    datas = [
+        data_snapshot(valor) for valor in valores if isinstance(valor, pd.DataFrame)
+    ]
+    datas = [data for data in datas if data is not None]
+    if datas:
+        st.warning(
+            "Servidor de dados indisponível no momento. Exibindo dados de "
+            f"{min(datas):%d/%m/%Y %H:%M}.",
+            icon="⚠️",
+        )
+
+
 def to_excel(df: pd.DataFrame) -> bytes:
     """
     Converte um DataFrame do Pandas para um arquivo Excel em memória (bytes).
@@ -108,6 +139,7 @@ def titulo_centralizado(texto: str, level: int, cor: str = None):
     st.markdown(f"<h{level} style='{style}'>{texto}</h{level}>", unsafe_allow_html=True)
 
 
+@rastrear
 def criar_grafico_barras(
     df,
     titulo,
@@ -123,6 +155,8 @@ def criar_grafico_barras(
     """
     Cria um gráfico de barras customizado e reutilizável com Plotly Express.
     """
+    import plotly_express as px
+
     if isinstance(df.columns, pd.MultiIndex):
         df.columns = [" - ".join(map(str, col)).strip() for col in df.columns.values]
 
@@ -202,10 +236,14 @@ def calcular_yoy(df, tipo, ultimo_mes, ultimo_ano, coluna, round):
     df_filtrado = None
 
     if tipo == "mensal":
-        df_filtrado = df[df["mes"] == ultimo_mes].groupby("ano")[coluna].sum()
+        df_filtrado = (
+            df[df["mes"] == ultimo_mes].groupby("ano", observed=True)[coluna].sum()
+        )
 
     elif tipo == "acumulado":
-        df_filtrado = df[df["mes"] <= ultimo_mes].groupby("ano")[coluna].sum()
+        df_filtrado = (
+            df[df["mes"] <= ultimo_mes].groupby("ano", observed=True)[coluna].sum()
+        )
 
     else:
         return None
@@ -277,12 +315,16 @@ def style_saldo_variacao(val):
     return ""
 
 
+@rastrear
 def criar_grafico_barras_linha_comex(
     df_plot, coluna_y_principal, titulo_coluna_y, tipo_coluna
 ):
     """
     Cria um gráfico de combo (Barras + Linha) com eixo Y secundário.
     """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
     cor_barras = "#000a11"
     cor_linha = "#22B573"
 
@@ -393,11 +435,15 @@ def criar_grafico_barras_linha_comex(
     return fig
 
 
+@rastrear
 def criar_grafico_barras_linha_comex_acum(df_plot, titulo_coluna_y, tipo_coluna):
     """
     Cria um gráfico de combo (Barras + Linha) com eixo Y secundário para dados acumulados comparativos.
     Recebe um DataFrame com colunas: x_label, valor, yoy, valor_label, yoy_label
     """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
     cor_barras = "#000a11"
     cor_linha = "#22B573"
 
@@ -498,101 +544,135 @@ def criar_grafico_barras_linha_comex_acum(df_plot, titulo_coluna_y, tipo_coluna)
 # =============================================================================
 
 
-@st.cache_data
-def preparar_dados_comex_grafico(df, coluna):
-    """
-    Prepara os dados de comex, agregando por data e calculando o YoY.
-    Reutilizável para qualquer setor (calçados, couros, etc.).
-    """
-    df_agg = df.groupby(["ano", "mes"])[coluna].sum().reset_index()
-
-    df_agg["date"] = pd.to_datetime(
-        df_agg[["ano", "mes"]]
-        .assign(day=1)
-        .rename(columns={"ano": "year", "mes": "month"})
-    )
-    df_agg = df_agg.set_index("date").sort_index()
-
-    df_agg["yoy"] = df_agg[coluna].pct_change(12) * 100
-    df_agg[coluna] = df_agg[coluna] / 1000000
-
-    df_agg["valor_label"] = df_agg[coluna].apply(lambda x: f"{x:.1f}".replace(".", ","))
-    df_agg["yoy_label"] = df_agg["yoy"].apply(lambda x: f"{x:.1f}".replace(".", ","))
+# Colunas das séries do "Acumulado no Ano" (ver _calcular_series_comex)
+COLUNAS_SERIE_ACUMULADA = [
+    "ano",
+    "valor",
+    "valor_anterior",
+    "yoy",
+    "valor_label",
+    "yoy_label",
+    "x_label",
+]
 
-    df_agg = df_agg.iloc[12:].reset_index()
 
-    return df_agg
+def _formatar_decimal(serie):
+    """Rótulos com uma casa decimal e vírgula (ex: 12,3); nulos viram texto vazio."""
+    return serie.map(lambda x: f"{x:.1f}".replace(".", ",") if pd.notna(x) else "")
 
 
-@st.cache_data
-def preparar_dados_comex_acu_comparativo(df, coluna, ult_mes):
+def _calcular_series_comex(df, coluna, coluna_tipo):
     """
-    Prepara os dados de comex acumulados para comparação entre anos.
-    Retorna um DataFrame com o acumulado até o mês atual para cada ano,
-    incluindo a variação YoY.
-    Reutilizável para qualquer setor (calçados, couros, etc.).
+    Calcula, em operações agrupadas únicas, as séries dos gráficos "Histórico
+    Mensal" e "Acumulado no Ano" de todas as categorias de `coluna_tipo` e do
+    "Total".
     """
-    df = df.copy()
+    if df.empty:
+        return {}, {}
 
-    # Filtra apenas meses até o último mês disponível
-    df_filtrado = df[df["mes"] <= ult_mes]
+    # --- Histórico mensal: soma por (categoria, data), YoY de 12 meses ---
+    somas = pd.concat(
+        [
+            pd.concat(
+                {"Total": df.groupby("data", observed=True)[coluna].sum()},
+                names=[coluna_tipo],
+            ),
+            df.groupby([coluna_tipo, "data"], observed=True)[coluna].sum(),
+        ]
+    )
+    mensal = somas.rename(coluna).to_frame().rename_axis([coluna_tipo, "date"])
+    grupos = mensal.groupby(level=0, sort=False)[coluna]
+    mensal["yoy"] = grupos.pct_change(12) * 100
+    posicao = grupos.cumcount()
+    mensal[coluna] = mensal[coluna] / 1000000
+    mensal["valor_label"] = _formatar_decimal(mensal[coluna])
+    mensal["yoy_label"] = _formatar_decimal(mensal["yoy"])
+    mensal = mensal[posicao >= 12]
+
+    series_mensais = {
+        categoria: grupo.droplevel(0).reset_index()
+        for categoria, grupo in mensal.groupby(level=0, sort=False)
+    }
 
-    # Agrupa por ano e soma o valor da coluna
-    df_acum = df_filtrado.groupby("ano")[coluna].sum().reset_index()
-    df_acum.columns = ["ano", "valor"]
+    # --- Acumulado no ano: jan até o último mês de cada categoria, por ano ---
+    ult_mes = df.groupby(coluna_tipo, observed=True)["data"].max().dt.month
+    ult_mes_total = df["data"].max().month
+    limite = ult_mes.reindex(df[coluna_tipo]).to_numpy()
+    somas_acum = pd.concat(
+        [
+            pd.concat(
+                {
+                    "Total": df[df["mes"] <= ult_mes_total]
+                    .groupby("ano", observed=True)[coluna]
+                    .sum()
+                },
+                names=[coluna_tipo],
+            ),
+            df[df["mes"].to_numpy() <= limite]
+            .groupby([coluna_tipo, "ano"], observed=True)[coluna]
+            .sum(),
+        ]
+    )
+    acum = somas_acum.rename("valor").to_frame()
+    grupos = acum.groupby(level=0, sort=False)["valor"]
+    acum["valor_anterior"] = grupos.shift(1)
+    acum["yoy"] = (acum["valor"] / acum["valor_anterior"] - 1) * 100
+    posicao = grupos.cumcount()
+    acum["valor"] = acum["valor"] / 1_000_000
+    acum["valor_label"] = _formatar_decimal(acum["valor"])
+    acum["yoy_label"] = _formatar_decimal(acum["yoy"])
+    acum = acum[posicao >= 1]
+
+    meses_referencia = {"Total": ult_mes_total, **ult_mes.dropna().to_dict()}
+    series_acumuladas = {}
+    for categoria, grupo in acum.groupby(level=0, sort=False):
+        grupo = grupo.droplevel(0).reset_index()
+        grupo["x_label"] = (
+            "Jan-"
+            + MESES_DIC[int(meses_referencia[categoria])][:3]
+            + "/"
+            + grupo["ano"].astype(str).str.slice(-2)
+        )
+        series_acumuladas[categoria] = grupo
 
-    # Calcula YoY
-    df_acum["valor_anterior"] = df_acum["valor"].shift(1)
-    df_acum["yoy"] = (df_acum["valor"] / df_acum["valor_anterior"] - 1) * 100
+    return series_mensais, series_acumuladas
 
-    # Converte para milhões
-    df_acum["valor"] = df_acum["valor"] / 1_000_000
 
-    # Formata labels
-    df_acum["valor_label"] = df_acum["valor"].apply(
-        lambda x: f"{x:.1f}".replace(".", ",")
-    )
-    df_acum["yoy_label"] = df_acum["yoy"].apply(
-        lambda x: f"{x:.1f}".replace(".", ",") if pd.notna(x) else ""
-    )
+@rastrear
+def preparar_series_comex_por_categoria(df, coluna, coluna_tipo):
+    """
+    Séries de "Histórico Mensal" e "Acumulado no Ano" de todas as categorias e do
+    "Total", calculadas uma vez por dataset carregado. Trocar de categoria no
+    seletor passa a ser uma consulta a dicionário.
 
-    # Cria o índice no formato "Jan-Mês/Ano"
-    df_acum["x_label"] = (
-        "Jan-" + MESES_DIC[ult_mes][:3] + "/" + df_acum["ano"].astype(str).str.slice(-2)
+    Returns:
+        Tupla (series_mensais, series_acumuladas), dicionários {categoria: DataFrame}
+        com os rótulos já formatados
+    """
+    return derivado_do_dataset(
+        df,
+        ("series_comex", coluna, coluna_tipo),
+        partial(_calcular_series_comex, coluna=coluna, coluna_tipo=coluna_tipo),
     )
 
-    # Remove o primeiro ano (sem YoY)
-    df_acum = df_acum.iloc[1:].reset_index(drop=True)
 
-    return df_acum
+def serie_da_categoria(series, categoria, colunas):
+    """Série da categoria, ou um DataFrame vazio se ela não tiver dados suficientes."""
+    serie = series.get(categoria)
+    return serie if serie is not None else pd.DataFrame(columns=colunas)
 
 
-@st.cache_data
+@rastrear(cache=st.cache_data)
 def preparar_dados_graficos_prod_vendas(df, coluna):
     """
     Prepara dados de produção/vendas para gráficos.
     Reutilizável para qualquer setor.
     """
-    df_hist = (
-        df.assign(
-            date=pd.to_datetime(
-                df[["ano", "mes"]]
-                .assign(day=1)
-                .rename(columns={"ano": "year", "mes": "month"})
-            )
-        )
-        .pivot_table(
-            index="date",
-            values=coluna,
-            aggfunc="sum",
-            fill_value=0,
-        )
-        .sort_index()
-    )
+    df_hist = somar_por_chaves(df, index="data", values=coluna)
     return df_hist
 
 
-@st.cache_data
+@rastrear(cache=st.cache_data)
 def preparar_dados_emprego_grafico(df_emprego, coluna_grupo="subclasse"):
     """
     Prepara dados de emprego para gráficos.
@@ -606,51 +686,27 @@ def preparar_dados_emprego_grafico(df_emprego, coluna_grupo="subclasse"):
         return None, None, None, None
 
     # Histórico Mensal Total
-    df_hist_total = (
-        df_emprego.assign(
-            date=lambda x: pd.to_datetime(
-                x["ano"].astype(str) + "-" + x["mes"].astype(str).str.zfill(2) + "-01"
-            )
-        )
-        .pivot_table(
-            index="date",
-            values="saldo_movimentacao",
-            aggfunc="sum",
-            fill_value=0,
-        )
-        .sort_index()
+    df_hist_total = somar_por_chaves(
+        df_emprego,
+        index="data",
+        values="saldo_movimentacao",
     )
 
     # Histórico Mensal por Grupo
-    df_hist_grupo = (
-        df_emprego.assign(
-            date=lambda x: pd.to_datetime(
-                x["ano"].astype(str) + "-" + x["mes"].astype(str).str.zfill(2) + "-01"
-            )
-        )
-        .pivot_table(
-            index="date",
-            columns=coluna_grupo,
-            values="saldo_movimentacao",
-            aggfunc="sum",
-            fill_value=0,
-        )
-        .sort_index()
+    df_hist_grupo = somar_por_chaves(
+        df_emprego,
+        index="data",
+        columns=coluna_grupo,
+        values="saldo_movimentacao",
     )
 
-    ult_ano = df_emprego["ano"].max()
-    ult_mes = df_emprego[df_emprego["ano"] == ult_ano]["mes"].max()
+    ult_ano, ult_mes = ultimo_periodo(df_emprego)
 
     # Acumulado Anual Total
-    df_acum_total = (
-        df_emprego[df_emprego["mes"] <= ult_mes]
-        .pivot_table(
-            index="ano",
-            values="saldo_movimentacao",
-            aggfunc="sum",
-            fill_value=0,
-        )
-        .sort_index()
+    df_acum_total = somar_por_chaves(
+        df_emprego[df_emprego["mes"] <= ult_mes],
+        index="ano",
+        values="saldo_movimentacao",
     )
     df_acum_total.index = (
         "Jan-"
@@ -660,16 +716,11 @@ def preparar_dados_emprego_grafico(df_emprego, coluna_grupo="subclasse"):
     )
 
     # Acumulado Anual por Grupo
-    df_acum_grupo = (
-        df_emprego[df_emprego["mes"] <= ult_mes]
-        .pivot_table(
-            index="ano",
-            columns=coluna_grupo,
-            values="saldo_movimentacao",
-            aggfunc="sum",
-            fill_value=0,
-        )
-        .sort_index()
+    df_acum_grupo = somar_por_chaves(
+        df_emprego[df_emprego["mes"] <= ult_mes],
+        index="ano",
+        columns=coluna_grupo,
+        values="saldo_movimentacao",
     )
     df_acum_grupo.index = (
         "Jan-"
@@ -681,7 +732,7 @@ def preparar_dados_emprego_grafico(df_emprego, coluna_grupo="subclasse"):
     return df_hist_total, df_hist_grupo, df_acum_total, df_acum_grupo
 
 
-@st.cache_data
+@rastrear(cache=st.cache_data)
 def preparar_dados_ipca_grafico(df_ipca):
     """
     Prepara dados de IPCA para gráficos.
@@ -690,34 +741,16 @@ def preparar_dados_ipca_grafico(df_ipca):
     if df_ipca.empty:
         return None, None
 
-    df_mes = (
-        df_ipca.assign(
-            date=lambda x: pd.to_datetime(
-                x["ano"].astype(str) + "-" + x["mes"].astype(str).str.zfill(2) + "-01"
-            )
-        )
-        .pivot_table(
-            index="date",
-            values="ipca_mes",
-            aggfunc="sum",
-            fill_value=0,
-        )
-        .sort_index()
+    df_mes = somar_por_chaves(
+        df_ipca,
+        index="data",
+        values="ipca_mes",
     )
 
-    df_12_meses = (
-        df_ipca.assign(
-            date=lambda x: pd.to_datetime(
-                x["ano"].astype(str) + "-" + x["mes"].astype(str).str.zfill(2) + "-01"
-            )
-        )
-        .pivot_table(
-            index="date",
-            values="ipca_12_meses",
-            aggfunc="sum",
-            fill_value=0,
-        )
-        .sort_index()
+    df_12_meses = somar_por_chaves(
+        df_ipca,
+        index="data",
+        values="ipca_12_meses",
     )
 
     return df_mes, df_12_meses
@@ -753,8 +786,7 @@ def display_prod_vendas_kpi_cards(df, titulo_kpi, categoria_kpi, filtro):
     with st.container(border=False):
         df = df.copy()
         df = df[df["grupo"] == filtro]
-        ult_ano = df["ano"].max()
-        ult_mes = df[df["ano"] == ult_ano]["mes"].max()
+        ult_ano, ult_mes = ultimo_periodo(df)
 
         df_ult = df[(df["ano"] == ult_ano) & (df["mes"] == ult_mes)]
         valor_ult_mes = df_ult["taxa_mensal"].sum()
@@ -783,8 +815,7 @@ def display_comex_kpi_cards(df, titulo_kpi, categoria_kpi, coluna):
     titulo_centralizado(titulo_kpi, 3)
     with st.container(border=False):
         df = df.copy()
-        ult_ano = df["ano"].max()
-        ult_mes = df[df["ano"] == ult_ano]["mes"].max()
+        ult_ano, ult_mes = ultimo_periodo(df)
 
         df_ult_mes = df[(df["ano"] == ult_ano) & (df["mes"] == ult_mes)]
         df_acumulado = df[(df["ano"] == ult_ano) & (df["mes"] <= ult_mes)]
@@ -852,8 +883,7 @@ def display_emprego_kpi_cards(df, titulo_kpi="Emprego"):
     titulo_centralizado(titulo_kpi, 3)
     with st.container(border=False):
         df = df.copy()
-        ult_ano = df["ano"].max()
-        ult_mes = df[df["ano"] == ult_ano]["mes"].max()
+        ult_ano, ult_mes = ultimo_periodo(df)
 
         df_ult = df[(df["ano"] == ult_ano) & (df["mes"] == ult_mes)]
         saldo_ult_mes = df_ult["saldo_movimentacao"].sum()
@@ -882,8 +912,7 @@ def display_ipca_kpi_cards(df, titulo_kpi="IPCA"):
     titulo_centralizado(titulo_kpi, 3)
     with st.container(border=False):
         df = df.copy()
-        ult_ano = df["ano"].max()
-        ult_mes = df[df["ano"] == ult_ano]["mes"].max()
+        ult_ano, ult_mes = ultimo_periodo(df)
 
         df_ult = df[(df["ano"] == ult_ano) & (df["mes"] == ult_mes)]
         ipca_mes = df_ult["ipca_mes"].sum()
@@ -919,23 +948,20 @@ def display_graficos_prod_vendas(
 ):
     """
     Função auxiliar que renderiza um bloco de análise completo (KPI, Gráficos).
-    Usa session_state para manter o expander aberto após interação.
+    O bloco é um fragmento: interações com seus widgets reexecutam apenas ele,
+    sem recarregar a página inteira (e sem fechar o expander).
     Reutilizável para qualquer setor.
 
     Args:
         usar_expander: Se True, envolve o conteúdo em um expander. Se False, exibe diretamente.
         df_previsao: DataFrame opcional com dados de previsão (colunas: ano, mes, variacao_verificada, prev_otimista, prev_pessimista)
     """
-    expander_state_key = f"{state_key_prefix}_expander_state"
+    import plotly.graph_objects as go
+
     select_key = f"{state_key_prefix}_ano"
     radio_key = f"{state_key_prefix}_view"
 
-    if expander_state_key not in st.session_state:
-        st.session_state[expander_state_key] = False
-
-    def set_expander_open():
-        st.session_state[expander_state_key] = True
-
+    @st.fragment
     def render_content():
         display_prod_vendas_kpi_cards(
             df=df, titulo_kpi=titulo_kpi, categoria_kpi=categoria_kpi, filtro=filtro_kpi
@@ -944,7 +970,7 @@ def display_graficos_prod_vendas(
         df_hist_mensal = preparar_dados_graficos_prod_vendas(df, "taxa_mensal")
         df_hist_acumulado = preparar_dados_graficos_prod_vendas(df, "taxa_acumulado")
 
-        anos_disponiveis = sorted(df["ano"].unique().tolist())
+        anos_disponiveis = listar_anos(df)
 
         ult_ano = anos_disponiveis[-1]
         if len(anos_disponiveis) >= 2:
@@ -1119,9 +1145,7 @@ def display_graficos_prod_vendas(
             st.plotly_chart(fig, use_container_width=True)
 
     if usar_expander:
-        with st.expander(
-            titulo_expander, expanded=st.session_state[expander_state_key]
-        ):
+        with st.expander(titulo_expander, expanded=False):
             render_content()
     else:
         render_content()
@@ -1130,7 +1154,6 @@ def display_graficos_prod_vendas(
 def display_comex_grafico(
     df_comex,
     state_key_prefix,
-    set_expander_open_callback,
     coluna_dados,
     coluna_tipo="tipo",
     df_previsao=None,
@@ -1142,13 +1165,14 @@ def display_comex_grafico(
     Args:
         df_comex: DataFrame com dados de comércio exterior
         state_key_prefix: Prefixo para chaves de session_state
-        set_expander_open_callback: Callback para manter expander aberto
         coluna_dados: Nome da coluna de dados ('valor' ou 'pares')
         coluna_tipo: Nome da coluna de tipo/categoria (default: 'tipo')
         df_previsao: DataFrame opcional com dados de previsão
     """
+    import plotly.graph_objects as go
+
     # Seletor de tipo no topo (compartilhado por todas as visualizações)
-    opcoes_filtro = ["Total"] + sorted(list(df_comex[coluna_tipo].unique()))
+    opcoes_filtro = ["Total"] + listar_categorias(df_comex, coluna_tipo)
 
     col_tipo, _ = st.columns(2)
     with col_tipo:
@@ -1162,7 +1186,7 @@ def display_comex_grafico(
     if tipo_selecionado == "Total":
         df_filtrado = df_comex
     else:
-        df_filtrado = df_comex[df_comex[coluna_tipo] == tipo_selecionado]
+        df_filtrado = filtrar_categoria(df_comex, coluna_tipo, tipo_selecionado)
 
     # Definir opções de pills baseado na disponibilidade de previsão
     opcoes_pills = ["Histórico Mensal", "Acumulado no Ano", "Por País", "Por Tipo"]
@@ -1293,7 +1317,6 @@ def display_comex_grafico(
         display_comex_pais_view(
             df_comex=df_filtrado,
             state_key_prefix=state_key_prefix,
-            set_expander_open=set_expander_open_callback,
             coluna_dados=coluna_dados,
         )
         return
@@ -1303,7 +1326,6 @@ def display_comex_grafico(
         display_comex_tipo_view(
             df_comex=df_comex,  # Usa df original, não filtrado por tipo
             state_key_prefix=state_key_prefix,
-            set_expander_open=set_expander_open_callback,
             coluna_dados=coluna_dados,
             coluna_tipo=coluna_tipo,
         )
@@ -1311,7 +1333,14 @@ def display_comex_grafico(
 
     # === VISUALIZAÇÕES HISTÓRICO MENSAL E ACUMULADO ===
     if tab_selection == "Histórico Mensal":
-        df_preparado = preparar_dados_comex_grafico(df_filtrado, coluna_dados)
+        series_mensais, _ = preparar_series_comex_por_categoria(
+            df_comex, coluna_dados, coluna_tipo
+        )
+        df_preparado = serie_da_categoria(
+            series_mensais,
+            tipo_selecionado,
+            ["date", coluna_dados, "yoy", "valor_label", "yoy_label"],
+        )
 
         if df_preparado.empty:
             st.info("Não há dados suficientes para o gráfico.")
@@ -1375,11 +1404,15 @@ def display_comex_grafico(
         st.plotly_chart(fig, use_container_width=True)
 
     elif tab_selection == "Acumulado no Ano":
-        ult_ano = df_filtrado["ano"].max()
-        ult_mes = df_filtrado[df_filtrado["ano"] == ult_ano]["mes"].max()
+        ult_ano, ult_mes = ultimo_periodo(df_filtrado)
 
-        df_preparado_acum = preparar_dados_comex_acu_comparativo(
-            df_filtrado, coluna_dados, ult_mes
+        _, series_acumuladas = preparar_series_comex_por_categoria(
+            df_comex, coluna_dados, coluna_tipo
+        )
+        df_preparado_acum = serie_da_categoria(
+            series_acumuladas,
+            tipo_selecionado,
+            COLUNAS_SERIE_ACUMULADA,
         )
 
         fluxo = "Exportação" if "exp" in state_key_prefix else "Importação"
@@ -1406,14 +1439,13 @@ def display_comex_analise(
     titulo_kpi,
     state_key_prefix,
     categoria_kpi,
-    set_expander_open,
-    expander_state_key="comex_expander_state",
     coluna_tipo="tipo",
     usar_expander=True,
     df_previsao=None,
 ):
     """
     Função auxiliar para renderizar um bloco completo de Comércio Exterior.
+    O bloco é um fragmento: interações com seus widgets reexecutam apenas ele.
     Reutilizável para qualquer setor.
 
     Args:
@@ -1423,13 +1455,12 @@ def display_comex_analise(
         titulo_kpi: Título para os KPIs
         state_key_prefix: Prefixo para chaves de session_state
         categoria_kpi: Categoria para os KPIs (ex: 'Exportação')
-        set_expander_open: Callback para manter expander aberto
-        expander_state_key: Chave do session_state para o expander
         coluna_tipo: Nome da coluna de tipo/categoria (default: 'tipo')
         usar_expander: Se True, envolve o conteúdo em um expander. Se False, exibe diretamente.
         df_previsao: DataFrame opcional com dados de previsão (colunas: ano, mes, variacao_verificada, prev_otimista, prev_pessimista)
     """
 
+    @st.fragment
     def render_content():
         display_comex_kpi_cards(
             df=df_comex,
@@ -1442,17 +1473,13 @@ def display_comex_analise(
         display_comex_grafico(
             df_comex=df_comex,
             state_key_prefix=state_key_prefix,
-            set_expander_open_callback=set_expander_open,
             coluna_dados=coluna_dados,
             coluna_tipo=coluna_tipo,
             df_previsao=df_previsao,
         )
 
     if usar_expander:
-        with st.expander(
-            titulo_expander,
-            expanded=st.session_state.get(expander_state_key, False),
-        ):
+        with st.expander(titulo_expander, expanded=False):
             render_content()
     else:
         render_content()
@@ -1462,87 +1489,236 @@ def display_comex_analise(
 # FUNÇÕES PARA TABELA DE COMÉRCIO EXTERIOR POR PAÍS
 # =============================================================================
 
+OPCOES_LINHAS_POR_PAGINA = [25, 50, 100, "Todas"]
+
+
+def selecionar_top_n(pivot_valores, top_n=None, offset=0, rotulo_outros="Outros"):
+    """
+    Ordena o pivot pelo valor do ano mais recente e, opcionalmente, mantém apenas
+    uma página de linhas, agregando as linhas classificadas abaixo dela em uma
+    linha "Outros" (as das páginas anteriores não entram na soma).
+
+    Usa np.argpartition para separar as `offset + top_n` maiores linhas sem
+    ordenar o catálogo inteiro; apenas a fatia selecionada é ordenada.
+
+    Args:
+        pivot_valores: DataFrame pivotado com valores absolutos (anos como colunas)
+        top_n: Quantidade de linhas por página (None para retornar todas)
+        offset: Posição da primeira linha da página
+        rotulo_outros: Rótulo da linha que agrega as demais
+
+    Returns:
+        DataFrame com as linhas da página e, se houver linhas abaixo dela, a
+        linha "Outros"
+    """
+    if pivot_valores.empty or len(pivot_valores.columns) == 0:
+        return pivot_valores
+
+    ultimo_ano_col = pivot_valores.columns.max()
+    chave = pivot_valores[ultimo_ano_col].to_numpy()
+
+    if top_n is None:
+        ordem = np.argsort(-chave, kind="stable")
+        return pivot_valores.iloc[ordem]
+
+    n_linhas = len(pivot_valores)
+    top_n = int(top_n)
+    # Página fora do intervalo (ex.: após trocar a visualização) vira a última
+    offset = min(max(int(offset), 0), ((n_linhas - 1) // top_n) * top_n)
+    fim = min(offset + top_n, n_linhas)
+
+    if fim < n_linhas:
+        candidatos = np.argpartition(-chave, fim - 1)[:fim]
+    else:
+        candidatos = np.arange(n_linhas)
+    ordem = candidatos[np.argsort(-chave[candidatos], kind="stable")]
+    pagina = ordem[offset:fim]
+
+    df_pagina = pivot_valores.iloc[pagina]
+
+    if fim == n_linhas:
+        return df_pagina
+
+    # "Outros" = linhas fora das `fim` maiores, ou seja, abaixo da página atual
+    restantes = np.ones(n_linhas, dtype=bool)
+    restantes[candidatos] = False
+
+    valores_outros = pivot_valores.to_numpy()[restantes].sum(axis=0)
+    linha_outros = pd.DataFrame(
+        [valores_outros], index=[rotulo_outros], columns=pivot_valores.columns
+    )
+    return pd.concat([df_pagina, linha_outros])
+
+
+def subset_sem_outros(df_pivot, rotulo_outros="Outros"):
+    """Subset do Styler que exclui a linha "Outros" do gradiente de cores."""
+    return pd.IndexSlice[df_pivot.index[df_pivot.index != rotulo_outros], :]
+
+
+def selecionar_linhas_por_pagina(state_key_prefix):
+    """
+    Exibe o seletor de linhas por página e retorna (top_n, offset) para os pivots.
+    A página atual é lida do session_state, onde é mantida por `exibir_seletor_pagina`.
+    """
+    pagina_key = f"{state_key_prefix}_pagina"
+
+    def voltar_primeira_pagina():
+        st.session_state[pagina_key] = 1
+
+    linhas_por_pagina = st.selectbox(
+        "Linhas por página:",
+        options=OPCOES_LINHAS_POR_PAGINA,
+        key=f"{state_key_prefix}_linhas_pagina",
+        on_change=voltar_primeira_pagina,
+    )
+    if linhas_por_pagina == "Todas":
+        return None, 0
+
+    pagina = st.session_state.get(pagina_key, 1)
+    return linhas_por_pagina, (pagina - 1) * linhas_por_pagina
+
+
+def exibir_seletor_pagina(state_key_prefix, total_linhas, top_n):
+    """
+    Exibe o seletor de página abaixo da tabela quando há mais de uma página.
+    """
+    if top_n is None or total_linhas <= top_n:
+        return
+
+    pagina_key = f"{state_key_prefix}_pagina"
+    total_paginas = -(-total_linhas // top_n)
+    if st.session_state.get(pagina_key, 1) > total_paginas:
+        st.session_state[pagina_key] = total_paginas
+
+    col_pagina, _ = st.columns([0.3, 0.7])
+    with col_pagina:
+        st.selectbox(
+            "Página:",
+            options=list(range(1, total_paginas + 1)),
+            format_func=lambda p: f"{p} de {total_paginas}",
+            key=pagina_key,
+        )
+
+
+def prefixo_colunas_comex(view_mode_tabela, ult_mes_referencia):
+    """Prefixo das colunas do pivot (ex: 'Nov' ou 'Jan-Nov')."""
+    if view_mode_tabela == "Mês":
+        return f"{MESES_DIC[ult_mes_referencia][:3]}"
+    return f"Jan-{MESES_DIC[ult_mes_referencia][:3]}"
+
 
 @st.cache_data
-def preparar_dados_comex_pais_pivot(
-    df, coluna_valor, view_mode_tabela, metric_mode_tabela
-):
+def agregar_comex_por_chave(df, chave, coluna_valor, view_mode_tabela):
     """
-    Prepara e pivota os dados de comércio exterior por país.
-    A ordenação é SEMPRE baseada no valor absoluto (maior para menor),
-    independentemente da métrica selecionada.
+    Agrega os valores absolutos de comércio exterior por `chave` (país ou SH6) e
+    ano, no mês de referência ou no acumulado até ele. Caminho em pandas, usado
+    quando a agregação no servidor não está disponível.
 
     Args:
-        df: DataFrame com colunas ano, mes, pais, valor, pares
+        df: DataFrame com colunas ano, mes, a chave e a coluna de valor
+            (para 'sh6', as colunas id_sh6 e descricao_sh6)
+        chave: 'pais' ou 'sh6'
         coluna_valor: 'valor' ou 'pares'
         view_mode_tabela: 'Mês' ou 'Acumulado no Ano'
-        metric_mode_tabela: 'Valor', 'Pares' ou 'Variação (%)'
 
     Returns:
-        DataFrame pivotado com países como índice e anos como colunas
+        Tupla (pivot_valores, prefixo_col), com a chave como índice e anos como colunas
     """
     if df.empty:
-        return pd.DataFrame()
-
-    df_filtrado = df.copy()
-
-    if df_filtrado.empty:
-        return pd.DataFrame()
+        return pd.DataFrame(), ""
 
     # --- LÓGICA DO MÊS DE REFERÊNCIA ---
-    ultimo_ano_dados = df_filtrado["ano"].max()
-    ult_mes_referencia = df_filtrado[df_filtrado["ano"] == ultimo_ano_dados][
-        "mes"
-    ].max()
+    _, ult_mes_referencia = ultimo_periodo(df)
+    prefixo_col = prefixo_colunas_comex(view_mode_tabela, ult_mes_referencia)
 
     # Preparar dados baseado na visualização
     if view_mode_tabela == "Mês":
         # Agregar valores apenas do mês específico para todos os anos
-        df_view = df_filtrado[df_filtrado["mes"] == ult_mes_referencia].copy()
-        df_grouped = df_view.groupby(["pais", "ano"])[coluna_valor].sum().reset_index()
-        prefixo_col = f"{MESES_DIC[ult_mes_referencia][:3]}"
+        df_view = df[df["mes"] == ult_mes_referencia]
     else:  # Acumulado no Ano
         # Agregar valores de jan até o mês de referência para cada ano
-        df_acum = df_filtrado[df_filtrado["mes"] <= ult_mes_referencia].copy()
-        df_grouped = df_acum.groupby(["pais", "ano"])[coluna_valor].sum().reset_index()
-        prefixo_col = f"Jan-{MESES_DIC[ult_mes_referencia][:3]}"
+        df_view = df[df["mes"] <= ult_mes_referencia]
 
-    if df_grouped.empty:
-        return pd.DataFrame()
+    if df_view.empty:
+        return pd.DataFrame(), prefixo_col
+
+    if chave == "sh6":
+        # Criar coluna combinada SH6
+        df_view = df_view.assign(
+            sh6=df_view["id_sh6"].astype(str)
+            + " - "
+            + df_view["descricao_sh6"].astype(str)
+        )
+
+    pivot_valores = somar_por_chaves(
+        df_view, index=chave, columns="ano", values=coluna_valor
+    )
+    return pivot_valores, prefixo_col
+
+
+def pivot_de_agregacao_servidor(df_agregado, view_mode_tabela):
+    """
+    Converte o resultado da agregação feita no servidor (formato longo: chave,
+    ano, mes de referência, total) na mesma matriz de agregar_comex_por_chave.
 
-    # 4. Pivotar valores absolutos (para exibição e/ou ordenação)
-    pivot_valores = df_grouped.pivot_table(
-        index="pais",
-        columns="ano",
-        values=coluna_valor,
-        aggfunc="sum",
-        fill_value=0,
+    Returns:
+        Tupla (pivot_valores, prefixo_col)
+    """
+    if df_agregado.empty:
+        return pd.DataFrame(), ""
+
+    ult_mes_referencia = int(df_agregado["mes"].iloc[0])
+    prefixo_col = prefixo_colunas_comex(view_mode_tabela, ult_mes_referencia)
+    pivot_valores = somar_por_chaves(
+        df_agregado, index="chave", columns="ano", values="total"
     )
+    return pivot_valores, prefixo_col
+
+
+def finalizar_pivot_comex(
+    pivot_valores, prefixo_col, metric_mode_tabela, nome_indice, top_n=None, offset=0
+):
+    """
+    Ordena e pagina a matriz de valores absolutos e calcula a métrica exibida.
+    A ordenação é SEMPRE baseada no valor absoluto (maior para menor),
+    independentemente da métrica selecionada.
+
+    Args:
+        pivot_valores: Matriz de valores absolutos (chave x ano)
+        prefixo_col: Prefixo das colunas (ex: 'Nov' ou 'Jan-Nov')
+        metric_mode_tabela: 'Valor', 'Pares' ou 'Variação (%)'
+        nome_indice: Nome do índice exibido (ex: 'País', 'SH6')
+        top_n: Quantidade de linhas por página (None para todas). As demais
+            são agregadas na linha "Outros".
+        offset: Posição da primeira linha da página
+
+    Returns:
+        DataFrame pivotado com a chave como índice e anos como colunas.
+        O total de linhas disponíveis fica em `df.attrs["total_linhas"]`.
+    """
+    if pivot_valores.empty:
+        return pd.DataFrame()
 
-    # Garantir que não há colunas duplicadas
-    pivot_valores = pivot_valores.loc[:, ~pivot_valores.columns.duplicated()]
+    total_linhas = len(pivot_valores)
 
-    # Ordenação pelo maior valor do ano mais recente (pela coluna do contexto)
-    if not pivot_valores.empty and len(pivot_valores.columns) > 0:
-        ultimo_ano_col = pivot_valores.columns.max()
-        pivot_valores = pivot_valores.sort_values(by=ultimo_ano_col, ascending=False)
+    # Ordenação pelo maior valor do ano mais recente, mantendo apenas a
+    # página solicitada + "Outros"
+    pivot_valores = selecionar_top_n(pivot_valores, top_n=top_n, offset=offset)
 
-    # 5. Calcular o DataFrame Final
     if metric_mode_tabela in ["Valor", "Pares"]:
         df_final = pivot_valores.copy()
     else:
-        # Calcular variação percentual ano a ano
-        pivot_perc = pivot_valores.pct_change(axis=1) * 100
-        # Remover primeira coluna (não tem ano anterior para comparar)
-        pivot_perc = pivot_perc.iloc[:, 1:]
-        # Manter a mesma ordem (já ordenada por valor absoluto)
-        df_final = pivot_perc
-
-    # 6. Renomear Colunas (formato: Nov/24 ou Jan-Nov/24)
+        # Variação percentual ano a ano; a primeira coluna não tem ano anterior
+        df_final = (pivot_valores.pct_change(axis=1) * 100).iloc[:, 1:]
+
+    if df_final.empty:
+        return pd.DataFrame()
+
+    # Renomear Colunas (formato: Nov/24 ou Jan-Nov/24)
     df_final.columns = [f"{prefixo_col}/{str(ano)[2:]}" for ano in df_final.columns]
 
-    # 7. Renomear índice
-    df_final.index.name = "País"
+    df_final.index.name = nome_indice
+    df_final.attrs["total_linhas"] = total_linhas
 
     return df_final
 
@@ -1550,17 +1726,19 @@ def preparar_dados_comex_pais_pivot(
 def display_comex_pais_view(
     df_comex,
     state_key_prefix,
-    set_expander_open,
     coluna_dados="valor",
+    obter_pivot_valores=None,
 ):
     """
     Exibe a tabela de comércio exterior por país dentro de um expander existente.
 
     Args:
-        df_comex: DataFrame com dados de comércio exterior (já filtrado por tipo)
+        df_comex: DataFrame com dados de comércio exterior (já filtrado por tipo).
+            Não é usado se `obter_pivot_valores` for informado.
         state_key_prefix: Prefixo para chaves de session_state
-        set_expander_open: Callback para manter expander aberto
         coluna_dados: Nome da coluna de dados ('valor' ou 'pares')
+        obter_pivot_valores: Função opcional (view_mode) -> (pivot_valores,
+            prefixo_col) que fornece a matriz já agregada (ex: pelo servidor)
     """
     # Controles de Visualização e Métrica
     col_view, col_metric = st.columns(2)
@@ -1591,19 +1769,35 @@ def display_comex_pais_view(
     # Coluna de dados é fixa baseada no contexto do expander
     coluna_valor = coluna_dados
 
-    # Campo de busca
-    texto_busca = st.text_input(
-        "🔍 Pesquisar País:",
-        key=f"{state_key_prefix}_pais_busca",
-        placeholder="Ex: Estados Unidos, China",
-    )
+    # Campo de busca e paginação
+    col_busca, col_linhas = st.columns([0.7, 0.3])
+    with col_busca:
+        texto_busca = st.text_input(
+            "🔍 Pesquisar País:",
+            key=f"{state_key_prefix}_pais_busca",
+            placeholder="Ex: Estados Unidos, China",
+        )
+    with col_linhas:
+        top_n, offset = selecionar_linhas_por_pagina(f"{state_key_prefix}_pais")
+
+    # A busca percorre todos os países, sem paginação
+    if texto_busca:
+        top_n, offset = None, 0
+        st.caption("A pesquisa considera todos os países; a paginação fica desativada.")
 
     # Preparar e exibir tabela
-    df_pivot = preparar_dados_comex_pais_pivot(
-        df_comex, coluna_valor, view_mode, metric_mode
+    if obter_pivot_valores is not None:
+        pivot_valores, prefixo_col = obter_pivot_valores(view_mode)
+    else:
+        pivot_valores, prefixo_col = agregar_comex_por_chave(
+            df_comex, "pais", coluna_valor, view_mode
+        )
+    df_pivot = finalizar_pivot_comex(
+        pivot_valores, prefixo_col, metric_mode, "País", top_n=top_n, offset=offset
     )
 
     if not df_pivot.empty:
+        total_linhas = df_pivot.attrs.get("total_linhas", len(df_pivot))
         if texto_busca:
             df_pivot = df_pivot[
                 df_pivot.index.str.contains(texto_busca, case=False, na=False)
@@ -1615,9 +1809,12 @@ def display_comex_pais_view(
         else:
             styler = styler.format(formatar_valor_br)
             # Usar cor verde - quanto maior o valor na coluna, mais verde
-            styler = styler.background_gradient(cmap="Greens", axis=0)
+            styler = styler.background_gradient(
+                cmap="Greens", axis=0, subset=subset_sem_outros(df_pivot)
+            )
 
         st.dataframe(styler, use_container_width=True)
+        exibir_seletor_pagina(f"{state_key_prefix}_pais", total_linhas, top_n)
     else:
         st.info("Sem dados para a seleção atual.")
 
@@ -1627,96 +1824,105 @@ def display_comex_pais_view(
 # =============================================================================
 
 
-@st.cache_data
-def preparar_dados_comex_tipo_pivot(
-    df, coluna_valor, coluna_tipo, view_mode_tabela, metric_mode_tabela
-):
+@rastrear(cache=st.cache_data)
+def preparar_pivot_comex_tipo_valores(df, coluna_valor, coluna_tipo, view_mode_tabela):
     """
-    Prepara e pivota os dados de comércio exterior por tipo.
-    Calcula a participação percentual de cada tipo no total.
+    Agrega e pivota os valores absolutos de comércio exterior por tipo.
+    Calculado uma única vez por (dataset, visualização); as métricas derivadas
+    (participação e variação) são obtidas a partir desta matriz.
 
     Args:
         df: DataFrame com colunas ano, mes, tipo, valor, pares
         coluna_valor: 'valor' ou 'pares'
         coluna_tipo: Nome da coluna de tipo (default: 'tipo')
         view_mode_tabela: 'Mês' ou 'Acumulado no Ano'
-        metric_mode_tabela: 'Valor', 'Pares', 'Participação (%)' ou 'Variação (%)'
 
     Returns:
-        DataFrame pivotado com tipos como índice e anos como colunas
+        Tupla (pivot_valores, prefixo_col), com tipos como índice (ordenados pelo
+        valor do ano mais recente) e anos como colunas
     """
     if df.empty:
-        return pd.DataFrame()
-
-    df_filtrado = df.copy()
-
-    if df_filtrado.empty:
-        return pd.DataFrame()
+        return pd.DataFrame(), ""
 
     # --- LÓGICA DO MÊS DE REFERÊNCIA ---
-    ultimo_ano_dados = df_filtrado["ano"].max()
-    ult_mes_referencia = df_filtrado[df_filtrado["ano"] == ultimo_ano_dados][
-        "mes"
-    ].max()
+    _, ult_mes_referencia = ultimo_periodo(df)
 
     # Preparar dados baseado na visualização
     if view_mode_tabela == "Mês":
         # Agregar valores apenas do mês específico para todos os anos
-        df_view = df_filtrado[df_filtrado["mes"] == ult_mes_referencia].copy()
-        df_grouped = (
-            df_view.groupby([coluna_tipo, "ano"])[coluna_valor].sum().reset_index()
-        )
+        df_view = df[df["mes"] == ult_mes_referencia]
         prefixo_col = f"{MESES_DIC[ult_mes_referencia][:3]}"
     else:  # Acumulado no Ano
         # Agregar valores de jan até o mês de referência para cada ano
-        df_acum = df_filtrado[df_filtrado["mes"] <= ult_mes_referencia].copy()
-        df_grouped = (
-            df_acum.groupby([coluna_tipo, "ano"])[coluna_valor].sum().reset_index()
-        )
+        df_view = df[df["mes"] <= ult_mes_referencia]
         prefixo_col = f"Jan-{MESES_DIC[ult_mes_referencia][:3]}"
 
-    if df_grouped.empty:
-        return pd.DataFrame()
+    if df_view.empty:
+        return pd.DataFrame(), prefixo_col
 
-    # 4. Pivotar valores absolutos
-    pivot_valores = df_grouped.pivot_table(
-        index=coluna_tipo,
-        columns="ano",
-        values=coluna_valor,
-        aggfunc="sum",
-        fill_value=0,
+    # Agregar e pivotar valores absolutos
+    pivot_valores = somar_por_chaves(
+        df_view, index=coluna_tipo, columns="ano", values=coluna_valor
     )
 
-    # Garantir que não há colunas duplicadas
-    pivot_valores = pivot_valores.loc[:, ~pivot_valores.columns.duplicated()]
-
     # Ordenação pelo maior valor do ano mais recente
-    if not pivot_valores.empty and len(pivot_valores.columns) > 0:
-        ultimo_ano_col = pivot_valores.columns.max()
-        pivot_valores = pivot_valores.sort_values(by=ultimo_ano_col, ascending=False)
+    pivot_valores = selecionar_top_n(pivot_valores)
 
-    # 5. Calcular o DataFrame Final baseado na métrica
-    if metric_mode_tabela in ["Valor", "Pares"]:
-        df_final = pivot_valores.copy()
-    elif metric_mode_tabela == "Participação (%)":
-        # Calcular participação percentual de cada tipo no total do ano
-        totais_por_ano = pivot_valores.sum(axis=0)
-        df_final = (pivot_valores / totais_por_ano * 100).round(1)
-    else:  # Variação (%)
-        # Calcular a variação percentual ano a ano
-        df_final = pivot_valores.pct_change(axis=1) * 100
-        # Remover a primeira coluna (não tem YoY)
-        if len(df_final.columns) > 1:
-            df_final = df_final.iloc[:, 1:]
+    return pivot_valores, prefixo_col
 
-    if df_final.empty:
+
+@rastrear
+def preparar_dados_comex_tipo_pivot(
+    df, coluna_valor, coluna_tipo, view_mode_tabela, metric_mode_tabela
+):
+    """
+    Prepara e pivota os dados de comércio exterior por tipo.
+    Calcula a participação percentual de cada tipo no total.
+
+    A agregação fica em cache em `preparar_pivot_comex_tipo_valores`; trocar a
+    métrica apenas aplica operações NumPy sobre a matriz já calculada.
+
+    Args:
+        df: DataFrame com colunas ano, mes, tipo, valor, pares
+        coluna_valor: 'valor' ou 'pares'
+        coluna_tipo: Nome da coluna de tipo (default: 'tipo')
+        view_mode_tabela: 'Mês' ou 'Acumulado no Ano'
+        metric_mode_tabela: 'Valor', 'Pares', 'Participação (%)' ou 'Variação (%)'
+
+    Returns:
+        DataFrame pivotado com tipos como índice e anos como colunas
+    """
+    pivot_valores, prefixo_col = preparar_pivot_comex_tipo_valores(
+        df, coluna_valor, coluna_tipo, view_mode_tabela
+    )
+
+    if pivot_valores.empty:
         return pd.DataFrame()
 
-    # 6. Renomear Colunas (formato: Nov/24 ou Jan-Nov/24)
-    df_final.columns = [f"{prefixo_col}/{str(ano)[2:]}" for ano in df_final.columns]
+    valores = pivot_valores.to_numpy(dtype="float64")
+    anos = pivot_valores.columns
+
+    # Calcular o DataFrame Final baseado na métrica
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if metric_mode_tabela in ["Valor", "Pares"]:
+            matriz = valores
+        elif metric_mode_tabela == "Participação (%)":
+            # Participação percentual de cada tipo no total do ano
+            matriz = np.round(valores / valores.sum(axis=0) * 100, 1)
+        else:  # Variação (%)
+            # Variação percentual ano a ano (sem a primeira coluna, que não tem YoY)
+            if valores.shape[1] > 1:
+                matriz = (valores[:, 1:] / valores[:, :-1] - 1) * 100
+                anos = anos[1:]
+            else:
+                matriz = np.full_like(valores, np.nan)
 
-    # 7. Renomear índice
-    df_final.index.name = "Tipo"
+    # Renomear Colunas (formato: Nov/24 ou Jan-Nov/24)
+    df_final = pd.DataFrame(
+        matriz,
+        index=pd.Index(pivot_valores.index, name="Tipo"),
+        columns=[f"{prefixo_col}/{str(ano)[2:]}" for ano in anos],
+    )
 
     return df_final
 
@@ -1724,7 +1930,6 @@ def preparar_dados_comex_tipo_pivot(
 def display_comex_tipo_view(
     df_comex,
     state_key_prefix,
-    set_expander_open,
     coluna_dados="valor",
     coluna_tipo="tipo",
 ):
@@ -1734,7 +1939,6 @@ def display_comex_tipo_view(
     Args:
         df_comex: DataFrame com dados de comércio exterior
         state_key_prefix: Prefixo para chaves de session_state
-        set_expander_open: Callback para manter expander aberto
         coluna_dados: Nome da coluna de dados ('valor' ou 'pares')
         coluna_tipo: Nome da coluna de tipo (default: 'tipo')
     """
@@ -1799,105 +2003,22 @@ def display_comex_tipo_view(
 # =============================================================================
 
 
-@st.cache_data
-def preparar_dados_comex_sh6_pivot(
-    df, coluna_valor, view_mode_tabela, metric_mode_tabela
-):
-    """
-    Prepara e pivota os dados de comércio exterior por SH6.
-
-    Args:
-        df: DataFrame com colunas ano, mes, id_sh6, descricao_sh6, valor
-        coluna_valor: 'valor'
-        view_mode_tabela: 'Mês' ou 'Acumulado no Ano'
-        metric_mode_tabela: 'Valor' ou 'Variação (%)'
-
-    Returns:
-        DataFrame pivotado com SH6 como índice e anos como colunas
-    """
-    if df.empty:
-        return pd.DataFrame()
-
-    df_filtrado = df.copy()
-
-    # Criar coluna combinada SH6
-    df_filtrado["sh6"] = (
-        df_filtrado["id_sh6"].astype(str) + " - " + df_filtrado["descricao_sh6"]
-    )
-
-    if df_filtrado.empty:
-        return pd.DataFrame()
-
-    # --- LÓGICA DO MÊS DE REFERÊNCIA ---
-    ultimo_ano_dados = df_filtrado["ano"].max()
-    ult_mes_referencia = df_filtrado[df_filtrado["ano"] == ultimo_ano_dados][
-        "mes"
-    ].max()
-
-    # Preparar dados baseado na visualização
-    if view_mode_tabela == "Mês":
-        df_view = df_filtrado[df_filtrado["mes"] == ult_mes_referencia].copy()
-        df_grouped = df_view.groupby(["sh6", "ano"])[coluna_valor].sum().reset_index()
-        prefixo_col = f"{MESES_DIC[ult_mes_referencia][:3]}"
-    else:  # Acumulado no Ano
-        df_acum = df_filtrado[df_filtrado["mes"] <= ult_mes_referencia].copy()
-        df_grouped = df_acum.groupby(["sh6", "ano"])[coluna_valor].sum().reset_index()
-        prefixo_col = f"Jan-{MESES_DIC[ult_mes_referencia][:3]}"
-
-    if df_grouped.empty:
-        return pd.DataFrame()
-
-    # Pivotar valores absolutos
-    pivot_valores = df_grouped.pivot_table(
-        index="sh6",
-        columns="ano",
-        values=coluna_valor,
-        aggfunc="sum",
-        fill_value=0,
-    )
-
-    # Garantir que não há colunas duplicadas
-    pivot_valores = pivot_valores.loc[:, ~pivot_valores.columns.duplicated()]
-
-    # Ordenação pelo maior valor do ano mais recente
-    if not pivot_valores.empty and len(pivot_valores.columns) > 0:
-        ultimo_ano_col = pivot_valores.columns.max()
-        pivot_valores = pivot_valores.sort_values(by=ultimo_ano_col, ascending=False)
-
-    # Calcular o DataFrame Final
-    if metric_mode_tabela == "Valor":
-        df_final = pivot_valores.copy()
-    else:  # Variação (%)
-        df_final = pivot_valores.pct_change(axis=1) * 100
-        if len(df_final.columns) > 1:
-            df_final = df_final.iloc[:, 1:]
-
-    if df_final.empty:
-        return pd.DataFrame()
-
-    # Renomear Colunas
-    df_final.columns = [f"{prefixo_col}/{str(ano)[2:]}" for ano in df_final.columns]
-
-    # Renomear índice
-    df_final.index.name = "SH6"
-
-    return df_final
-
-
 def display_comex_sh6_view(
     df_comex,
     state_key_prefix,
-    set_expander_open,
     coluna_dados="valor",
+    obter_pivot_valores=None,
 ):
     """
     Exibe a tabela de comércio exterior por SH6.
 
     Args:
-        df_comex: DataFrame com dados de comércio exterior (já filtrado)
+        df_comex: DataFrame com dados de comércio exterior (já filtrado).
+            Não é usado se `obter_pivot_valores` for informado.
         state_key_prefix: Prefixo para chaves de session_state
-        set_expander_open: Callback para manter expander aberto
         coluna_dados: Nome da coluna de dados ('valor')
+        obter_pivot_valores: Função opcional (view_mode) -> (pivot_valores,
+            prefixo_col) que fornece a matriz já agregada (ex: pelo servidor)
     """
     # Controles de Visualização e Métrica
     col_view, col_metric = st.columns(2)
@@ -1922,19 +2043,37 @@ def display_comex_sh6_view(
         if not metric_mode:
             metric_mode = "Valor"
 
-    # Campo de busca
-    texto_busca = st.text_input(
-        "🔍 Pesquisar SH6:",
-        key=f"{state_key_prefix}_sh6_busca",
-        placeholder="Ex: 640399, calçado",
-    )
+    # Campo de busca e paginação
+    col_busca, col_linhas = st.columns([0.7, 0.3])
+    with col_busca:
+        texto_busca = st.text_input(
+            "🔍 Pesquisar SH6:",
+            key=f"{state_key_prefix}_sh6_busca",
+            placeholder="Ex: 640399, calçado",
+        )
+    with col_linhas:
+        top_n, offset = selecionar_linhas_por_pagina(f"{state_key_prefix}_sh6")
+
+    # A busca percorre todos os códigos, sem paginação
+    if texto_busca:
+        top_n, offset = None, 0
+        st.caption(
+            "A pesquisa considera todos os códigos; a paginação fica desativada."
+        )
 
     # Preparar e exibir tabela
-    df_pivot = preparar_dados_comex_sh6_pivot(
-        df_comex, coluna_dados, view_mode, metric_mode
+    if obter_pivot_valores is not None:
+        pivot_valores, prefixo_col = obter_pivot_valores(view_mode)
+    else:
+        pivot_valores, prefixo_col = agregar_comex_por_chave(
+            df_comex, "sh6", coluna_dados, view_mode
+        )
+    df_pivot = finalizar_pivot_comex(
+        pivot_valores, prefixo_col, metric_mode, "SH6", top_n=top_n, offset=offset
     )
 
     if not df_pivot.empty:
+        total_linhas = df_pivot.attrs.get("total_linhas", len(df_pivot))
         if texto_busca:
             df_pivot = df_pivot[
                 df_pivot.index.str.contains(texto_busca, case=False, na=False)
@@ -1945,9 +2084,12 @@ def display_comex_sh6_view(
             styler = styler.format(formatar_pct_br).map(style_saldo_variacao)
         else:
             styler = styler.format(formatar_valor_br)
-            styler = styler.background_gradient(cmap="Greens", axis=0)
+            styler = styler.background_gradient(
+                cmap="Greens", axis=0, subset=subset_sem_outros(df_pivot)
+            )
 
         st.dataframe(styler, use_container_width=True)
+        exibir_seletor_pagina(f"{state_key_prefix}_sh6", total_linhas, top_n)
     else:
         st.info("Sem dados para a seleção atual.")
 
@@ -1957,32 +2099,78 @@ def display_comex_sh6_view(
 # =============================================================================
 
 
+def obter_pivot_detalhe_comex(
+    carregar_dados, tipo_selecionado, chave, coluna_valor, view_mode_tabela
+):
+    """
+    Matriz de valores absolutos (chave x ano) da tabela de detalhe (país ou SH6)
+    para a seleção atual, carregada sob demanda.
+
+    Tenta primeiro a agregação no servidor (RPC), que transfere apenas a matriz.
+    Se ela não estiver disponível, carrega as linhas (apenas o recorte da
+    vertical/componente selecionada) e agrega em pandas. Uma RPC recusada não é
+    tentada de novo por alguns minutos (ver data_loader.AGREGACAO_INDISPONIVEL_TTL).
+    Apenas falhas esperadas do servidor levam ao caminho em pandas; outros erros
+    são propagados.
+
+    Args:
+        carregar_dados: Função de carregamento que aceita `categoria` e `agregacao`
+        tipo_selecionado: "Total" ou nome da vertical/componente
+        chave: 'pais' ou 'sh6'
+        coluna_valor: 'valor' ou 'pares'
+        view_mode_tabela: 'Mês' ou 'Acumulado no Ano'
+
+    Returns:
+        Tupla (pivot_valores, prefixo_col)
+    """
+    import httpx
+
+    from src.data_loader import AgregacaoIndisponivel
+
+    filtro = {} if tipo_selecionado == "Total" else {"categoria": tipo_selecionado}
+
+    with st.spinner("Carregando dados detalhados..."):
+        try:
+            df_agregado = carregar_dados(
+                agregacao=(chave, coluna_valor, view_mode_tabela), **filtro
+            )
+        except (AgregacaoIndisponivel, CircuitoAberto, httpx.HTTPError) as e:
+            logger.debug("Agregação no servidor indisponível (%s): %s", chave, e)
+            df_agregado = pd.DataFrame()
+
+        if not df_agregado.empty:
+            return pivot_de_agregacao_servidor(df_agregado, view_mode_tabela)
+
+        df_detalhe = carregar_dados(**filtro)
+        return agregar_comex_por_chave(
+            df_detalhe, chave, coluna_valor, view_mode_tabela
+        )
+
+
 def display_comex_vertical_grafico(
     df_comex,
-    df_comex_pais,
-    df_comex_sh6,
+    carregar_dados_pais,
+    carregar_dados_sh6,
     df_filtrado,
-    df_filtrado_pais,
-    df_filtrado_sh6,
     tipo_selecionado,
     state_key_prefix,
-    set_expander_open_callback,
     coluna_tipo="vertical",
 ):
     """
     Exibe o gráfico de comércio exterior para verticais.
     Inclui visualizações: Histórico Mensal, Acumulado no Ano, Por País, Por Vertical, Por SH6
 
+    As tabelas por país e por SH6 só são carregadas quando a visualização
+    correspondente é aberta, e apenas para a vertical selecionada (agregadas no
+    servidor quando possível).
+
     Args:
         df_comex: DataFrame com dados agregados por vertical (original, para view "Por Vertical")
-        df_comex_pais: DataFrame com dados por vertical e país (original)
-        df_comex_sh6: DataFrame com dados por vertical e SH6 (original)
+        carregar_dados_pais: Função que carrega os dados por país (aceita `categoria` e `agregacao`)
+        carregar_dados_sh6: Função que carrega os dados por SH6 (aceita `categoria` e `agregacao`)
         df_filtrado: DataFrame filtrado pela vertical selecionada
-        df_filtrado_pais: DataFrame de país filtrado pela vertical
-        df_filtrado_sh6: DataFrame de SH6 filtrado pela vertical
         tipo_selecionado: Vertical selecionada ("Total" ou nome da vertical)
         state_key_prefix: Prefixo para chaves de session_state
-        set_expander_open_callback: Callback para manter expander aberto
         coluna_tipo: Nome da coluna de tipo/categoria (default: 'vertical')
     """
     coluna_dados = "valor"  # Vertical sempre usa valor
@@ -2014,14 +2202,17 @@ def display_comex_vertical_grafico(
 
     # === VISUALIZAÇÃO POR PAÍS ===
     if tab_selection == "Por País":
-        if df_filtrado_pais.empty:
-            st.info("Sem dados por país para a seleção atual.")
-            return
         display_comex_pais_view(
-            df_comex=df_filtrado_pais,
+            df_comex=None,
             state_key_prefix=state_key_prefix,
-            set_expander_open=set_expander_open_callback,
             coluna_dados=coluna_dados,
+            obter_pivot_valores=partial(
+                obter_pivot_detalhe_comex,
+                carregar_dados_pais,
+                tipo_selecionado,
+                "pais",
+                coluna_dados,
+            ),
         )
         return
 
@@ -2030,7 +2221,6 @@ def display_comex_vertical_grafico(
         display_comex_tipo_view(
             df_comex=df_comex,  # Usa df original, não filtrado por tipo
             state_key_prefix=state_key_prefix,
-            set_expander_open=set_expander_open_callback,
             coluna_dados=coluna_dados,
             coluna_tipo=coluna_tipo,
         )
@@ -2038,20 +2228,30 @@ def display_comex_vertical_grafico(
 
     # === VISUALIZAÇÃO POR SH6 ===
     if tab_selection == "Por SH6":
-        if df_filtrado_sh6.empty:
-            st.info("Sem dados por SH6 para a seleção atual.")
-            return
         display_comex_sh6_view(
-            df_comex=df_filtrado_sh6,
+            df_comex=None,
             state_key_prefix=state_key_prefix,
-            set_expander_open=set_expander_open_callback,
             coluna_dados=coluna_dados,
+            obter_pivot_valores=partial(
+                obter_pivot_detalhe_comex,
+                carregar_dados_sh6,
+                tipo_selecionado,
+                "sh6",
+                coluna_dados,
+            ),
         )
         return
 
     # === VISUALIZAÇÕES HISTÓRICO MENSAL E ACUMULADO ===
     if tab_selection == "Histórico Mensal":
-        df_preparado = preparar_dados_comex_grafico(df_filtrado, coluna_dados)
+        series_mensais, _ = preparar_series_comex_por_categoria(
+            df_comex, coluna_dados, coluna_tipo
+        )
+        df_preparado = serie_da_categoria(
+            series_mensais,
+            tipo_selecionado,
+            ["date", coluna_dados, "yoy", "valor_label", "yoy_label"],
+        )
 
         if df_preparado.empty:
             st.info("Não há dados suficientes para o gráfico.")
@@ -2113,11 +2313,15 @@ def display_comex_vertical_grafico(
         st.plotly_chart(fig, use_container_width=True)
 
     else:  # Acumulado no Ano
-        ult_ano = df_filtrado["ano"].max()
-        ult_mes = df_filtrado[df_filtrado["ano"] == ult_ano]["mes"].max()
+        ult_ano, ult_mes = ultimo_periodo(df_filtrado)
 
-        df_preparado_acum = preparar_dados_comex_acu_comparativo(
-            df_filtrado, coluna_dados, ult_mes
+        _, series_acumuladas = preparar_series_comex_por_categoria(
+            df_comex, coluna_dados, coluna_tipo
+        )
+        df_preparado_acum = serie_da_categoria(
+            series_acumuladas,
+            tipo_selecionado,
+            COLUNAS_SERIE_ACUMULADA,
         )
 
         fluxo = "Exportação" if "exp" in state_key_prefix else "Importação"
@@ -2137,34 +2341,32 @@ def display_comex_vertical_grafico(
 
 def display_comex_vertical_analise(
     df_comex,
-    df_comex_pais,
-    df_comex_sh6,
+    carregar_dados_pais,
+    carregar_dados_sh6,
     titulo_expander,
     titulo_kpi,
     state_key_prefix,
     categoria_kpi,
-    set_expander_open,
-    expander_state_key="vertical_comex_expander_state",
     coluna_tipo="vertical",
     usar_expander=True,
 ):
     """
     Função auxiliar para renderizar um bloco completo de Comércio Exterior Vertical.
+    O bloco é um fragmento: interações com seus widgets reexecutam apenas ele.
 
     Args:
         df_comex: DataFrame com dados agregados
-        df_comex_pais: DataFrame com dados por país
-        df_comex_sh6: DataFrame com dados por SH6
+        carregar_dados_pais: Função que carrega os dados por país (aceita `categoria`)
+        carregar_dados_sh6: Função que carrega os dados por SH6 (aceita `categoria`)
         titulo_expander: Título do expander
         titulo_kpi: Título para os KPIs
         state_key_prefix: Prefixo para chaves de session_state
         categoria_kpi: Categoria para os KPIs (ex: 'Exportação')
-        set_expander_open: Callback para manter expander aberto
-        expander_state_key: Chave do session_state para o expander
         coluna_tipo: Nome da coluna de tipo/categoria (default: 'vertical')
         usar_expander: Se True, envolve o conteúdo em um expander. Se False, exibe diretamente.
     """
 
+    @st.fragment
     def render_content():
         # Verificar se DataFrame está vazio
         if df_comex.empty:
@@ -2178,7 +2380,7 @@ def display_comex_vertical_analise(
         tipo_plural = f"{tipo_label}s"  # "Verticais", "Componentes"
 
         # Seletor no topo (afeta cards e gráficos)
-        opcoes_filtro = ["Total"] + sorted(list(df_comex[coluna_tipo].unique()))
+        opcoes_filtro = ["Total"] + listar_categorias(df_comex, coluna_tipo)
 
         col_tipo, _ = st.columns(2)
         with col_tipo:
@@ -2191,21 +2393,9 @@ def display_comex_vertical_analise(
         # Filtrar dados pelo tipo selecionado
         if tipo_selecionado == "Total":
             df_filtrado = df_comex
-            df_filtrado_pais = df_comex_pais
-            df_filtrado_sh6 = df_comex_sh6
             titulo_kpi_dinamico = f"{titulo_kpi} - Total dos {tipo_plural}"
         else:
-            df_filtrado = df_comex[df_comex[coluna_tipo] == tipo_selecionado]
-            df_filtrado_pais = (
-                df_comex_pais[df_comex_pais[coluna_tipo] == tipo_selecionado]
-                if not df_comex_pais.empty and coluna_tipo in df_comex_pais.columns
-                else pd.DataFrame()
-            )
-            df_filtrado_sh6 = (
-                df_comex_sh6[df_comex_sh6[coluna_tipo] == tipo_selecionado]
-                if not df_comex_sh6.empty and coluna_tipo in df_comex_sh6.columns
-                else pd.DataFrame()
-            )
+            df_filtrado = filtrar_categoria(df_comex, coluna_tipo, tipo_selecionado)
             titulo_kpi_dinamico = f"{titulo_kpi} - {tipo_selecionado}"
 
         # KPI Cards com dados filtrados
@@ -2221,22 +2411,16 @@ def display_comex_vertical_analise(
         # Gráficos com dados filtrados
         display_comex_vertical_grafico(
             df_comex=df_comex,
-            df_comex_pais=df_comex_pais,
-            df_comex_sh6=df_comex_sh6,
+            carregar_dados_pais=carregar_dados_pais,
+            carregar_dados_sh6=carregar_dados_sh6,
             df_filtrado=df_filtrado,
-            df_filtrado_pais=df_filtrado_pais,
-            df_filtrado_sh6=df_filtrado_sh6,
             tipo_selecionado=tipo_selecionado,
             state_key_prefix=state_key_prefix,
-            set_expander_open_callback=set_expander_open,
             coluna_tipo=coluna_tipo,
         )
 
     if usar_expander:
-        with st.expander(
-            titulo_expander,
-            expanded=st.session_state.get(expander_state_key, False),
-        ):
+        with st.expander(titulo_expander, expanded=False):
             render_content()
     else:
         render_content()
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.agregacao import somar_por_chaves
+
+
+@pytest.fixture
+def df():
+    gerador = np.random.default_rng(1)
+    n = 500
+    return pd.DataFrame(
+        {
+            "grupo": gerador.choice(["b", "a", "c", None], n),
+            "ano": gerador.choice([2023, 2024, 2025], n),
+            "valor": gerador.normal(100, 10, n),
+            "pares": gerador.integers(0, 50, n),
+        }
+    )
+
+
+def test_equivale_ao_pivot_table(df):
+    resultado = somar_por_chaves(df, index="grupo", columns="ano", values="valor")
+    esperado = df.pivot_table(
+        index="grupo", columns="ano", values="valor", aggfunc="sum", fill_value=0
+    )
+
+    pd.testing.assert_frame_equal(
+        resultado, esperado, check_names=False, check_column_type=False
+    )
+
+
+def test_soma_de_inteiros_continua_inteira(df):
+    resultado = somar_por_chaves(df, index="grupo", columns="ano", values="pares")
+
+    assert (resultado.dtypes == "int64").all()
+
+
+def test_sem_colunas_retorna_coluna_de_valores(df):
+    resultado = somar_por_chaves(df, index="grupo", values="valor")
+    esperado = df.groupby("grupo")["valor"].sum()
+
+    np.testing.assert_allclose(resultado["valor"], esperado.loc[resultado.index])
+
+
+def test_chave_categorica_gera_indice_comum(df):
+    df["grupo"] = df["grupo"].astype("category")
+
+    resultado = somar_por_chaves(df, index="grupo", columns="ano", values="valor")
+
+    assert not isinstance(resultado.index, pd.CategoricalIndex)
+    assert list(resultado.index) == ["a", "b", "c"]
@@ -0,0 +1,57 @@
+import io
+
+import pandas as pd
+import pytest
+
+from src.resiliencia import CircuitoAberto
+from src.utils import obter_pivot_detalhe_comex
+
+TABELA = "assintecal_exp_vertical_pais"
+CSV_DETALHE = (
+    "ano,mes,vertical,pais,valor\n"
+    "2024,3,Calçados,China,10.0\n"
+    "2024,3,Calçados,Chile,5.0\n"
+    "2025,3,Calçados,China,12.0\n"
+)
+
+
+def test_rpc_ausente_e_tentada_uma_unica_vez(data_loader_stub, backend_stub):
+    backend_stub.tabelas[TABELA] = CSV_DETALHE
+
+    def carregar(**kwargs):
+        return data_loader_stub.carregar_dados_exp_vertical_pais((2024, 2025), **kwargs)
+
+    for _ in range(3):
+        pivot, prefixo = obter_pivot_detalhe_comex(
+            carregar, "Calçados", "pais", "valor", "Mês"
+        )
+
+    rpc = f"/rest/v1/rpc/{data_loader_stub.FUNCAO_AGREGAR_COMEX}"
+    assert backend_stub.contar("POST", rpc) == 1
+    assert backend_stub.contar("GET", f"/rest/v1/{TABELA}") == 1
+    assert prefixo == "Mar"
+    assert pivot.loc["China"].tolist() == [10.0, 12.0]
+
+
+def test_erro_inesperado_na_agregacao_nao_vira_caminho_em_pandas():
+    chamadas = []
+
+    def carregar(**kwargs):
+        chamadas.append(kwargs)
+        raise KeyError("coluna_inexistente")
+
+    with pytest.raises(KeyError):
+        obter_pivot_detalhe_comex(carregar, "Total", "pais", "valor", "Mês")
+    assert len(chamadas) == 1
+
+
+def test_circuito_aberto_recorre_a_tabela_completa():
+    detalhe = pd.read_csv(io.StringIO(CSV_DETALHE))
+
+    def carregar(agregacao=None, **kwargs):
+        if agregacao is not None:
+            raise CircuitoAberto("Backend indisponível.")
+        return detalhe
+
+    pivot, _ = obter_pivot_detalhe_comex(carregar, "Total", "pais", "valor", "Mês")
+    assert pivot.loc["Chile"].tolist() == [5.0, 0.0]
@@ -0,0 +1,228 @@
+import socketserver
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src import armazenamento
+from src.armazenamento import (
+    ArmazenamentoDisco,
+    ArmazenamentoMemoria,
+    ArmazenamentoRedis,
+    ClienteRESP,
+    ErroRESP,
+    _nome_chave,
+    mapear_dataset,
+)
+from src.cache import cache_swr, invalidar
+
+CHAVE = ("assintecal_producao", (), 2024)
+
+
+class ServidorRESP:
+    """
+    Servidor local que fala o protocolo Redis (RESP2) com GET, SET [EX], AUTH e
+    SELECT, guardando os valores em memória. Conta os comandos recebidos e
+    permite derrubar as conexões abertas.
+    """
+
+    def __init__(self, senha=None):
+        self.valores = {}
+        self.expiracoes = {}
+        self.comandos = []
+        self.senha = senha
+        self._conexoes = []
+        servidor = self
+
+        class Manipulador(socketserver.StreamRequestHandler):
+            def handle(self):
+                servidor._conexoes.append(self.request)
+                autenticado = servidor.senha is None
+                while True:
+                    try:
+                        argumentos = self._ler_comando()
+                    except (ConnectionError, OSError, ValueError):
+                        return
+                    if argumentos is None:
+                        return
+                    nome = argumentos[0].upper()
+                    servidor.comandos.append(nome)
+                    if nome == b"AUTH":
+                        autenticado = argumentos[1].decode() == servidor.senha
+                        self._responder(
+                            b"+OK\r\n" if autenticado else b"-ERR senha\r\n"
+                        )
+                    elif not autenticado:
+                        self._responder(b"-NOAUTH Authentication required.\r\n")
+                    elif nome == b"SELECT":
+                        self._responder(b"+OK\r\n")
+                    elif nome == b"SET":
+                        servidor.valores[argumentos[1]] = argumentos[2]
+                        if len(argumentos) == 5 and argumentos[3].upper() == b"EX":
+                            servidor.expiracoes[argumentos[1]] = int(argumentos[4])
+                        self._responder(b"+OK\r\n")
+                    elif nome == b"GET":
+                        valor = servidor.valores.get(argumentos[1])
+                        if valor is None:
+                            self._responder(b"$-1\r\n")
+                        else:
+                            self._responder(b"$%d\r\n%s\r\n" % (len(valor), valor))
+                    else:
+                        self._responder(b"-ERR unknown command\r\n")
+
+            def _ler_comando(self):
+                linha = self.rfile.readline()
+                if not linha:
+                    return None
+                argumentos = []
+                for _ in range(int(linha[1:-2])):
+                    tamanho = int(self.rfile.readline()[1:-2])
+                    argumentos.append(self.rfile.read(tamanho + 2)[:-2])
+                return argumentos
+
+            def _responder(self, dados):
+                self.wfile.write(dados)
+                self.wfile.flush()
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._servidor = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Manipulador)
+        self._servidor.daemon_threads = True
+        self.porta = self._servidor.server_address[1]
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+
+    def url(self, db=0):
+        senha = f":{self.senha}@" if self.senha else ""
+        return f"redis://{senha}127.0.0.1:{self.porta}/{db}"
+
+    def derrubar_conexoes(self):
+        for conexao in self._conexoes:
+            conexao.close()
+        self._conexoes.clear()
+        time.sleep(0.05)
+
+    def encerrar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+
+@pytest.fixture
+def servidor():
+    servidor = ServidorRESP()
+    yield servidor
+    servidor.encerrar()
+
+
+def _tabela():
+    return pa.table({"ano": [2024, 2024], "pais": ["China", None], "valor": [1.5, 2.0]})
+
+
+def test_grava_e_le_tabela_com_ttl(servidor):
+    armazenamento = ArmazenamentoRedis(servidor.url())
+
+    armazenamento.gravar(CHAVE, _tabela(), 300)
+
+    assert armazenamento.ler(CHAVE).equals(_tabela())
+    assert servidor.expiracoes[_nome_chave(CHAVE).encode()] == 300
+
+
+def test_chave_ausente_e_falha_de_cache(servidor):
+    assert ArmazenamentoRedis(servidor.url()).ler(CHAVE) is None
+
+
+def test_valor_corrompido_e_falha_de_cache(servidor):
+    armazenamento = ArmazenamentoRedis(servidor.url())
+    armazenamento.gravar(CHAVE, _tabela(), 300)
+    nome = _nome_chave(CHAVE).encode()
+    servidor.valores[nome] = servidor.valores[nome][:50]
+
+    assert armazenamento.ler(CHAVE) is None
+
+
+def test_reconecta_apos_queda_da_conexao(servidor):
+    armazenamento = ArmazenamentoRedis(servidor.url())
+    armazenamento.gravar(CHAVE, _tabela(), 300)
+
+    servidor.derrubar_conexoes()
+
+    assert armazenamento.ler(CHAVE).equals(_tabela())
+
+
+def test_servidor_fora_do_ar_e_falha_de_cache(servidor):
+    armazenamento = ArmazenamentoRedis(servidor.url())
+    servidor.encerrar()
+
+    armazenamento.gravar(CHAVE, _tabela(), 300)
+    assert armazenamento.ler(CHAVE) is None
+
+
+def test_autentica_e_seleciona_o_banco():
+    servidor = ServidorRESP(senha="segredo")
+    try:
+        cliente = ClienteRESP(servidor.url(db=2))
+        assert cliente.comando("SET", "k", b"v") == "OK"
+        assert cliente.comando("GET", "k") == b"v"
+        assert servidor.comandos[:2] == [b"AUTH", b"SELECT"]
+    finally:
+        servidor.encerrar()
+
+
+def test_erro_do_servidor_vira_erro_resp(servidor):
+    with pytest.raises(ErroRESP):
+        ClienteRESP(servidor.url()).comando("INCR", "k")
+
+
+def test_disco_grava_le_e_ignora_arquivo_corrompido(tmp_path):
+    armazenamento = ArmazenamentoDisco(str(tmp_path))
+    armazenamento.gravar(CHAVE, _tabela(), 300)
+    assert armazenamento.ler(CHAVE).equals(_tabela())
+
+    with open(armazenamento._caminho(CHAVE), "wb") as f:
+        f.write(b"corrompido")
+    assert armazenamento.ler(CHAVE) is None
+
+
+def test_cache_entrega_o_dataset_mapeado_sem_copiar_os_buffers(tmp_path, monkeypatch):
+    monkeypatch.setattr(armazenamento, "DIRETORIO_DATASETS", str(tmp_path))
+    df = pd.DataFrame({"ano": [2023, 2024, 2025], "valor": [1.5, 2.5, 4.5]})
+
+    @cache_swr(ttl=60)
+    def carregar():
+        return mapear_dataset(CHAVE, df, 300)
+
+    try:
+        carregar()
+        recebido = carregar()
+
+        valores = recebido["valor"].to_numpy()
+        assert not valores.flags.writeable
+
+        # Alterar o arquivo aparece no frame recebido: ele lê as páginas do mmap
+        caminho = armazenamento._caminho_dataset(CHAVE)
+        with open(caminho, "rb") as f:
+            posicao = f.read().find(np.float64(4.5).tobytes())
+        with open(caminho, "r+b") as f:
+            f.seek(posicao)
+            f.write(np.float64(99.0).tobytes())
+        assert recebido["valor"].tolist() == [1.5, 2.5, 99.0]
+    finally:
+        invalidar(lambda valor: True)
+
+
+def test_memoria_expira_pelo_ttl_e_descarta_as_menos_usadas(monkeypatch):
+    relogio = [1000.0]
+    monkeypatch.setattr(armazenamento.time, "monotonic", lambda: relogio[0])
+    memoria = ArmazenamentoMemoria(max_tabelas=2)
+
+    memoria.gravar(("a",), _tabela(), 60)
+    memoria.gravar(("b",), _tabela(), 600)
+    memoria.ler(("a",))
+    memoria.gravar(("c",), _tabela(), 600)
+    assert memoria.ler(("b",)) is None
+    assert memoria.ler(("a",)) is not None
+
+    relogio[0] += 61
+    assert memoria.ler(("a",)) is None
+    assert memoria.ler(("c",)) is not None
@@ -0,0 +1,87 @@
+import time
+
+import pandas as pd
+import pytest
+
+from src import cache, rastreamento
+from src.cache import cache_swr, invalidar
+from src.rastreamento import rastrear
+
+
+@pytest.fixture(autouse=True)
+def cache_vazio():
+    invalidar(lambda valor: True)
+    yield
+    invalidar(lambda valor: True)
+
+
+def test_acerto_devolve_o_frame_cacheado_sem_copia():
+    chamadas = []
+
+    @cache_swr(ttl=60)
+    def carregar():
+        chamadas.append(1)
+        return pd.DataFrame({"valor": [1.0, 2.0]})
+
+    primeiro = carregar()
+    segundo = carregar()
+
+    assert segundo is primeiro
+    assert len(chamadas) == 1
+
+
+def test_descarta_as_entradas_menos_usadas_acima_do_limite(monkeypatch):
+    monkeypatch.setattr(cache, "MAX_ENTRADAS", 2)
+    chamadas = []
+
+    @cache_swr(ttl=60)
+    def carregar(ano):
+        chamadas.append(ano)
+        return ano
+
+    carregar(2023)
+    carregar(2024)
+    carregar(2023)  # 2024 passa a ser a menos usada
+    carregar(2025)
+    carregar(2023)
+    carregar(2024)
+
+    assert chamadas == [2023, 2024, 2025, 2024]
+
+
+def test_descarta_entradas_sem_acesso_por_um_ttl():
+    chamadas = []
+
+    @cache_swr(ttl=0.05)
+    def carregar(ano):
+        chamadas.append(ano)
+        return ano
+
+    carregar(2023)
+    time.sleep(0.1)
+    carregar(2024)  # a inserção descarta a entrada ociosa de 2023
+
+    assert invalidar(lambda valor: valor == 2023) == 0
+    assert chamadas == [2023, 2024]
+
+
+def test_cache_nao_rastreia_sozinho_e_marca_acerto_no_carregador_rastreado(
+    monkeypatch,
+):
+    monkeypatch.setattr(rastreamento, "RASTREAMENTO_ATIVO", True)
+    rastreamento.limpar_rastreamento()
+
+    def ler(ano):
+        return pd.DataFrame({"ano": [ano]})
+
+    carregar = cache_swr(ttl=60)(ler)
+    carregar(2024)
+    assert rastreamento.registros_rastreamento() == []
+
+    carregar_rastreado = rastrear(cache_swr(ttl=60)(ler))
+    carregar_rastreado(2025)
+    carregar_rastreado(2025)
+    registros = rastreamento.registros_rastreamento()
+    assert [r["cache"] for r in registros] == ["falha", "acerto"]
+    assert all(r["nome"].endswith(".ler") for r in registros)
+    rastreamento.limpar_rastreamento()
@@ -0,0 +1,82 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.armazenamento import ArmazenamentoMemoria
+from src.cache import cache_swr
+from src.particoes import CacheParticoes
+
+TABELA = "assintecal_producao"
+CAMINHO_TABELA = f"/rest/v1/{TABELA}"
+SESSOES = 20
+
+
+def _csv(taxa):
+    return (
+        f"ano,mes,grupo,taxa_mensal\n2024,1,Calçados,{taxa}\n2024,2,Calçados,{taxa}\n"
+    )
+
+
+def _em_paralelo(funcao, sessoes=SESSOES):
+    """Executa `funcao` em `sessoes` threads liberadas ao mesmo tempo."""
+    largada = threading.Barrier(sessoes)
+
+    def sessao(_):
+        largada.wait()
+        inicio = time.perf_counter()
+        return funcao(), time.perf_counter() - inicio
+
+    with ThreadPoolExecutor(max_workers=sessoes) as executor:
+        return list(executor.map(sessao, range(sessoes)))
+
+
+def test_carga_a_frio_concorrente_faz_uma_unica_leitura(data_loader_stub, backend_stub):
+    backend_stub.tabelas[TABELA] = _csv(1.5)
+    backend_stub.atraso = 0.3
+
+    resultados = _em_paralelo(lambda: data_loader_stub.carregar_dados_producao((2024,)))
+
+    assert backend_stub.contar("GET", CAMINHO_TABELA) == 1
+    for df, _ in resultados:
+        assert df["taxa_mensal"].tolist() == [1.5, 1.5]
+
+
+def test_expirado_serve_o_valor_antigo_e_revalida_uma_vez(
+    data_loader_stub, backend_stub, monkeypatch
+):
+    ttl = 0.2
+    monkeypatch.setattr(
+        data_loader_stub,
+        "PARTICOES",
+        CacheParticoes(ttl=ttl, armazenamento=ArmazenamentoMemoria()),
+    )
+
+    @cache_swr(ttl=ttl)
+    def carregar(anos):
+        return data_loader_stub._carregar_tabela(TABELA, anos)
+
+    backend_stub.tabelas[TABELA] = _csv(1.5)
+    assert carregar((2024,))["taxa_mensal"].tolist() == [1.5, 1.5]
+    assert backend_stub.contar("GET", CAMINHO_TABELA) == 1
+
+    # Nova versão no backend, que agora demora a responder
+    backend_stub.tabelas[TABELA] = _csv(2.5)
+    backend_stub.atraso = 1.0
+    time.sleep(ttl * 2)
+
+    resultados = _em_paralelo(lambda: carregar((2024,)))
+
+    # Todas as sessões recebem a versão antiga na hora, sem esperar o backend
+    for df, duracao in resultados:
+        assert df["taxa_mensal"].tolist() == [1.5, 1.5]
+        assert duracao < backend_stub.atraso / 2
+
+    # Uma única atualização em segundo plano troca a versão em cache
+    limite = time.monotonic() + 5
+    while time.monotonic() < limite:
+        if carregar((2024,))["taxa_mensal"].tolist() == [2.5, 2.5]:
+            break
+        time.sleep(0.05)
+    else:
+        raise AssertionError("A nova versão não substituiu a antiga no cache.")
+    assert backend_stub.contar("GET", CAMINHO_TABELA) == 2
@@ -0,0 +1,16 @@
+from src.data_loader import _decodificar_csv
+
+
+def test_colunas_de_texto_mantem_zeros_a_esquerda():
+    conteudo = b"ano,mes,id_sh6,valor\n2024,1,040310,1.5\n2024,2,640399,\n"
+
+    tabela = _decodificar_csv(conteudo)
+    df = tabela.to_pandas()
+
+    assert df["id_sh6"].tolist() == ["040310", "640399"]
+    assert df["ano"].dtype == "int64"
+    assert df["valor"].isna().tolist() == [False, True]
+
+
+def test_resposta_vazia_gera_tabela_vazia():
+    assert _decodificar_csv(b"\n").num_rows == 0
@@ -0,0 +1,25 @@
+TABELA_FORA_DO_MANIFESTO = "assintecal_taxa_cambio"
+
+
+def test_nova_versao_no_manifesto_descarta_os_resumos_da_home(
+    data_loader_stub, backend_stub, monkeypatch
+):
+    manifesto = {
+        "assintecal_producao": {"tabela": "assintecal_producao", "versao": "a"}
+    }
+    monkeypatch.setattr(data_loader_stub, "carregar_manifesto", lambda: manifesto)
+    monkeypatch.setattr(data_loader_stub, "_VERSOES_SINCRONIZADAS", None)
+    data_loader_stub._consultar_resumo_tabela.clear()
+    caminho = f"/rest/v1/{TABELA_FORA_DO_MANIFESTO}"
+
+    data_loader_stub.sincronizar_com_manifesto()
+    data_loader_stub._consultar_resumo_tabela(TABELA_FORA_DO_MANIFESTO, (2024,))
+    data_loader_stub.sincronizar_com_manifesto()
+    data_loader_stub._consultar_resumo_tabela(TABELA_FORA_DO_MANIFESTO, (2024,))
+    assert backend_stub.contar("GET", caminho) == 1
+
+    # Nova carga do ETL publica outra versão
+    manifesto["assintecal_producao"] = {"tabela": "assintecal_producao", "versao": "b"}
+    data_loader_stub.sincronizar_com_manifesto()
+    data_loader_stub._consultar_resumo_tabela(TABELA_FORA_DO_MANIFESTO, (2024,))
+    assert backend_stub.contar("GET", caminho) == 2
@@ -0,0 +1,89 @@
+import threading
+
+import pandas as pd
+
+from src import metadados
+from src.metadados import (
+    CHAVE_ATTRS,
+    derivado_do_dataset,
+    filtrar_categoria,
+    indice_categoria,
+    registrar_metadados,
+    ultimo_periodo,
+)
+
+
+def _dataset():
+    df = pd.DataFrame(
+        {
+            "ano": [2024, 2024, 2025, 2025],
+            "mes": [1, 2, 1, 3],
+            "vertical": ["Couro", "Calçados", "Couro", "Calçados"],
+            "valor": [1.0, 2.0, 3.0, 4.0],
+        }
+    )
+    return registrar_metadados(df, "assintecal_exp_vertical", origem=("teste",))
+
+
+def test_dataset_registrado_usa_o_indice():
+    df = _dataset()
+
+    assert indice_categoria(df, "vertical") is not None
+    assert filtrar_categoria(df, "vertical", "Couro")["valor"].tolist() == [1.0, 3.0]
+
+
+def test_frame_reordenado_com_os_mesmos_attrs_nao_usa_o_indice():
+    df = _dataset()
+    indice_categoria(df, "vertical")
+
+    reordenado = df.sort_values("valor", ascending=False).reset_index(drop=True)
+
+    assert reordenado.attrs[CHAVE_ATTRS] == df.attrs[CHAVE_ATTRS]
+    assert indice_categoria(reordenado, "vertical") is None
+    filtrado = filtrar_categoria(reordenado, "vertical", "Couro")
+    assert filtrado["valor"].tolist() == [3.0, 1.0]
+
+
+def test_frame_transformado_com_o_mesmo_tamanho_recalcula_os_metadados():
+    df = _dataset()
+
+    transformado = df.assign(ano=df["ano"] + 1)
+
+    assert ultimo_periodo(df) == (2025, 3)
+    assert ultimo_periodo(transformado) == (2026, 3)
+
+
+def test_derivados_sao_limitados_e_os_menos_usados_saem(monkeypatch):
+    monkeypatch.setattr(metadados, "MAX_DERIVADOS", 2)
+    df = _dataset()
+    chamadas = []
+
+    def calcular(chave):
+        return lambda df: chamadas.append(chave) or chave
+
+    derivado_do_dataset(df, "a", calcular("a"))
+    derivado_do_dataset(df, "b", calcular("b"))
+    derivado_do_dataset(df, "a", calcular("a"))  # "b" passa a ser o menos usado
+    derivado_do_dataset(df, "c", calcular("c"))
+    derivado_do_dataset(df, "a", calcular("a"))
+    derivado_do_dataset(df, "b", calcular("b"))
+
+    assert chamadas == ["a", "b", "c", "b"]
+
+
+def test_chamadas_simultaneas_recebem_o_mesmo_derivado():
+    df = _dataset()
+    largada = threading.Barrier(8)
+    resultados = []
+
+    def sessao():
+        largada.wait()
+        resultados.append(derivado_do_dataset(df, "lista", lambda df: [len(df)]))
+
+    threads = [threading.Thread(target=sessao) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(resultado is resultados[0] for resultado in resultados)
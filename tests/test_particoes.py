@@ -0,0 +1,63 @@
+import time
+
+import pyarrow as pa
+
+from src.armazenamento import ArmazenamentoMemoria
+from src.particoes import TTL_PARTICAO_VAZIA, CacheParticoes, concatenar_particoes
+
+TTL = 3600
+
+
+def _cache():
+    return CacheParticoes(ttl=TTL, armazenamento=ArmazenamentoMemoria())
+
+
+def _ttl(particao):
+    return float(particao.schema.metadata[b"assintecal_ttl"])
+
+
+def test_busca_apenas_as_particoes_guardadas():
+    cache = _cache()
+    tabela = pa.table({"ano": [2023, 2024], "valor": [1.0, 2.0]})
+    cache.guardar("t", {}, [2023, 2024], "v1", tabela)
+
+    assert set(cache.buscar("t", {}, [2023, 2024, 2025], "v1")) == {2023, 2024}
+    assert cache.buscar("t", {}, [2023], "v2") == {}
+
+
+def test_ano_vazio_antes_do_ultimo_ano_usa_o_ttl_completo():
+    tabela = pa.table({"ano": [2022, 2024], "valor": [1.0, 2.0]})
+
+    particoes = _cache().guardar("t", {}, [2022, 2023, 2024], None, tabela)
+
+    assert particoes[2023].num_rows == 0
+    assert _ttl(particoes[2023]) == TTL
+
+
+def test_anos_vazios_a_partir_do_ultimo_ano_usam_ttl_curto():
+    tabela = pa.table({"ano": [2023], "valor": [1.0]})
+
+    particoes = _cache().guardar("t", {}, [2023, 2024, 2025], None, tabela)
+
+    assert _ttl(particoes[2023]) == TTL
+    assert _ttl(particoes[2024]) == TTL_PARTICAO_VAZIA
+    assert _ttl(particoes[2025]) == TTL_PARTICAO_VAZIA
+
+
+def test_resposta_sem_linhas_nao_fica_guardada_pelo_ttl_completo(monkeypatch):
+    cache = _cache()
+    cache.guardar("t", {}, [2024], None, pa.table({}))
+
+    assert 2024 in cache.buscar("t", {}, [2024])
+    agora = time.time()
+    monkeypatch.setattr(time, "time", lambda: agora + TTL_PARTICAO_VAZIA + 1)
+    assert cache.buscar("t", {}, [2024]) == {}
+
+
+def test_concatena_particoes_com_ttls_diferentes():
+    tabela = pa.table({"ano": [2023, 2023], "valor": [1.0, 2.0]})
+    particoes = _cache().guardar("t", {}, [2023, 2024], None, tabela)
+
+    df = concatenar_particoes([particoes[2023], particoes[2024]])
+
+    assert df["valor"].tolist() == [1.0, 2.0]
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+import streamlit as st
+
+from src import rastreamento
+from src.rastreamento import rastrear
+
+
+@pytest.fixture
+def rastreamento_ativo(monkeypatch):
+    monkeypatch.setattr(rastreamento, "RASTREAMENTO_ATIVO", True)
+    rastreamento.limpar_rastreamento()
+    yield
+    rastreamento.limpar_rastreamento()
+
+
+def test_funcao_com_cache_data_registra_acerto_e_falha(rastreamento_ativo):
+    chamadas = []
+
+    @rastrear(cache=st.cache_data)
+    def preparar(ano):
+        chamadas.append(ano)
+        return pd.DataFrame({"ano": [ano]})
+
+    preparar.clear()
+    try:
+        preparar(2024)
+        preparar(2024)
+        preparar(2025)
+    finally:
+        preparar.clear()
+
+    registros = rastreamento.registros_rastreamento()
+    assert [r["cache"] for r in registros] == ["falha", "acerto", "falha"]
+    assert [r["linhas_saida"] for r in registros] == [1, 1, 1]
+    assert chamadas == [2024, 2025]
+
+
+def test_funcao_sem_cache_nao_marca_acerto(rastreamento_ativo):
+    @rastrear
+    def somar(a, b):
+        return a + b
+
+    assert somar(1, 2) == 3
+    assert [r["cache"] for r in rastreamento.registros_rastreamento()] == [None]
+
+
+def test_desligado_aplica_apenas_o_cache(monkeypatch):
+    monkeypatch.setattr(rastreamento, "RASTREAMENTO_ATIVO", False)
+
+    def preparar():
+        return 1
+
+    assert rastrear(preparar) is preparar
+    assert rastrear(cache=lambda f: ("cacheada", f))(preparar) == ("cacheada", preparar)
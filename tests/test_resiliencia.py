@@ -0,0 +1,33 @@
+import os
+import threading
+
+import pandas as pd
+
+from src import resiliencia
+from src.resiliencia import ler_snapshot, salvar_snapshot
+
+CHAVE = ("assintecal_exp_vertical", (2024, 2025), (), None)
+
+
+def test_salvamentos_simultaneos_da_mesma_chave_nao_colidem(
+    tmp_path, monkeypatch, capsys
+):
+    monkeypatch.setattr(resiliencia, "DIRETORIO_SNAPSHOTS", str(tmp_path))
+    n_threads = 8
+    df = pd.DataFrame({"ano": list(range(2000, 2100)) * 200})
+    barreira = threading.Barrier(n_threads)
+
+    def salvar():
+        barreira.wait()
+        for _ in range(5):
+            salvar_snapshot(CHAVE, df)
+
+    threads = [threading.Thread(target=salvar) for _ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert "Não foi possível salvar" not in capsys.readouterr().out
+    assert [nome for nome in os.listdir(tmp_path) if nome.endswith(".tmp")] == []
+    assert len(ler_snapshot(CHAVE)) == len(df)
@@ -0,0 +1,70 @@
+import json
+import os
+import subprocess
+import sys
+
+# =============================================================================
+# ORÇAMENTO DE IMPORTAÇÃO DO APP
+# =============================================================================
+# Mede com `python -X importtime` o custo de importar `app` a frio, descontadas
+# as bibliotecas base (streamlit, pandas, numpy, dotenv), que são importadas
+# antes. Falha se o custo próprio do app ultrapassar o orçamento ou se módulos
+# pesados, que devem ser importados sob demanda, forem carregados na importação.
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Orçamento (ms) do custo próprio da importação de `app` (medido em ~30 ms)
+ORCAMENTO_MS = float(os.getenv("ASSINTECAL_ORCAMENTO_IMPORTACAO_MS", "150"))
+EXECUCOES = 3
+
+BASE = "import streamlit, pandas, numpy, dotenv"
+MODULOS_SOB_DEMANDA = [
+    "supabase",
+    "postgrest",
+    "plotly.express",
+    "plotly.subplots",
+    "views.home",
+    "views.calcados",
+    "views.componente",
+    "views.couro",
+]
+
+
+def _executar(codigo, *opcoes):
+    return subprocess.run(
+        [sys.executable, *opcoes, "-c", codigo],
+        cwd=RAIZ,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def _tempo_importacao_app_ms():
+    """Tempo cumulativo (ms) da linha de `app` na saída do -X importtime."""
+    saida = _executar(f"{BASE}; import app", "-X", "importtime").stderr
+    for linha in saida.splitlines():
+        partes = [parte.strip() for parte in linha.split("|")]
+        if len(partes) == 3 and partes[2] == "app":
+            return int(partes[1]) / 1000
+    raise AssertionError(f"Linha de `app` não encontrada na saída:\n{saida[-2000:]}")
+
+
+def test_importacao_do_app_dentro_do_orcamento():
+    # O menor tempo entre algumas execuções reduz o ruído da máquina
+    tempo_ms = min(_tempo_importacao_app_ms() for _ in range(EXECUCOES))
+
+    assert tempo_ms <= ORCAMENTO_MS, (
+        f"Importar `app` custou {tempo_ms:.1f} ms (orçamento: {ORCAMENTO_MS:.0f} ms). "
+        "Importe módulos pesados sob demanda."
+    )
+
+
+def test_modulos_pesados_nao_sao_importados_com_o_app():
+    codigo = (
+        f"{BASE}; import sys, json; import app; "
+        f"print(json.dumps([m for m in {MODULOS_SOB_DEMANDA!r} if m in sys.modules]))"
+    )
+    carregados = json.loads(_executar(codigo).stdout.strip().splitlines()[-1])
+
+    assert carregados == []
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from src.utils import selecionar_top_n
+
+
+def _pivot(n_linhas=10):
+    valores = np.arange(n_linhas, 0, -1, dtype=float)
+    return pd.DataFrame(
+        {2024: valores * 2, 2025: valores},
+        index=[f"linha_{i}" for i in range(n_linhas)],
+    )
+
+
+def test_primeira_pagina_agrega_as_linhas_abaixo_em_outros():
+    resultado = selecionar_top_n(_pivot(), top_n=3, offset=0)
+
+    assert list(resultado.index) == ["linha_0", "linha_1", "linha_2", "Outros"]
+    assert resultado.loc["Outros", 2025] == sum(range(1, 8))
+
+
+def test_outros_nao_inclui_linhas_das_paginas_anteriores():
+    resultado = selecionar_top_n(_pivot(), top_n=3, offset=3)
+
+    assert list(resultado.index) == ["linha_3", "linha_4", "linha_5", "Outros"]
+    # Apenas as linhas 6..9 (valores 4, 3, 2, 1) ficam abaixo da página
+    assert resultado.loc["Outros", 2025] == 4 + 3 + 2 + 1
+    assert resultado.loc["Outros", 2024] == 2 * (4 + 3 + 2 + 1)
+
+
+def test_ultima_pagina_nao_tem_outros():
+    resultado = selecionar_top_n(_pivot(), top_n=3, offset=9)
+
+    assert list(resultado.index) == ["linha_9"]
+
+
+def test_offset_fora_do_intervalo_vira_ultima_pagina():
+    resultado = selecionar_top_n(_pivot(), top_n=4, offset=40)
+
+    assert list(resultado.index) == ["linha_8", "linha_9"]
+
+
+def test_sem_top_n_ordena_todas_as_linhas():
+    pivot = _pivot().iloc[::-1]
+
+    resultado = selecionar_top_n(pivot)
+
+    assert list(resultado.index) == [f"linha_{i}" for i in range(10)]
@@ -1,6 +1,8 @@
 # %%
 import os
 import time
+import hashlib
+from datetime import UTC, datetime
 import pandas as pd
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
@@ -45,6 +47,183 @@ except Exception as e:
     exit()
 
 
+# ===================================================================
+# --- MANIFESTO DAS TABELAS ---
+# ===================================================================
+# A cada carga, o ETL publica na tabela `assintecal_manifest` uma linha por tabela
+# de destino com a versão (hash do conteúdo), o número de linhas e o último período.
+# O dashboard consulta apenas essa tabela (pequena) para saber quais datasets
+# mudaram e invalidar somente o cache deles.
+#
+# A tabela é criada por `criar_funcoes_supabase` (com SUPABASE_DB_URL definida).
+# Sem essa variável, execute o SQL abaixo uma vez no SQL Editor do Supabase.
+SQL_CRIAR_MANIFESTO = """
+CREATE TABLE IF NOT EXISTS assintecal_manifest (
+    tabela TEXT PRIMARY KEY,
+    versao TEXT NOT NULL,
+    n_linhas INTEGER NOT NULL,
+    ult_ano INTEGER,
+    ult_mes INTEGER,
+    atualizado_em TIMESTAMPTZ NOT NULL
+);
+"""
+
+TABELA_MANIFESTO = "assintecal_manifest"
+
+
+def calcular_versao(df):
+    """Hash determinístico do conteúdo do DataFrame (independe do índice)."""
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    conteudo = hashes.tobytes() + ",".join(map(str, df.columns)).encode("utf-8")
+    return hashlib.sha256(conteudo).hexdigest()[:16]
+
+
+def montar_entrada_manifesto(df, target_table_name):
+    """Monta a linha do manifesto (versão, linhas e último período) de uma tabela."""
+    ult_ano, ult_mes = None, None
+    if {"ano", "mes"}.issubset(df.columns):
+        periodo = (df["ano"] * 12 + df["mes"] - 1).max()
+        if pd.notna(periodo):
+            ult_ano, ult_mes = divmod(int(periodo), 12)
+            ult_mes += 1
+
+    return {
+        "tabela": target_table_name,
+        "versao": calcular_versao(df),
+        "n_linhas": len(df),
+        "ult_ano": ult_ano,
+        "ult_mes": ult_mes,
+        "atualizado_em": datetime.now(UTC).isoformat(),
+    }
+
+
+def publicar_manifesto(supabase_client, entradas):
+    """Grava (upsert por `tabela`) as entradas do manifesto no Supabase."""
+    if not entradas:
+        print("(!) Aviso: Nenhuma tabela carregada; manifesto não atualizado.")
+        return
+
+    print(f"\n--- Publicando manifesto ({len(entradas)} tabelas) ---")
+    try:
+        supabase_client.table(TABELA_MANIFESTO).upsert(
+            entradas, on_conflict="tabela"
+        ).execute()
+        print(f"✅ Manifesto '{TABELA_MANIFESTO}' atualizado.")
+    except Exception as e:
+        print(f"❌ ERRO ao publicar o manifesto: {e}")
+        with open("log_erros.txt", "a", encoding="utf-8") as log_file:
+            log_file.write(f"Erro no manifesto {TABELA_MANIFESTO}: {e}\n")
+
+
+# ===================================================================
+# --- FUNÇÕES DE AGREGAÇÃO NO SUPABASE (RPC) ---
+# ===================================================================
+# As tabelas de detalhe (*_pais, *_sh6) são agregadas no servidor pelo dashboard:
+# a função devolve apenas a matriz (chave x ano) do mês de referência ou do
+# acumulado no ano, em vez de todas as linhas. Criada via conexão direta ao
+# Postgres do Supabase (SUPABASE_DB_URL); sem ela, o dashboard agrega em pandas.
+SUPABASE_DB_URL = os.getenv("SUPABASE_DB_URL")
+
+SQL_FUNCAO_AGREGAR_COMEX = """
+CREATE OR REPLACE FUNCTION assintecal_agregar_comex(
+    p_tabela TEXT,
+    p_chave TEXT,
+    p_coluna_valor TEXT,
+    p_modo TEXT,
+    p_anos INTEGER[],
+    p_coluna_tipo TEXT DEFAULT NULL,
+    p_categoria TEXT DEFAULT NULL
+)
+RETURNS TABLE (chave TEXT, ano INTEGER, mes INTEGER, total DOUBLE PRECISION)
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+    v_expr_chave TEXT;
+    v_filtro TEXT := '';
+    v_periodo INTEGER;
+BEGIN
+    IF p_tabela !~ '^assintecal_(exp|imp)_(vertical|componente)_(pais|sh6)$' THEN
+        RAISE EXCEPTION 'Tabela não permitida: %', p_tabela;
+    END IF;
+    IF p_coluna_valor NOT IN ('valor', 'pares') THEN
+        RAISE EXCEPTION 'Coluna de valor não permitida: %', p_coluna_valor;
+    END IF;
+    IF p_modo NOT IN ('mes', 'acumulado') THEN
+        RAISE EXCEPTION 'Modo não permitido: %', p_modo;
+    END IF;
+
+    IF p_chave = 'pais' THEN
+        v_expr_chave := 'pais';
+    ELSIF p_chave = 'sh6' THEN
+        v_expr_chave := $q$id_sh6::TEXT || ' - ' || descricao_sh6$q$;
+    ELSE
+        RAISE EXCEPTION 'Chave não permitida: %', p_chave;
+    END IF;
+
+    IF p_categoria IS NOT NULL THEN
+        IF p_coluna_tipo NOT IN ('vertical', 'componente') THEN
+            RAISE EXCEPTION 'Coluna de tipo não permitida: %', p_coluna_tipo;
+        END IF;
+        v_filtro := format(' AND %I = %L', p_coluna_tipo, p_categoria);
+    END IF;
+
+    -- Mês de referência: último (ano, mes) disponível no recorte
+    EXECUTE format(
+        'SELECT MAX(ano * 12 + mes - 1) FROM %I WHERE ano = ANY($1)%s',
+        p_tabela, v_filtro
+    ) INTO v_periodo USING p_anos;
+
+    IF v_periodo IS NULL THEN
+        RETURN;
+    END IF;
+
+    RETURN QUERY EXECUTE format(
+        'SELECT %s, ano::INTEGER, $2, SUM(%I)::DOUBLE PRECISION
+           FROM %I
+          WHERE ano = ANY($1) AND mes %s $2%s
+          GROUP BY 1, 2',
+        v_expr_chave,
+        p_coluna_valor,
+        p_tabela,
+        CASE WHEN p_modo = 'mes' THEN '=' ELSE '<=' END,
+        v_filtro
+    ) USING p_anos, v_periodo % 12 + 1;
+END;
+$$;
+"""
+
+
+def criar_funcoes_supabase():
+    """
+    Cria (se não existir) a tabela do manifesto e cria/atualiza as funções de
+    agregação no Postgres do Supabase, pedindo ao PostgREST para recarregar o
+    schema (para expô-las via API/RPC).
+    """
+    print("\n--- Criando manifesto e funções de agregação no Supabase ---")
+    if not SUPABASE_DB_URL:
+        print(
+            "(!) Aviso: SUPABASE_DB_URL não definida; manifesto e funções de "
+            "agregação não criados (crie o manifesto com SQL_CRIAR_MANIFESTO)."
+        )
+        return
+
+    try:
+        supabase_engine = create_engine(SUPABASE_DB_URL)
+        with supabase_engine.begin() as conn:
+            conn.execute(text(SQL_CRIAR_MANIFESTO))
+            conn.execute(text(SQL_FUNCAO_AGREGAR_COMEX))
+            conn.execute(text("NOTIFY pgrst, 'reload schema'"))
+        print(
+            f"✅ Tabela '{TABELA_MANIFESTO}' e função 'assintecal_agregar_comex' "
+            "criadas/atualizadas."
+        )
+    except Exception as e:
+        print(f"❌ ERRO ao criar as funções de agregação: {e}")
+        with open("log_erros.txt", "a", encoding="utf-8") as log_file:
+            log_file.write(f"Erro nas funções de agregação: {e}\n")
+
+
 def process_and_upload(
     query_string,
     target_table_name,
@@ -56,6 +235,9 @@ def process_and_upload(
     """
     Executa uma query parametrizada no banco local, corrige os tipos
     de dados e insere em lotes numa tabela do Supabase.
+
+    Retorna a entrada do manifesto da tabela se todos os lotes foram inseridos,
+    ou None se a tabela foi pulada ou houve erro.
     """
     print(f"\n--- Processando tabela: {target_table_name} ---")
 
@@ -70,7 +252,7 @@ def process_and_upload(
 
         if df.empty:
             print("(!) Aviso: A query não retornou dados. Tabela pulada.")
-            return
+            return None
 
         print(f"-> Encontrados {len(df)} registros.")
 
@@ -85,6 +267,7 @@ def process_and_upload(
                     df[col] = df[col].astype("Int64")
 
         df.replace([np.inf, -np.inf], None, inplace=True)
+        entrada_manifesto = montar_entrada_manifesto(df, target_table_name)
         df = df.astype(object).where(pd.notna(df), None)
 
         # Apagar dados existentes na tabela de destino
@@ -95,6 +278,7 @@ def process_and_upload(
         # Inserir dados em lotes
         print(f"4/4: Inserindo dados em lotes de {batch_size} registros...")
         total_batches = (len(df) // batch_size) + (1 if len(df) % batch_size > 0 else 0)
+        lotes_com_erro = 0
 
         for i, start in enumerate(range(0, len(df), batch_size)):
             end = start + batch_size
@@ -109,18 +293,27 @@ def process_and_upload(
 
             if hasattr(response, "error") and response.error:
                 print(f"   -> ERRO no lote {i + 1}/{total_batches}: {response.error}")
+                lotes_com_erro += 1
             else:
                 print(f"   -> Lote {i + 1}/{total_batches} inserido com sucesso.")
 
         end_time = time.time()
+        if lotes_com_erro:
+            print(
+                f"(!) Tabela '{target_table_name}' concluída com {lotes_com_erro} lote(s) com erro; fora do manifesto."
+            )
+            return None
+
         print(
             f"✅ Tabela '{target_table_name}' concluída com sucesso em {end_time - start_time:.2f} segundos."
         )
+        return entrada_manifesto
 
     except Exception as e:
         print(f"❌ ERRO GERAL ao processar a tabela '{target_table_name}': {e}")
         with open("log_erros.txt", "a", encoding="utf-8") as log_file:
             log_file.write(f"Erro na tabela {target_table_name}: {e}\n")
+        return None
 
 
 # ===================================================================
@@ -597,11 +790,20 @@ def main():
     print("Iniciando script de carga de dados FILTRADOS para o Supabase.")
 
     total_tasks = len(tasks)
+    entradas_manifesto = []
     for i, (query, table_name, params) in enumerate(tasks):
         print(
             f"\n==================== TAREFA {i + 1} de {total_tasks} ===================="
         )
-        process_and_upload(query, table_name, local_engine, supabase, params=params)
+        entrada = process_and_upload(
+            query, table_name, local_engine, supabase, params=params
+        )
+        if entrada is not None:
+            entradas_manifesto.append(entrada)
+
+    # Antes do manifesto: cria a tabela dele em projetos novos
+    criar_funcoes_supabase()
+    publicar_manifesto(supabase, entradas_manifesto)
 
     print("\nTodas as tarefas filtradas foram concluídas!")
 
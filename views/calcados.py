@@ -2,6 +2,8 @@
 import streamlit as st
 import plotly_express as px
 
+from src.metadados import ultimo_periodo
+from src.rastreamento import rastrear
 from src.utils import (
     MESES_DIC,
     titulo_centralizado,
@@ -19,19 +21,16 @@ from src.utils import (
 )
 
 
-def expander_calcados_callback():
-    """Garante que o expander permaneça aberto após a interação."""
-    st.session_state.calcados_expander_state = True
-
-
 # =============================================================================
 # FUNÇÕES ESPECÍFICAS DE CALÇADOS
 # =============================================================================
 
 
-def display_emprego_analise_calcados(df_emprego_calcados, set_expander_open):
+@st.fragment
+def display_emprego_analise_calcados(df_emprego_calcados):
     """
     Função auxiliar para renderizar um bloco completo de Emprego no Setor de Calçados.
+    Executado como fragmento: os filtros do bloco não recarregam a página inteira.
     """
 
     # KPIs
@@ -53,8 +52,7 @@ def display_emprego_analise_calcados(df_emprego_calcados, set_expander_open):
 
     # Lista de anos disponível a partir do índice do histórico mensal
     anos_disponiveis = sorted(df_hist_total.index.year.unique().tolist())
-    ult_ano = df_emprego_calcados["ano"].max()
-    ult_mes = df_emprego_calcados[df_emprego_calcados["ano"] == ult_ano]["mes"].max()
+    _, ult_mes = ultimo_periodo(df_emprego_calcados)
     tab_selection = st.pills(
         "Selecione a visualização:",
         ["Histórico Mensal", "Acumulado no Ano"],
@@ -71,7 +69,6 @@ def display_emprego_analise_calcados(df_emprego_calcados, set_expander_open):
                 options=["Total", "CNAE Subclasse"],
                 default="Total",
                 key="emprego_view_mode_mes_radio",
-                on_change=set_expander_open,
             )
 
         with col1:
@@ -140,7 +137,6 @@ def display_emprego_analise_calcados(df_emprego_calcados, set_expander_open):
                 options=["Total", "CNAE Subclasse"],
                 default="Total",
                 key="emprego_view_mode_acum_radio",
-                on_change=set_expander_open,
             )
 
         if view_mode_acum == "Total":
@@ -177,9 +173,11 @@ def display_emprego_analise_calcados(df_emprego_calcados, set_expander_open):
             st.plotly_chart(fig_acum_subclasse, use_container_width=True)
 
 
-def display_ipca_analise(df_ipca, titulo_expander, set_expander_open):
+@st.fragment
+def display_ipca_analise(df_ipca, titulo_expander):
     """
     Função auxiliar para renderizar um bloco completo de IPCA.
+    Executado como fragmento: os filtros do bloco não recarregam a página inteira.
     """
 
     # KPIs
@@ -205,7 +203,6 @@ def display_ipca_analise(df_ipca, titulo_expander, set_expander_open):
             options=["Mensal", "Acumulado 12 Meses"],
             default="Mensal",
             key="ipca_view_mode_radio",
-            on_change=set_expander_open,
         )
 
     start_year, end_year = ANOS_SELECIONADOS
@@ -277,6 +274,7 @@ def display_prod_vendas_expander(df_producao, df_vendas, df_previsao_producao):
     )
 
 
+@rastrear
 def show_page_calcados(
     df_producao,
     df_vendas,
@@ -307,7 +305,6 @@ def show_page_calcados(
             titulo_kpi="Exportação de Calçados (US$)",
             state_key_prefix="exp_valor",
             categoria_kpi="Exportação",
-            set_expander_open=None,
         )
         display_comex_analise(
             df_comex=df_exp_calcados,
@@ -316,7 +313,6 @@ def show_page_calcados(
             titulo_kpi="Exportação de Calçados em Pares",
             state_key_prefix="exp_pares",
             categoria_kpi="Exportação",
-            set_expander_open=None,
             df_previsao=df_previsao_exportacao,
         )
 
@@ -328,7 +324,6 @@ def show_page_calcados(
             titulo_kpi="Importação de Calçados (US$)",
             state_key_prefix="imp_valor",
             categoria_kpi="Importação",
-            set_expander_open=None,
         )
         display_comex_analise(
             df_comex=df_imp_calcados,
@@ -337,18 +332,15 @@ def show_page_calcados(
             titulo_kpi="Importação de Calçados em Pares",
             state_key_prefix="imp_pares",
             categoria_kpi="Importação",
-            set_expander_open=None,
         )
 
     with st.expander("Emprego", expanded=False):
         display_emprego_analise_calcados(
             df_emprego_calcados=df_emprego_calcados,
-            set_expander_open=None,
         )
 
     with st.expander("Inflação (IPCA)", expanded=False):
         display_ipca_analise(
             df_ipca=df_ipca_calcados,
             titulo_expander="Inflação (IPCA) - Calçados e Acessórios",
-            set_expander_open=None,
         )
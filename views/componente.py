@@ -3,30 +3,35 @@ Página de Componentes do Dashboard Assintecal
 """
 
 import streamlit as st
+from src.rastreamento import rastrear
 from src.utils import (
     display_comex_vertical_analise,
     titulo_centralizado,
 )
 
 
+@rastrear
 def show_page_componente(
     df_exp_componente,
-    df_exp_componente_pais,
-    df_exp_componente_sh6,
+    carregar_exp_componente_pais,
+    carregar_exp_componente_sh6,
     df_imp_componente,
-    df_imp_componente_pais,
-    df_imp_componente_sh6,
+    carregar_imp_componente_pais,
+    carregar_imp_componente_sh6,
 ):
     """
     Página principal de análise dos componentes para calçados.
 
+    As tabelas por país e por SH6 são recebidas como funções de carregamento e
+    só são buscadas quando o usuário abre a visualização correspondente.
+
     Args:
         df_exp_componente: DataFrame com exportações agregadas por componente
-        df_exp_componente_pais: DataFrame com exportações por componente e país
-        df_exp_componente_sh6: DataFrame com exportações por componente e SH6
+        carregar_exp_componente_pais: Função que carrega as exportações por componente e país
+        carregar_exp_componente_sh6: Função que carrega as exportações por componente e SH6
         df_imp_componente: DataFrame com importações agregadas por componente
-        df_imp_componente_pais: DataFrame com importações por componente e país
-        df_imp_componente_sh6: DataFrame com importações por componente e SH6
+        carregar_imp_componente_pais: Função que carrega as importações por componente e país
+        carregar_imp_componente_sh6: Função que carrega as importações por componente e SH6
     """
 
     # =======================
@@ -36,14 +41,12 @@ def show_page_componente(
     st.info("Clique nos menus abaixo para explorar os dados dos Componentes.")
     display_comex_vertical_analise(
         df_comex=df_exp_componente,
-        df_comex_pais=df_exp_componente_pais,
-        df_comex_sh6=df_exp_componente_sh6,
+        carregar_dados_pais=carregar_exp_componente_pais,
+        carregar_dados_sh6=carregar_exp_componente_sh6,
         titulo_expander="Exportações por Componente",
         titulo_kpi="Exportações",
         state_key_prefix="exp_componente",
         categoria_kpi="Exportação",
-        set_expander_open=None,
-        expander_state_key="exp_componente_expander_state",
         coluna_tipo="componente",
         usar_expander=True,
     )
@@ -53,14 +56,12 @@ def show_page_componente(
     # =======================
     display_comex_vertical_analise(
         df_comex=df_imp_componente,
-        df_comex_pais=df_imp_componente_pais,
-        df_comex_sh6=df_imp_componente_sh6,
+        carregar_dados_pais=carregar_imp_componente_pais,
+        carregar_dados_sh6=carregar_imp_componente_sh6,
         titulo_expander="Importações por Componente",
         titulo_kpi="Importações",
         state_key_prefix="imp_componente",
         categoria_kpi="Importação",
-        set_expander_open=None,
-        expander_state_key="imp_componente_expander_state",
         coluna_tipo="componente",
         usar_expander=True,
     )
@@ -1,6 +1,8 @@
 # couro.py
 import streamlit as st
 
+from src.metadados import ultimo_periodo
+from src.rastreamento import rastrear
 from src.utils import (
     MESES_DIC,
     titulo_centralizado,
@@ -16,9 +18,11 @@ from src.utils import (
 )
 
 
-def display_emprego_analise_couro(df_emprego_couro, set_expander_open):
+@st.fragment
+def display_emprego_analise_couro(df_emprego_couro):
     """
     Função auxiliar para renderizar um bloco completo de Emprego no Setor de Couro.
+    Executado como fragmento: os filtros do bloco não recarregam a página inteira.
     """
 
     # KPIs
@@ -40,8 +44,7 @@ def display_emprego_analise_couro(df_emprego_couro, set_expander_open):
 
     # Lista de anos disponível a partir do índice do histórico mensal
     anos_disponiveis = sorted(df_hist_total.index.year.unique().tolist())
-    ult_ano = df_emprego_couro["ano"].max()
-    ult_mes = df_emprego_couro[df_emprego_couro["ano"] == ult_ano]["mes"].max()
+    _, ult_mes = ultimo_periodo(df_emprego_couro)
 
     tab_selection = st.pills(
         "Selecione a visualização:",
@@ -59,7 +62,6 @@ def display_emprego_analise_couro(df_emprego_couro, set_expander_open):
                 options=anos_disponiveis,
                 value=(anos_disponiveis[-2], anos_disponiveis[-1]),
                 key="couro_emprego_hist_select_slider",
-                on_change=set_expander_open,
             )
             start_year, end_year = ANOS_SELECIONADOS
 
@@ -95,6 +97,7 @@ def display_emprego_analise_couro(df_emprego_couro, set_expander_open):
         st.plotly_chart(fig_acum_total, use_container_width=True)
 
 
+@rastrear
 def show_page_couro(df_producao, df_exp_couro, df_imp_couro, df_emprego_couro):
     """Função principal que renderiza a página de Couro."""
 
@@ -120,7 +123,6 @@ def show_page_couro(df_producao, df_exp_couro, df_imp_couro, df_emprego_couro):
             titulo_kpi="Exportação de Couro (US$)",
             state_key_prefix="couro_exp_valor",
             categoria_kpi="Exportação",
-            set_expander_open=None,
             usar_expander=False,
         )
 
@@ -132,12 +134,10 @@ def show_page_couro(df_producao, df_exp_couro, df_imp_couro, df_emprego_couro):
             titulo_kpi="Importação de Couro (US$)",
             state_key_prefix="couro_imp_valor",
             categoria_kpi="Importação",
-            set_expander_open=None,
             usar_expander=False,
         )
 
     with st.expander("Emprego", expanded=False):
         display_emprego_analise_couro(
             df_emprego_couro=df_emprego_couro,
-            set_expander_open=None,
         )
@@ -1,7 +1,9 @@
 import streamlit as st
+from src.rastreamento import rastrear
 from src.utils import to_excel, titulo_centralizado
 
 
+@rastrear
 def show_page_dados(
     # --- DataFrames da Página Calçados ---
     df_producao,
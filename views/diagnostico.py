@@ -0,0 +1,74 @@
+import pandas as pd
+import streamlit as st
+from src.rastreamento import (
+    RASTREAMENTO_ATIVO,
+    exportar_rastreamento_json,
+    limpar_rastreamento,
+    registros_rastreamento,
+    resumo_rastreamento,
+)
+from src.utils import titulo_centralizado
+
+# Quantidade de chamadas recentes exibidas na tabela detalhada
+ULTIMAS_CHAMADAS = 200
+
+
+def show_page_diagnostico(estatisticas_transporte, estado_disjuntor, relatorio_memoria):
+    """
+    Renderiza a página de diagnóstico (restrita a administradores): tempos por
+    função, chamadas recentes, uso do pool HTTP, estado do disjuntor e memória
+    dos datasets.
+
+    Args:
+        estatisticas_transporte: Resumo do pool de conexões (transporte.estatisticas_transporte)
+        estado_disjuntor: Estado do disjuntor do backend (Disjuntor.estado)
+        relatorio_memoria: DataFrame de memória por dataset (tipos.relatorio_memoria)
+    """
+    titulo_centralizado("🛠️ Diagnóstico", 1)
+    st.markdown("---")
+
+    st.subheader("⏱️ Tempo de renderização")
+    if not RASTREAMENTO_ATIVO:
+        st.info(
+            "Rastreamento desligado. Defina ASSINTECAL_RASTREAMENTO=1 (ou =memoria, "
+            "para medir também as alocações) e reinicie a aplicação."
+        )
+    else:
+        resumo = resumo_rastreamento()
+        if resumo.empty:
+            st.info("Nenhuma chamada registrada ainda.")
+        else:
+            st.dataframe(resumo, hide_index=True, use_container_width=True)
+
+            st.markdown("##### Chamadas recentes")
+            recentes = pd.DataFrame(registros_rastreamento()[-ULTIMAS_CHAMADAS:])
+            st.dataframe(recentes.iloc[::-1], hide_index=True, use_container_width=True)
+
+        col_exportar, col_limpar, _ = st.columns([1, 1, 2])
+        with col_exportar:
+            st.download_button(
+                "Exportar JSON",
+                data=exportar_rastreamento_json(),
+                file_name="rastreamento_assintecal.json",
+                mime="application/json",
+            )
+        with col_limpar:
+            if st.button("Limpar registros"):
+                limpar_rastreamento()
+                st.rerun()
+
+    st.markdown("---")
+    col_transporte, col_disjuntor = st.columns(2, gap="large")
+    with col_transporte:
+        st.subheader("🔌 Conexões com o Supabase")
+        st.json(estatisticas_transporte)
+    with col_disjuntor:
+        st.subheader("🛡️ Disjuntor do backend")
+        st.json(estado_disjuntor)
+
+    st.markdown("---")
+    st.subheader("🧠 Memória dos datasets")
+    if relatorio_memoria.empty:
+        st.info("Nenhum dataset carregado neste processo.")
+    else:
+        st.dataframe(relatorio_memoria, hide_index=True, use_container_width=True)
@@ -1,37 +1,49 @@
 # %%
 import streamlit as st
+from src.paginas import PAGINAS
+from src.rastreamento import rastrear
 from src.utils import MESES_DIC, titulo_centralizado
 
 
 # ==============================================================================
 # FUNÇÕES DA PÁGINA HOME
 # ==============================================================================
-def go_to_page(page_name):
-    """Atualiza o estado da sessão para mudar a página selecionada."""
-    st.session_state.selected_page = page_name
-
-
-def show_page_home(
-    df_producao,
-    df_vendas,
-    df_exp_calcados,
-    df_imp_calcados,
-    df_emprego_calcados,
-    df_ipca_calcados,
-    df_exp_couro,
-    df_imp_couro,
-    df_emprego_couro,
-    df_exp_vertical,
-    df_exp_componente,
-    df_ibc_br,
-    df_expectativas,
-    df_ipca_geral,
-    df_taxa_cambio,
-    df_ind_transformacao,
-    df_taxa_desemprego,
-):
+# Tabelas cujas datas de atualização são exibidas na Home. A página usa apenas o
+# resumo (metadados) de cada tabela, sem carregar os dados.
+TABELAS_HOME = (
+    "assintecal_producao",
+    "assintecal_vendas",
+    "assintecal_exp_calcados",
+    "assintecal_emprego_calcados",
+    "assintecal_ipca_calcados",
+    "assintecal_exp_couro",
+    "assintecal_emprego_couro",
+    "assintecal_exp_vertical",
+    "assintecal_exp_componente",
+    "assintecal_ibc_br",
+    "assintecal_expectativas",
+    "assintecal_ipca_geral",
+    "assintecal_taxa_cambio",
+    "assintecal_ind_transformacao",
+    "assintecal_taxa_desemprego",
+)
+
+
+def formatar_ultimo_dado(resumo):
+    """Retorna o último mês disponível a partir do resumo da tabela (ex: 'Março de 2025')."""
+    if not resumo or not resumo.get("ult_ano") or not resumo.get("ult_mes"):
+        return "Não disponível"
+    return f"{MESES_DIC[int(resumo['ult_mes'])]} de {int(resumo['ult_ano'])}"
+
+
+@rastrear
+def show_page_home(resumos):
     """
     Renderiza a página inicial do dashboard com instruções, informações e datas de atualização.
+
+    Args:
+        resumos: Dicionário {tabela: resumo} com o último período de cada tabela
+            de TABELAS_HOME (ver data_loader.carregar_resumo_tabelas)
     """
 
     titulo_centralizado("📊 Dashboard Assintecal", 1)
@@ -84,156 +96,25 @@ def show_page_home(
     st.markdown("---")
     st.subheader("📂 Sobre as Páginas e Atualizações")
 
-    # --- Obter datas de atualização dos dataframes ---
-
-    # Produção e Vendas
-    try:
-        ult_ano_prod = int(df_producao["ano"].max())
-        ult_mes_prod = int(df_producao[df_producao["ano"] == ult_ano_prod]["mes"].max())
-        data_producao = f"{MESES_DIC[ult_mes_prod]} de {ult_ano_prod}"
-    except Exception:
-        data_producao = "Não disponível"
-
-    try:
-        ult_ano_vendas = int(df_vendas["ano"].max())
-        ult_mes_vendas = int(df_vendas[df_vendas["ano"] == ult_ano_vendas]["mes"].max())
-        data_vendas = f"{MESES_DIC[ult_mes_vendas]} de {ult_ano_vendas}"
-    except Exception:
-        data_vendas = "Não disponível"
-
-    # Comércio Exterior Calçados
-    try:
-        ult_ano_exp_calc = int(df_exp_calcados["ano"].max())
-        ult_mes_exp_calc = int(
-            df_exp_calcados[df_exp_calcados["ano"] == ult_ano_exp_calc]["mes"].max()
-        )
-        data_comex_calcados = f"{MESES_DIC[ult_mes_exp_calc]} de {ult_ano_exp_calc}"
-    except Exception:
-        data_comex_calcados = "Não disponível"
-
-    # Emprego Calçados
-    try:
-        ult_ano_emp_calc = int(df_emprego_calcados["ano"].max())
-        ult_mes_emp_calc = int(
-            df_emprego_calcados[df_emprego_calcados["ano"] == ult_ano_emp_calc][
-                "mes"
-            ].max()
-        )
-        data_emprego_calcados = f"{MESES_DIC[ult_mes_emp_calc]} de {ult_ano_emp_calc}"
-    except Exception:
-        data_emprego_calcados = "Não disponível"
-
-    # IPCA Calçados
-    try:
-        ult_ano_ipca_calc = int(df_ipca_calcados["ano"].max())
-        ult_mes_ipca_calc = int(
-            df_ipca_calcados[df_ipca_calcados["ano"] == ult_ano_ipca_calc]["mes"].max()
-        )
-        data_ipca_calcados = f"{MESES_DIC[ult_mes_ipca_calc]} de {ult_ano_ipca_calc}"
-    except Exception:
-        data_ipca_calcados = "Não disponível"
-
-    # Comércio Exterior Couro
-    try:
-        ult_ano_exp_couro = int(df_exp_couro["ano"].max())
-        ult_mes_exp_couro = int(
-            df_exp_couro[df_exp_couro["ano"] == ult_ano_exp_couro]["mes"].max()
-        )
-        data_comex_couro = f"{MESES_DIC[ult_mes_exp_couro]} de {ult_ano_exp_couro}"
-    except Exception:
-        data_comex_couro = "Não disponível"
-
-    # Emprego Couro
-    try:
-        ult_ano_emp_couro = int(df_emprego_couro["ano"].max())
-        ult_mes_emp_couro = int(
-            df_emprego_couro[df_emprego_couro["ano"] == ult_ano_emp_couro]["mes"].max()
-        )
-        data_emprego_couro = f"{MESES_DIC[ult_mes_emp_couro]} de {ult_ano_emp_couro}"
-    except Exception:
-        data_emprego_couro = "Não disponível"
-
-    # Verticais
-    try:
-        ult_ano_vertical = int(df_exp_vertical["ano"].max())
-        ult_mes_vertical = int(
-            df_exp_vertical[df_exp_vertical["ano"] == ult_ano_vertical]["mes"].max()
-        )
-        data_vertical = f"{MESES_DIC[ult_mes_vertical]} de {ult_ano_vertical}"
-    except Exception:
-        data_vertical = "Não disponível"
-
-    # Componentes
-    try:
-        ult_ano_componente = int(df_exp_componente["ano"].max())
-        ult_mes_componente = int(
-            df_exp_componente[df_exp_componente["ano"] == ult_ano_componente][
-                "mes"
-            ].max()
-        )
-        data_componente = f"{MESES_DIC[ult_mes_componente]} de {ult_ano_componente}"
-    except Exception:
-        data_componente = "Não disponível"
-
-    # Macroeconomia - IBC-Br
-    try:
-        ult_ano_ibc = int(df_ibc_br["ano"].max())
-        ult_mes_ibc = int(df_ibc_br[df_ibc_br["ano"] == ult_ano_ibc]["mes"].max())
-        data_ibc = f"{MESES_DIC[ult_mes_ibc]} de {ult_ano_ibc}"
-    except Exception:
-        data_ibc = "Não disponível"
-
-    # Expectativas
-    try:
-        ult_ano_expect = int(df_expectativas["ano"].max())
-        ult_mes_expect = int(
-            df_expectativas[df_expectativas["ano"] == ult_ano_expect]["mes"].max()
-        )
-        data_expectativas = f"{MESES_DIC[ult_mes_expect]} de {ult_ano_expect}"
-    except Exception:
-        data_expectativas = "Não disponível"
-
-    # IPCA Geral
-    try:
-        ult_ano_ipca = int(df_ipca_geral["ano"].max())
-        ult_mes_ipca = int(
-            df_ipca_geral[df_ipca_geral["ano"] == ult_ano_ipca]["mes"].max()
-        )
-        data_ipca_geral = f"{MESES_DIC[ult_mes_ipca]} de {ult_ano_ipca}"
-    except Exception:
-        data_ipca_geral = "Não disponível"
-
-    # Taxa de Câmbio
-    try:
-        ult_ano_cambio = int(df_taxa_cambio["ano"].max())
-        ult_mes_cambio = int(
-            df_taxa_cambio[df_taxa_cambio["ano"] == ult_ano_cambio]["mes"].max()
-        )
-        data_cambio = f"{MESES_DIC[ult_mes_cambio]} de {ult_ano_cambio}"
-    except Exception:
-        data_cambio = "Não disponível"
-
-    # Indústria de Transformação
-    try:
-        ult_ano_ind = int(df_ind_transformacao["ano"].max())
-        ult_mes_ind = int(
-            df_ind_transformacao[df_ind_transformacao["ano"] == ult_ano_ind][
-                "mes"
-            ].max()
-        )
-        data_ind_transf = f"{MESES_DIC[ult_mes_ind]} de {ult_ano_ind}"
-    except Exception:
-        data_ind_transf = "Não disponível"
-
-    # Taxa de Desemprego
-    try:
-        ult_ano_desemp = int(df_taxa_desemprego["ano"].max())
-        ult_mes_desemp = int(
-            df_taxa_desemprego[df_taxa_desemprego["ano"] == ult_ano_desemp]["mes"].max()
-        )
-        data_desemprego = f"{MESES_DIC[ult_mes_desemp]} de {ult_ano_desemp}"
-    except Exception:
-        data_desemprego = "Não disponível"
+    # --- Obter datas de atualização a partir dos resumos das tabelas ---
+    datas = {
+        tabela: formatar_ultimo_dado(resumos.get(tabela)) for tabela in TABELAS_HOME
+    }
+    data_producao = datas["assintecal_producao"]
+    data_vendas = datas["assintecal_vendas"]
+    data_comex_calcados = datas["assintecal_exp_calcados"]
+    data_emprego_calcados = datas["assintecal_emprego_calcados"]
+    data_ipca_calcados = datas["assintecal_ipca_calcados"]
+    data_comex_couro = datas["assintecal_exp_couro"]
+    data_emprego_couro = datas["assintecal_emprego_couro"]
+    data_vertical = datas["assintecal_exp_vertical"]
+    data_componente = datas["assintecal_exp_componente"]
+    data_ibc = datas["assintecal_ibc_br"]
+    data_expectativas = datas["assintecal_expectativas"]
+    data_ipca_geral = datas["assintecal_ipca_geral"]
+    data_cambio = datas["assintecal_taxa_cambio"]
+    data_ind_transf = datas["assintecal_ind_transformacao"]
+    data_desemprego = datas["assintecal_taxa_desemprego"]
 
     # --- Exibição das páginas ---
     col_a, col_b = st.columns(2, gap="large")
@@ -255,12 +136,7 @@ def show_page_home(
             - *IPCA: **{data_ipca_calcados}***
             """
         )
-        st.button(
-            "Explorar Calçados ➔",
-            on_click=go_to_page,
-            args=("Calçados",),
-            key="btn_home_calcados",
-        )
+        st.page_link(PAGINAS["Calçados"], label="Explorar Calçados ➔")
         st.markdown("---")
 
         st.markdown(
@@ -276,12 +152,7 @@ def show_page_home(
             - *Emprego: **{data_emprego_couro}***
             """
         )
-        st.button(
-            "Explorar Couro ➔",
-            on_click=go_to_page,
-            args=("Couro",),
-            key="btn_home_couro",
-        )
+        st.page_link(PAGINAS["Couro"], label="Explorar Couro ➔")
         st.markdown("---")
 
         st.markdown(
@@ -294,12 +165,7 @@ def show_page_home(
             *Últimos dados: **{data_vertical}***
             """
         )
-        st.button(
-            "Explorar Vertical ➔",
-            on_click=go_to_page,
-            args=("Vertical",),
-            key="btn_home_vertical",
-        )
+        st.page_link(PAGINAS["Vertical"], label="Explorar Vertical ➔")
 
     # --- COLUNA B ---
     with col_b:
@@ -313,12 +179,7 @@ def show_page_home(
             *Últimos dados: **{data_componente}***
             """
         )
-        st.button(
-            "Explorar Componente ➔",
-            on_click=go_to_page,
-            args=("Componente",),
-            key="btn_home_componente",
-        )
+        st.page_link(PAGINAS["Componente"], label="Explorar Componente ➔")
         st.markdown("---")
 
         st.markdown(
@@ -344,9 +205,4 @@ def show_page_home(
             - *Desemprego: **{data_desemprego}***
             """
         )
-        st.button(
-            "Explorar Macroeconomia ➔",
-            on_click=go_to_page,
-            args=("Macroeconomia",),
-            key="btn_home_macro",
-        )
+        st.page_link(PAGINAS["Macroeconomia"], label="Explorar Macroeconomia ➔")
@@ -3,6 +3,8 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 
+from src.metadados import ultimo_periodo
+from src.rastreamento import rastrear
 from src.utils import (
     MESES_DIC,
     titulo_centralizado,
@@ -13,6 +15,7 @@ from src.utils import (
 )
 
 
+@st.fragment
 def display_ibc_br_analise(df_ibc_br):
     """
     Renderiza o bloco completo de análise do IBC-Br (Índice de Atividade Econômica do Banco Central).
@@ -22,7 +25,8 @@ def display_ibc_br_analise(df_ibc_br):
         st.info("Não há dados disponíveis para o IBC-Br.")
         return
 
-    # Converter colunas para numérico
+    # Converter colunas para numérico (numa cópia: o DataFrame vem do cache)
+    df_ibc_br = df_ibc_br.copy()
     df_ibc_br["ano"] = pd.to_numeric(df_ibc_br["ano"], errors="coerce")
     df_ibc_br["mes"] = pd.to_numeric(df_ibc_br["mes"], errors="coerce")
     df_ibc_br["ibc_mensal"] = pd.to_numeric(df_ibc_br["ibc_mensal"], errors="coerce")
@@ -37,8 +41,7 @@ def display_ibc_br_analise(df_ibc_br):
     df_ibc_br = df_ibc_br.dropna(subset=["ano", "mes"])
 
     # Identificar último mês/ano
-    ultimo_ano = int(df_ibc_br["ano"].max())
-    ultimo_mes = int(df_ibc_br[df_ibc_br["ano"] == ultimo_ano]["mes"].max())
+    ultimo_ano, ultimo_mes = ultimo_periodo(df_ibc_br)
 
     # KPIs
     titulo_centralizado("Indicadores de Atividade Econômica (IBC-Br)", 3)
@@ -83,14 +86,6 @@ def display_ibc_br_analise(df_ibc_br):
 
     st.divider()
 
-    # Preparar dados para gráfico
-    df_ibc_br["data"] = pd.to_datetime(
-        df_ibc_br["ano"].astype(str)
-        + "-"
-        + df_ibc_br["mes"].astype(str).str.zfill(2)
-        + "-01"
-    )
-
     # Anos disponíveis com base nos dados válidos de cada métrica
     anos_com_mensal = set(df_ibc_br[df_ibc_br["ibc_mensal"].notna()]["ano"].unique())
     anos_com_mes_anterior = set(
@@ -187,6 +182,7 @@ def display_ibc_br_analise(df_ibc_br):
         st.plotly_chart(fig, use_container_width=True)
 
 
+@st.fragment
 def display_expectativas_analise(df_expectativas):
     """
     Renderiza o bloco completo de análise das Expectativas de Mercado (PIB e Inflação).
@@ -196,7 +192,8 @@ def display_expectativas_analise(df_expectativas):
         st.info("Não há dados disponíveis para as Expectativas.")
         return
 
-    # Converter colunas para numérico
+    # Converter colunas para numérico (numa cópia: o DataFrame vem do cache)
+    df_expectativas = df_expectativas.copy()
     df_expectativas["ano"] = pd.to_numeric(df_expectativas["ano"], errors="coerce")
     df_expectativas["mes"] = pd.to_numeric(df_expectativas["mes"], errors="coerce")
     df_expectativas["expectativa_pib_25"] = pd.to_numeric(
@@ -215,14 +212,6 @@ def display_expectativas_analise(df_expectativas):
     # Filtrar dados válidos
     df_expectativas = df_expectativas.dropna(subset=["ano", "mes"])
 
-    # Criar coluna de data
-    df_expectativas["data"] = pd.to_datetime(
-        df_expectativas["ano"].astype(str)
-        + "-"
-        + df_expectativas["mes"].astype(str).str.zfill(2)
-        + "-01"
-    )
-
     # Filtrar apenas os dois últimos anos
     anos_disponiveis = sorted(df_expectativas["ano"].unique())
     if len(anos_disponiveis) >= 2:
@@ -388,6 +377,7 @@ def display_expectativas_analise(df_expectativas):
         st.plotly_chart(fig, use_container_width=True)
 
 
+@st.fragment
 def display_ipca_geral_analise(df_ipca_geral):
     """
     Renderiza o bloco completo de análise do IPCA - Geral.
@@ -397,7 +387,8 @@ def display_ipca_geral_analise(df_ipca_geral):
         st.info("Não há dados disponíveis para o IPCA - Geral.")
         return
 
-    # Converter colunas para numérico
+    # Converter colunas para numérico (numa cópia: o DataFrame vem do cache)
+    df_ipca_geral = df_ipca_geral.copy()
     df_ipca_geral["ano"] = pd.to_numeric(df_ipca_geral["ano"], errors="coerce")
     df_ipca_geral["mes"] = pd.to_numeric(df_ipca_geral["mes"], errors="coerce")
     df_ipca_geral["ipca_12_meses_geral"] = pd.to_numeric(
@@ -410,17 +401,8 @@ def display_ipca_geral_analise(df_ipca_geral):
     # Filtrar dados válidos
     df_ipca_geral = df_ipca_geral.dropna(subset=["ano", "mes"])
 
-    # Criar coluna de data
-    df_ipca_geral["data"] = pd.to_datetime(
-        df_ipca_geral["ano"].astype(str)
-        + "-"
-        + df_ipca_geral["mes"].astype(str).str.zfill(2)
-        + "-01"
-    )
-
     # Identificar último mês/ano
-    ultimo_ano = int(df_ipca_geral["ano"].max())
-    ultimo_mes = int(df_ipca_geral[df_ipca_geral["ano"] == ultimo_ano]["mes"].max())
+    ultimo_ano, ultimo_mes = ultimo_periodo(df_ipca_geral)
 
     # Pegar valores mais recentes
     df_ultimo = df_ipca_geral[
@@ -629,6 +611,7 @@ def display_ipca_geral_analise(df_ipca_geral):
         st.plotly_chart(fig, use_container_width=True)
 
 
+@st.fragment
 def display_taxa_cambio_analise(df_taxa_cambio):
     """
     Renderiza o bloco completo de análise da Taxa de Câmbio.
@@ -638,7 +621,8 @@ def display_taxa_cambio_analise(df_taxa_cambio):
         st.info("Não há dados disponíveis para a Taxa de Câmbio.")
         return
 
-    # Converter colunas para numérico
+    # Converter colunas para numérico (numa cópia: o DataFrame vem do cache)
+    df_taxa_cambio = df_taxa_cambio.copy()
     df_taxa_cambio["ano"] = pd.to_numeric(df_taxa_cambio["ano"], errors="coerce")
     df_taxa_cambio["mes"] = pd.to_numeric(df_taxa_cambio["mes"], errors="coerce")
     df_taxa_cambio["taxa_cambio"] = pd.to_numeric(
@@ -660,17 +644,8 @@ def display_taxa_cambio_analise(df_taxa_cambio):
     # Filtrar dados válidos
     df_taxa_cambio = df_taxa_cambio.dropna(subset=["ano", "mes"])
 
-    # Criar coluna de data
-    df_taxa_cambio["data"] = pd.to_datetime(
-        df_taxa_cambio["ano"].astype(str)
-        + "-"
-        + df_taxa_cambio["mes"].astype(str).str.zfill(2)
-        + "-01"
-    )
-
     # Identificar último mês/ano
-    ultimo_ano = int(df_taxa_cambio["ano"].max())
-    ultimo_mes = int(df_taxa_cambio[df_taxa_cambio["ano"] == ultimo_ano]["mes"].max())
+    ultimo_ano, ultimo_mes = ultimo_periodo(df_taxa_cambio)
 
     # Pegar valor mais recente
     df_ultimo = df_taxa_cambio[
@@ -852,6 +827,7 @@ def display_taxa_cambio_analise(df_taxa_cambio):
         st.plotly_chart(fig, use_container_width=True)
 
 
+@st.fragment
 def display_ind_transformacao_analise(df_ind_transformacao):
     """
     Renderiza o bloco completo de análise da Produção Industrial - Indústria de Transformação.
@@ -861,7 +837,8 @@ def display_ind_transformacao_analise(df_ind_transformacao):
         st.info("Não há dados disponíveis para a Indústria de Transformação.")
         return
 
-    # Converter colunas para numérico
+    # Converter colunas para numérico (numa cópia: o DataFrame vem do cache)
+    df_ind_transformacao = df_ind_transformacao.copy()
     df_ind_transformacao["ano"] = pd.to_numeric(
         df_ind_transformacao["ano"], errors="coerce"
     )
@@ -878,19 +855,8 @@ def display_ind_transformacao_analise(df_ind_transformacao):
     # Filtrar dados válidos
     df_ind_transformacao = df_ind_transformacao.dropna(subset=["ano", "mes"])
 
-    # Criar coluna de data
-    df_ind_transformacao["data"] = pd.to_datetime(
-        df_ind_transformacao["ano"].astype(str)
-        + "-"
-        + df_ind_transformacao["mes"].astype(str).str.zfill(2)
-        + "-01"
-    )
-
     # Identificar último mês/ano
-    ultimo_ano = int(df_ind_transformacao["ano"].max())
-    ultimo_mes = int(
-        df_ind_transformacao[df_ind_transformacao["ano"] == ultimo_ano]["mes"].max()
-    )
+    ultimo_ano, ultimo_mes = ultimo_periodo(df_ind_transformacao)
 
     # Filtrar dados de "Indústrias de transformação" para KPIs
     df_transformacao = df_ind_transformacao[
@@ -1033,6 +999,7 @@ def display_ind_transformacao_analise(df_ind_transformacao):
         st.dataframe(styled_df, use_container_width=True, height=500)
 
 
+@st.fragment
 def display_taxa_desemprego_analise(df_taxa_desemprego):
     """
     Renderiza o bloco completo de análise da Taxa de Desemprego no Trimestre.
@@ -1042,7 +1009,8 @@ def display_taxa_desemprego_analise(df_taxa_desemprego):
         st.info("Não há dados disponíveis para a Taxa de Desemprego.")
         return
 
-    # Converter colunas para numérico
+    # Converter colunas para numérico (numa cópia: o DataFrame vem do cache)
+    df_taxa_desemprego = df_taxa_desemprego.copy()
     df_taxa_desemprego["ano"] = pd.to_numeric(
         df_taxa_desemprego["ano"], errors="coerce"
     )
@@ -1078,8 +1046,7 @@ def display_taxa_desemprego_analise(df_taxa_desemprego):
     df_filtrado = df_filtrado[df_filtrado["mes"].isin([3, 6, 9, 12])].copy()
 
     # Identificar último trimestre/ano
-    ultimo_ano = int(df_filtrado["ano"].max())
-    ultimo_mes = int(df_filtrado[df_filtrado["ano"] == ultimo_ano]["mes"].max())
+    ultimo_ano, ultimo_mes = ultimo_periodo(df_filtrado)
     ultimo_trimestre = df_filtrado[
         (df_filtrado["ano"] == ultimo_ano) & (df_filtrado["mes"] == ultimo_mes)
     ]["trimestre_movel"].iloc[0]
@@ -1193,6 +1160,7 @@ def display_taxa_desemprego_analise(df_taxa_desemprego):
         st.dataframe(styled_df, use_container_width=True, height=400)
 
 
+@rastrear
 def show_page_macroeconomia(
     df_ibc_br,
     df_expectativas,
@@ -3,30 +3,35 @@ Página de Verticais do Dashboard Assintecal
 """
 
 import streamlit as st
+from src.rastreamento import rastrear
 from src.utils import (
     display_comex_vertical_analise,
     titulo_centralizado,
 )
 
 
+@rastrear
 def show_page_vertical(
     df_exp_vertical,
-    df_exp_vertical_pais,
-    df_exp_vertical_sh6,
+    carregar_exp_vertical_pais,
+    carregar_exp_vertical_sh6,
     df_imp_vertical,
-    df_imp_vertical_pais,
-    df_imp_vertical_sh6,
+    carregar_imp_vertical_pais,
+    carregar_imp_vertical_sh6,
 ):
     """
     Página principal de análise das verticais de calçados.
 
+    As tabelas por país e por SH6 são recebidas como funções de carregamento e
+    só são buscadas quando o usuário abre a visualização correspondente.
+
     Args:
         df_exp_vertical: DataFrame com exportações agregadas por vertical
-        df_exp_vertical_pais: DataFrame com exportações por vertical e país
-        df_exp_vertical_sh6: DataFrame com exportações por vertical e SH6
+        carregar_exp_vertical_pais: Função que carrega as exportações por vertical e país
+        carregar_exp_vertical_sh6: Função que carrega as exportações por vertical e SH6
         df_imp_vertical: DataFrame com importações agregadas por vertical
-        df_imp_vertical_pais: DataFrame com importações por vertical e país
-        df_imp_vertical_sh6: DataFrame com importações por vertical e SH6
+        carregar_imp_vertical_pais: Função que carrega as importações por vertical e país
+        carregar_imp_vertical_sh6: Função que carrega as importações por vertical e SH6
     """
 
     # =======================
@@ -36,14 +41,12 @@ def show_page_vertical(
     st.info("Clique nos menus abaixo para explorar os dados das Verticais.")
     display_comex_vertical_analise(
         df_comex=df_exp_vertical,
-        df_comex_pais=df_exp_vertical_pais,
-        df_comex_sh6=df_exp_vertical_sh6,
+        carregar_dados_pais=carregar_exp_vertical_pais,
+        carregar_dados_sh6=carregar_exp_vertical_sh6,
         titulo_expander="Exportações por Vertical",
         titulo_kpi="Exportações",
         state_key_prefix="exp_vertical",
         categoria_kpi="Exportação",
-        set_expander_open=None,
-        expander_state_key="exp_vertical_expander_state",
         coluna_tipo="vertical",
         usar_expander=True,
     )
@@ -53,14 +56,12 @@ def show_page_vertical(
     # =======================
     display_comex_vertical_analise(
         df_comex=df_imp_vertical,
-        df_comex_pais=df_imp_vertical_pais,
-        df_comex_sh6=df_imp_vertical_sh6,
+        carregar_dados_pais=carregar_imp_vertical_pais,
+        carregar_dados_sh6=carregar_imp_vertical_sh6,
         titulo_expander="Importações por Vertical",
         titulo_kpi="Importações",
         state_key_prefix="imp_vertical",
         categoria_kpi="Importação",
-        set_expander_open=None,
-        expander_state_key="imp_vertical_expander_state",
         coluna_tipo="vertical",
         usar_expander=True,
     )